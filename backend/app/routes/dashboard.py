@@ -73,16 +73,28 @@ def _get_user_created_at_ms(user_id: str) -> int | None:
         return None
 
 
+# Só os campos usados no overview; do JSONB raw vêm apenas time, coin e size_usd
+TRADE_OVERVIEW_COLUMNS = (
+    "id, closed_at, trade_id, symbol, side, tf, oid, pnl_usd, account_value_at_trade, "
+    "raw_time:raw->time, raw_coin:raw->coin, raw_size_usd:raw->size_usd"
+)
+
+
+def _trade_storage():
+    """SupabaseStorage do projeto raiz (paginação keyset de trades_database; mesmo cliente do get_supabase)."""
+    _root = Path(__file__).resolve().parent.parent.parent.parent
+    if str(_root) not in sys.path:
+        sys.path.insert(0, str(_root))
+    from storage.supabase_storage import SupabaseStorage
+    s = get_settings()
+    return SupabaseStorage(s.supabase_url, s.supabase_service_key)
+
+
 def _fetch_trades(user_id: str) -> list[dict]:
-    supabase = get_supabase()
-    r = supabase.table("trades_database").select("trade_id, symbol, side, tf, oid, raw, pnl_usd, closed_at, account_value_at_trade").eq("user_id", user_id).order("closed_at", desc=False).execute()
-    if not r.data:
-        return []
     min_ts_ms = _get_user_created_at_ms(user_id)
     out = []
-    for row in r.data:
-        raw = row.get("raw") or {}
-        ts = raw.get("time") or 0
+    for row in _trade_storage().iter_trades(user_id, columns=TRADE_OVERVIEW_COLUMNS):
+        ts = row.get("raw_time") or 0
         if isinstance(row.get("closed_at"), str) and "T" in row["closed_at"]:
             try:
                 from datetime import datetime
@@ -105,12 +117,12 @@ def _fetch_trades(user_id: str) -> list[dict]:
         out.append({
             "trade_id": row.get("trade_id", "-"),
             "oid": row.get("oid", ""),
-            "token": row.get("symbol", raw.get("coin", "?")),
+            "token": row.get("symbol", row.get("raw_coin") or "?"),
             "side": row.get("side", "?"),
             "tf": row.get("tf", "-"),
             "pnl_usd": pnl_usd,
             "pnl_pct": pnl_pct,
-            "size_usd": float(raw.get("size_usd", 0) or 0),
+            "size_usd": float(row.get("raw_size_usd", 0) or 0),
             "time": ts,
         })
     return out
@@ -300,11 +312,13 @@ def get_overview(user_id: str = Depends(get_current_user_id)) -> dict[str, Any]:
     }
 
 
-def _get_sz_decimals(meta: dict, coin: str) -> int:
-    for u in (meta.get("universe") or []):
-        if u.get("name") == coin:
-            return int(u.get("szDecimals", 2))
-    return 2
+def _get_market_meta(base_url: str):
+    """Registro de meta compartilhado pelo processo (lookup O(1), atualizado em background)."""
+    _root = Path(__file__).resolve().parent.parent.parent.parent
+    if str(_root) not in sys.path:
+        sys.path.insert(0, str(_root))
+    from utils.market_meta import get_market_meta
+    return get_market_meta(base_url)
 
 
 @router.post("/close-position")
@@ -375,23 +389,17 @@ def close_position(
     if size_to_close < 1e-8:
         raise HTTPException(status_code=400, detail="Tamanho a fechar muito pequeno.")
 
-    # Meta para sz decimals
-    try:
-        meta_resp = requests.post(HYPERLIQUID_API, json={"type": "meta"}, timeout=10)
-        meta_resp.raise_for_status()
-        meta = meta_resp.json()
-    except Exception:
-        meta = {}
-    sz_dec = _get_sz_decimals(meta, symbol)
-    size_to_close = round(size_to_close, sz_dec)
-    if size_to_close <= 0:
-        raise HTTPException(status_code=400, detail="Tamanho arredondado inválido.")
-
-    # Exchange e market_close
     from hyperliquid.exchange import Exchange
     from hyperliquid.utils import constants
     is_mainnet = (row.get("network") or "mainnet") == "mainnet"
     base_url = constants.MAINNET_API_URL if is_mainnet else constants.TESTNET_API_URL
+
+    # Meta para sz decimals (registro em memória, sem request por fechamento)
+    size_to_close = _get_market_meta(base_url).round_sz(symbol, size_to_close)
+    if size_to_close <= 0:
+        raise HTTPException(status_code=400, detail="Tamanho arredondado inválido.")
+
+    # Exchange e market_close
     account = Account.from_key(private_key)
     exchange = Exchange(account, base_url, account_address=wallet)
 
@@ -630,12 +638,20 @@ def execute_blocked_trade(
     account = Account.from_key(private_key)
     exchange = Exchange(account, base_url, account_address=wallet)
 
-    # Gera trade_id antes de enviar a ordem, para assinar via clientOrderId (evita ser tratado como manual)
+    market_meta = _get_market_meta(base_url)
+    if market_meta.is_delisted(symbol):
+        raise HTTPException(status_code=400, detail=f"{symbol} foi deslistado na Hyperliquid.")
+
+    # Gera trade_id antes de enviar a ordem: o cloid da 1ª entrada deriva dele (o bot acompanha o
+    # ciclo de vida do trade pelos fills desse cloid e não o trata como manual)
+    from hyperliquid.utils.types import Cloid
+    from utils.trade_cloid import ROLE_ENTRY1, make_cloid
     trade_id = f"{symbol}-{int(time.time())}"
-    client_oid = f"{trade_id}_{int(time.time()*1000)}".replace(" ", "_").replace("-", "_")
+    client_oid = Cloid.from_str(make_cloid(trade_id, ROLE_ENTRY1))
 
     # round price for exchange
-    entry_px_rounded = round(entry_px, 5)
+    entry_px_rounded = market_meta.round_px(symbol, entry_px)
+    qty = market_meta.round_sz(symbol, qty)
     is_buy = side == "long"
     try:
         res = exchange.order(
@@ -643,8 +659,9 @@ def execute_blocked_trade(
             is_buy,
             qty,
             entry_px_rounded,
-            {"limit": {"tif": "Gtc"}, "clientOrderId": client_oid},
+            {"limit": {"tif": "Gtc"}},
             reduce_only=False,
+            cloid=client_oid,
         )
     except Exception as e:
         logger.exception(f"Erro order execute-blocked-trade {symbol}: {e}")
@@ -675,7 +692,7 @@ def execute_blocked_trade(
         "qty_entry_2": qty_entry_2,
         "trade_id": trade_id,
         "pnl_realized": 0.0,
-        "last_size": 0.0,
+        "lc": {"st": "pending", "e1": 0.0, "e2": 0.0, "t1": 0, "t2": 0},
     }
     if entry2_enabled:
         tracker_data["entry2_px"] = entry2_px
@@ -1,10 +1,19 @@
-"""Cliente Supabase (service role) para uso no backend."""
-from supabase import create_client
+"""Cliente Supabase (service role) para uso no backend: um cliente com pool HTTP por processo."""
+import sys
+from pathlib import Path
+
 from backend.app.config import get_settings
 
+# Permite importar storage do projeto raiz
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from storage.supabase_client import get_shared_client
+
 
 def get_supabase():
     s = get_settings()
     if not s.supabase_url or not s.supabase_service_key:
         raise ValueError("SUPABASE_URL e SUPABASE_SERVICE_KEY são obrigatórios")
-    return create_client(s.supabase_url, s.supabase_service_key)
+    return get_shared_client(s.supabase_url, s.supabase_service_key)
@@ -13,9 +13,19 @@ from eth_account import Account
 from hyperliquid.info import Info
 from hyperliquid.exchange import Exchange
 from hyperliquid.utils import constants
+from hyperliquid.utils.types import Cloid
 import requests
 
-from storage import get_storage
+from storage import InstrumentedStorage, get_storage, storage_metrics_enabled
+from utils.market_meta import MarketMetaRegistry, get_market_meta
+from utils.latency import LatencyStats, LatencyTrace, append_record, format_summary
+from utils.signer import install_fast_l1_signing
+from utils.account_mirror import AccountMirror
+from utils.tracker_feed import tracker_feed_for
+from utils.loop_cache import ACCOUNT_KEYS, LoopReadCache
+from utils.trade_index import TradeIndex
+from utils.trade_sync_cache import TradeSyncCache
+from utils.trade_cloid import ROLE_ENTRY1, ROLE_ENTRY2, is_bot_cloid, make_cloid, parse_cloid, trade_key
 
 load_dotenv()
 
@@ -95,6 +105,41 @@ ENTRY2_ALLOWED = True   # Definido por plan (basic=False, pro/satoshi=True)
 ENTRY2_ENABLED = True   # Toggle do usuário em bot_config.entry2_enabled
 SIGNAL_MODE = False     # Modo Sinal: não executa trades; bot_config.signal_mode (SaaS)
 
+# RANKING DE SINAIS (vários sinais no mesmo fechamento disputam as vagas livres)
+SIGNAL_SCORE_RR_WEIGHT = 1.0   # Peso do risco/retorno (média ponderada dos alvos)
+SIGNAL_SCORE_TF_WEIGHT = 0.25  # Peso da prioridade do timeframe
+SIGNAL_TF_PRIORITY = []        # Ordem de prioridade dos TFs (vazio = TFs maiores primeiro)
+
+# ASSINATURA L1 PRÉ-COMPUTADA (troca o assinador do SDK só se o autoteste bater)
+FAST_SIGNING = os.getenv("BOT_FAST_SIGNING", "0") == "1"
+
+# ESPELHO DA CONTA VIA WEBSOCKET (orderUpdates/userFills/webData2 no lugar do polling a cada loop)
+ACCOUNT_MIRROR = os.getenv("BOT_ACCOUNT_MIRROR", "0") == "1"
+MIRROR_MIN_LOOP_SECONDS = 0.5  # Intervalo mínimo entre loops quando acordado por fill
+
+# FEED DO BOT_TRACKER (Supabase Realtime no lugar de reler a tabela inteira a cada loop)
+TRACKER_FEED = os.getenv("BOT_TRACKER_FEED", "0") == "1"
+tracker_feed = None  # TrackerFeed do usuário (None = merge lê o bot_tracker inteiro)
+
+# SINCRONIZAÇÃO INCREMENTAL DE FILLS (userFillsByTime a partir de um cursor persistido por usuário)
+FILL_SYNC_OVERLAP_MS = 5 * 60 * 1000  # Rebusca os últimos 5 min (fill atrasado, relógio); OIDs já gravados são ignorados
+FILL_SYNC_PAGE_LIMIT = 2000           # Máximo de fills por resposta do userFillsByTime
+FILL_CURSOR_PERSIST_INTERVAL = 600    # Sem trades novos, persiste o cursor no máximo a cada 10 min
+# replay_ms: a próxima busca começa também daqui (ciclo de vida: trade que entrou no tracker depois do fill)
+fill_sync_cursor = {"ms": None, "loaded": False, "persisted_ms": None, "persisted_at": 0, "replay_ms": None}
+# Atribuição de fills a tf/trade_id: trades gravados por coin/tempo (montado 1x, atualizado a cada trade novo)
+ATTRIBUTION_WINDOW_MS = 72 * 3600 * 1000  # Trade do bot no mesmo coin até 72h do fill
+ORPHAN_WINDOW_MS = 12 * 3600 * 1000       # Órfãos (MANUAL_) do mesmo coin agrupados em 12h
+trade_index = TradeIndex()
+trade_sync_cache = None  # OIDs gravados + resumos recentes (TradeSyncCache), carregado no 1º sync
+TRADE_OID_CHECK_MARGIN_MS = 24 * 3600 * 1000  # OIDs conferidos no banco desde o fill mais antigo menos isto (ordem com micro-fills espaçados)
+
+# LEITURAS POR ITERAÇÃO (cada leitura de Info/storage no máximo 1x por loop; escritas invalidam)
+loop_reads = LoopReadCache()
+
+# LATÊNCIA SINAL → ORDEM (janela dos últimos trades deste processo/usuário)
+latency_stats = LatencyStats()
+
 # CONEXÃO
 def setup_client():
     if not PRIVATE_KEY: raise ValueError("Chave Privada não encontrada no .env")
@@ -196,6 +241,8 @@ def load_config(storage):
 def get_precision(meta, coin):
     if not meta:
         return 2
+    if isinstance(meta, MarketMetaRegistry):
+        return meta.sz_decimals(coin)
     universes = meta.get("universe") or []
     for universe in universes:
         if universe["name"] == coin: return universe["szDecimals"]
@@ -597,28 +644,123 @@ def get_signal(df_binance, df_hyperliquid, symbol, timeframe):
                 logging.info(f"✅ SINAL {prefix}: SHORT (Engolfo Bearish) | {ref_info}")
     return signal if (signal.get("take") or signal.get("blocked")) else None
 
-def place_trade_entry(exchange, symbol, side, qty, entry_px):
+def _order_request(symbol, is_buy, qty, px, order_type, reduce_only=False, cloid=None):
+    """Monta um OrderRequest no formato do SDK (usado por bulk_orders). cloid: ver utils.trade_cloid."""
+    req = {
+        "coin": symbol,
+        "is_buy": is_buy,
+        "sz": qty,
+        "limit_px": px,
+        "order_type": order_type,
+        "reduce_only": reduce_only,
+    }
+    if cloid:
+        req["cloid"] = Cloid.from_str(cloid)
+    return req
+
+def _order_statuses(res, n):
+    """Extrai o status de cada perna de uma resposta de order/bulk_orders (sempre n itens)."""
+    if not isinstance(res, dict) or res.get("status") != "ok":
+        err = res.get("response") if isinstance(res, dict) else res
+        return [{"error": str(err)} for _ in range(n)]
+    statuses = list(((res.get("response") or {}).get("data") or {}).get("statuses") or [])
+    statuses += [{"error": "sem status na resposta"} for _ in range(n - len(statuses))]
+    return statuses[:n]
+
+def order_leg_ok(status):
+    return isinstance(status, dict) and "error" not in status
+
+def submit_order_group(exchange, legs, grouping="na"):
     """
-    Coloca ordem LIMIT para a primeira entrada no nível da fib (customizável).
-    Simplificado: não usa mais STOP LIMIT, apenas LIMIT direto.
+    Envia um grupo de ordens numa única ação bulk da Hyperliquid (1 assinatura, 1 round trip).
+    legs: lista de (label, order_request). Retorna [(label, status)] na mesma ordem,
+    com o status individual de cada perna ({"resting": ...}, {"filled": ...} ou {"error": ...}).
     """
-    is_buy = True if side == "long" else False
-    logging.info(f"📥 1ª Entrada Pendente: {side.upper()} {symbol} | Qty:{qty} | Entry:{entry_px:.4f}") 
-    
-    trade_id = f"{symbol}-{int(time.time())}"  
+    if not legs:
+        return []
+    loop_reads.invalidate(*ACCOUNT_KEYS)
     try:
-        entry_px = round_px(entry_px)
-        res = exchange.order(symbol, is_buy, qty, entry_px, {"limit": {"tif": "Gtc"}}, reduce_only=False)
-        return res, trade_id
+        res = exchange.bulk_orders([req for _, req in legs], grouping=grouping)
     except Exception as e:
-        logging.error(f"Erro Entry LIMIT: {e}")
-        return None, None
+        logging.error(f"Erro bulk order ({len(legs)} pernas): {e}")
+        res = {"status": "err", "response": str(e)}
+    statuses = _order_statuses(res, len(legs))
+    for (label, req), st in zip(legs, statuses):
+        if not order_leg_ok(st):
+            logging.error(f"❌ {label} {req['coin']} rejeitada: {st.get('error') if isinstance(st, dict) else st}")
+    return [(label, st) for (label, _), st in zip(legs, statuses)]
+
+class CancelBatch:
+    """
+    Acumula cancelamentos (coin, oid) e envia todos numa única ação bulk_cancel.
+    Evita N round trips assinados quando várias ordens precisam sair no mesmo loop.
+    """
 
-def place_fib_tps(exchange, symbol, side, entry_px, stop_px, total_qty, sz_dec, custom_base=None, anchor_px=None, entry2_filled=False):
-    """Coloca TPs customizados. Se entry2_filled E ENTRY2_ADJUST_LAST_TARGET=true, último TP vai para 0.0."""
+    def __init__(self, exchange):
+        self.exchange = exchange
+        self._pending = []
+        self._oids = set()
+
+    def add(self, coin, oid, reason=""):
+        if oid is None or oid in self._oids:
+            return
+        self._oids.add(oid)
+        self._pending.append((coin, oid, reason))
+
+    def __len__(self):
+        return len(self._pending)
+
+    def flush(self):
+        """Envia o lote pendente. Retorna {oid: True/False} com o resultado de cada ordem."""
+        if not self._pending:
+            return {}
+        batch, self._pending, self._oids = self._pending, [], set()
+        loop_reads.invalidate(*ACCOUNT_KEYS)
+        try:
+            res = self.exchange.bulk_cancel([{"coin": coin, "oid": oid} for coin, oid, _ in batch])
+        except Exception as e:
+            logging.error(f"Erro bulk cancel ({len(batch)} ordens): {e}")
+            res = {"status": "err", "response": str(e)}
+        statuses = _order_statuses(res, len(batch))
+        results = {}
+        for (coin, oid, reason), st in zip(batch, statuses):
+            ok = st == "success" or order_leg_ok(st)
+            results[oid] = ok
+            if ok:
+                if reason:
+                    logging.info(f"{reason} | {coin} oid={oid}")
+            else:
+                err = st.get("error") if isinstance(st, dict) else st
+                logging.error(f"Erro ao cancelar ordem {coin} oid={oid}: {err}")
+        return results
+
+def place_trade_entries(exchange, entries, traces=None):
+    """
+    Coloca ordens LIMIT da primeira entrada (nível da fib customizável) de vários sinais numa única ação bulk.
+    entries: lista de (symbol, side, qty, entry_px). Retorna [(status, trade_id)] na mesma ordem; (None, None) se rejeitada.
+    traces: LatencyTrace por entrada (opcional), recebe as marcas order_sent/order_ack.
+    """
+    legs = []
+    trade_ids = []
+    for symbol, side, qty, entry_px in entries:
+        is_buy = True if side == "long" else False
+        entry_px = round_px(entry_px)
+        logging.info(f"📥 1ª Entrada Pendente: {side.upper()} {symbol} | Qty:{qty} | Entry:{entry_px:.4f}")
+        trade_id = f"{symbol}-{int(time.time())}"
+        legs.append((f"Entrada 1 {symbol}", _order_request(symbol, is_buy, qty, entry_px, {"limit": {"tif": "Gtc"}}, reduce_only=False, cloid=make_cloid(trade_id, ROLE_ENTRY1))))
+        trade_ids.append(trade_id)
+    for trace in traces or []:
+        trace.mark("order_sent")
+    results = submit_order_group(exchange, legs)
+    for trace in traces or []:
+        trace.mark("order_ack")
+    return [(status, trade_id) if order_leg_ok(status) else (None, None) for (_, status), trade_id in zip(results, trade_ids)]
+
+def build_fib_tp_legs(symbol, side, entry_px, stop_px, total_qty, sz_dec, custom_base=None, anchor_px=None, entry2_filled=False):
+    """Monta as pernas (label, order_request) dos TPs. Se entry2_filled E ENTRY2_ADJUST_LAST_TARGET=true, último TP vai para 0.0."""
     if custom_base: fib_base_dist = custom_base
     else: fib_base_dist = abs(entry_px - stop_px)
-    if fib_base_dist == 0: return
+    if fib_base_dist == 0: return []
 
     start_px = anchor_px if anchor_px else entry_px
     is_buy_tp = False if side == "long" else True
@@ -642,6 +784,7 @@ def place_fib_tps(exchange, symbol, side, entry_px, stop_px, total_qty, sz_dec,
         + (f" | Ajuste pós-entrada2: {fib_levels}" if (entry2_filled and ENTRY2_ADJUST_LAST_TARGET) else "")
     )
 
+    legs = []
     for idx, (fib_mult, pct) in enumerate(fib_levels, start=1):
         qty_tp = round_sz(total_qty * pct, sz_dec)
         if qty_tp <= 0:
@@ -652,13 +795,132 @@ def place_fib_tps(exchange, symbol, side, entry_px, stop_px, total_qty, sz_dec,
             target_px = start_px - (fib_base_dist * fib_mult)
 
         target_px = round_px(target_px)
-        client_oid = f"TP{idx}_{fib_mult}"
+        order_type = {"limit": {"tif": "Gtc"}}
+        legs.append((f"TP{idx} ({fib_mult}) @ {target_px}", _order_request(symbol, is_buy_tp, qty_tp, target_px, order_type, reduce_only=True)))
+    return legs
 
-        try:
-            exchange.order(symbol, is_buy_tp, qty_tp, target_px, {"limit": {"tif": "Gtc"}, "clientOrderId": client_oid}, reduce_only=True)
-            logging.info(f"🎯 TP{idx} ({fib_mult}) @ {target_px}")
-        except Exception as e:
-            logging.error(f"Erro TP {fib_mult}: {e}")
+def place_fib_tps(exchange, symbol, side, entry_px, stop_px, total_qty, sz_dec, custom_base=None, anchor_px=None, entry2_filled=False):
+    """Coloca os TPs customizados numa única ação bulk. Retorna [(label, status)] por alvo."""
+    legs = build_fib_tp_legs(symbol, side, entry_px, stop_px, total_qty, sz_dec, custom_base=custom_base, anchor_px=anchor_px, entry2_filled=entry2_filled)
+    results = submit_order_group(exchange, legs)
+    for label, st in results:
+        if order_leg_ok(st):
+            logging.info(f"🎯 {label}")
+    return results
+
+def modify_orders_bulk(exchange, modifies):
+    """
+    Altera ordens existentes numa única ação batchModify (mantém a ordem no livro, sem janela sem stop).
+    modifies: lista de (label, oid, order_request). Retorna [(label, status)] na mesma ordem.
+    """
+    if not modifies:
+        return []
+    loop_reads.invalidate(*ACCOUNT_KEYS)
+    try:
+        res = exchange.bulk_modify_orders_new([{"oid": oid, "order": req} for _, oid, req in modifies])
+    except Exception as e:
+        logging.error(f"Erro batch modify ({len(modifies)} ordens): {e}")
+        res = {"status": "err", "response": str(e)}
+    statuses = _order_statuses(res, len(modifies))
+    for (label, oid, req), st in zip(modifies, statuses):
+        if not order_leg_ok(st):
+            logging.warning(f"⚠️ Modify {label} {req['coin']} oid={oid} rejeitado: {st.get('error') if isinstance(st, dict) else st}")
+    return [(label, st) for (label, _, _), st in zip(modifies, statuses)]
+
+def replace_orders(exchange, modifies, cancels, snap=None):
+    """
+    Modify com fallback: tenta batchModify; para cada perna rejeitada, cancela a ordem antiga
+    (via CancelBatch) e coloca a nova num único bulk order. Só recoloca as pernas cuja ordem
+    antiga foi cancelada (senão ficariam duas ordens no livro); as demais saem como False.
+    Perna cancelada e não recolocada sai do snapshot (ex.: has_stop passa a False e o stop de
+    pânico roda ainda nesta iteração). Retorna {label: ok}.
+    """
+    results = {}
+    fallback = []
+    by_label = {label: (oid, req) for label, oid, req in modifies}
+    for label, st in modify_orders_bulk(exchange, modifies):
+        if order_leg_ok(st):
+            results[label] = True
+        else:
+            oid, req = by_label[label]
+            cancels.add(req["coin"], oid)
+            fallback.append((label, oid, req))
+    if fallback:
+        cancelled = cancels.flush()
+        legs = []
+        old_oids = {}
+        for label, oid, req in fallback:
+            if cancelled.get(oid):
+                legs.append((label, req))
+                old_oids[label] = (req["coin"], oid)
+            else:
+                logging.warning(f"⚠️ {label} {req['coin']}: ordem antiga oid={oid} não cancelada, nova não colocada")
+                results[label] = False
+        for label, st in submit_order_group(exchange, legs):
+            results[label] = order_leg_ok(st)
+            if not results[label] and snap is not None:
+                snap.drop_order(*old_oids[label])
+    return results
+
+def _qty_matches(expected, actual):
+    """Tolerância para arredondamentos de precisão (0.1% ou mínimo 0.01)."""
+    if expected is None:
+        return False
+    tolerance = max(expected * 0.001, 0.01)
+    return abs(actual - expected) <= tolerance
+
+def _entry2_filled(mem_data):
+    """Entrada 2 preenchida segundo o ciclo de vida do trade (fills do cloid da 2ª entrada)."""
+    lc = mem_data.get("lc")
+    return bool(isinstance(lc, dict) and lc.get("st") == LC_ENTRY2)
+
+def _tp_base_and_anchor(mem_data, side, entry, sym):
+    """Base técnica e âncora dos TPs (setup_high/setup_low) ou fallback pelo preço de entrada."""
+    tech_base = mem_data.get('tech_base')
+    setup_high = mem_data.get('setup_high')
+    setup_low = mem_data.get('setup_low')
+    if tech_base and tech_base > 0 and setup_high and setup_low:
+        anchor = setup_high if side == "long" else setup_low
+        logging.info(f"📐 Fibs técnicos | Base={tech_base:.4f} | Anchor={anchor}")
+        return tech_base, anchor
+    logging.warning(f"⚠️ Fallback Fib para {sym}")
+    return abs(entry * FALLBACK_STOP_PCT), entry
+
+def reprice_protection_after_entry2(exchange, meta, sym, side, size, entry, mem_data, snap, cancels):
+    """
+    Entrada 2 executada: ajusta stop (tamanho total) e escada de TPs (alvos pós-entrada 2)
+    com batchModify nas ordens existentes em vez de cancelar tudo e recolocar no loop seguinte.
+    TPs excedentes são cancelados; TPs novos sem ordem correspondente são colocados.
+    """
+    modifies = []
+    stop_o = next(iter(snap.stop_orders(sym)), None)
+    if stop_o:
+        stop_px = float(stop_o.get("triggerPx") or mem_data.get("planned_stop") or 0)
+        if stop_px > 0 and not _qty_matches(float(stop_o.get("sz", 0) or 0), size):
+            modifies.append(("Stop", stop_o["oid"], _order_request(
+                sym, side != "long", size, stop_px,
+                {"trigger": {"triggerPx": stop_px, "isMarket": True, "tpsl": "sl"}}, reduce_only=True,
+            )))
+
+    sz_dec = get_precision(meta, sym)
+    base_to_use, anchor = _tp_base_and_anchor(mem_data, side, entry, sym)
+    new_tps = build_fib_tp_legs(sym, side, entry, None, size, sz_dec, custom_base=base_to_use, anchor_px=anchor, entry2_filled=True)
+    # Pareia TPs atuais (do mais próximo ao mais distante) com a nova escada (TP1, TP2, ...)
+    old_tps = sorted(snap.tp_orders(sym), key=lambda o: float(o["limitPx"]), reverse=(side == "short"))
+    for old, (label, req) in zip(old_tps, new_tps):
+        modifies.append((label, old["oid"], req))
+    for old in old_tps[len(new_tps):]:
+        cancels.add(sym, old["oid"], "♻️ TP excedente cancelado (entrada 2)")
+    cancels.flush()
+
+    results = replace_orders(exchange, modifies, cancels, snap)
+    extra_legs = new_tps[len(old_tps):]
+    for label, st in submit_order_group(exchange, extra_legs):
+        results[label] = order_leg_ok(st)
+    for label, ok in results.items():
+        if ok:
+            logging.info(f"♻️ {label} ajustado após entrada 2 ({sym})")
+    return results
 
 
 def _normalize_trade_side(side) -> Optional[str]:
@@ -696,23 +958,143 @@ def _infer_position_side_from_fill(fill: dict) -> Optional[str]:
     return None
 
 
+def save_entry_tracker(storage, entry_tracker: dict) -> None:
+    """Salva o tracker e invalida a leitura da iteração (o próximo merge relê o bot_tracker)."""
+    storage.save_entry_tracker(entry_tracker)
+    loop_reads.invalidate("entry_tracker")
+
+
+def flush_storage(storage) -> None:
+    """Grava já as escritas pendentes do storage write-behind (no-op nos demais storages)."""
+    if hasattr(storage, "flush"):
+        try:
+            storage.flush()
+        except Exception as e:
+            logging.error(f"Erro ao gravar storage: {e}")
+
+
 def _merge_tracker_db_into_memory(entry_tracker: dict, storage) -> None:
     """
     Símbolos só no bot_tracker (ex.: execute-blocked-trade no site) entram na memória.
     Não sobrescreve chaves já em entry_tracker — o bot continua a poder remover com pop + save.
+    Com feed do bot_tracker só lê os symbols que mudaram; a leitura completa fica para o início
+    e as reconexões do feed.
     """
     if not hasattr(storage, "get_entry_tracker"):
         return
     try:
-        fresh = storage.get_entry_tracker()
+        if tracker_feed is not None and not tracker_feed.take_reconcile():
+            symbols = [sym for sym in tracker_feed.drain() if sym not in entry_tracker]
+            if not symbols:
+                return
+            fresh = storage.get_tracker_entries(symbols)
+            if fresh is None:
+                tracker_feed.request_reconcile()  # erro na leitura: relê tudo na próxima
+                return
+        else:
+            if tracker_feed is not None:
+                tracker_feed.drain()  # cobertos pela leitura completa
+            fresh = loop_reads.get("entry_tracker", storage.get_entry_tracker)
         for sym, data in (fresh or {}).items():
             if sym and isinstance(data, dict) and sym not in entry_tracker:
                 entry_tracker[sym] = data
+                if isinstance(data.get("lc"), dict) and data.get("placed_at"):
+                    # Entrada do site pode ter executado antes deste merge: a próxima busca de fills volta até ela
+                    request_fill_replay(int(float(data["placed_at"]) * 1000))
     except Exception as e:
         logging.warning("merge_tracker_db_into_memory: %s", e)
 
 
-def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
+def request_fill_replay(since_ms):
+    """Faz a próxima busca de fills começar em since_ms (se antes do cursor), para o ciclo de vida."""
+    replay = fill_sync_cursor["replay_ms"]
+    fill_sync_cursor["replay_ms"] = since_ms if replay is None else min(replay, since_ms)
+
+def history_fills_from_ms():
+    """Início da janela do histórico (cursor menos a sobreposição); fills anteriores vieram só do replay."""
+    cursor = fill_sync_cursor["ms"]
+    return cursor - FILL_SYNC_OVERLAP_MS if cursor is not None else None
+
+def fetch_new_fills(info, wallet, storage, min_ts_ms=None):
+    """
+    Fills desde o cursor persistido (menos FILL_SYNC_OVERLAP_MS), paginando o userFillsByTime.
+    Sem cursor (primeira execução do usuário) usa user_fills, que traz os fills recentes da conta.
+    Com replay pedido (request_fill_replay) começa antes; o histórico ignora essa parte.
+    """
+    if not fill_sync_cursor["loaded"]:
+        cursor = storage.get_fill_cursor() if hasattr(storage, "get_fill_cursor") else None
+        fill_sync_cursor.update(ms=cursor, persisted_ms=cursor, loaded=True)
+    cursor = fill_sync_cursor["ms"]
+    replay = fill_sync_cursor["replay_ms"]
+    if cursor is None:
+        fills = info.user_fills(wallet) or []
+    else:
+        start = max(cursor - FILL_SYNC_OVERLAP_MS, min_ts_ms or 0)
+        if replay is not None:
+            start = min(start, replay)
+        fills, seen = [], set()
+        while True:
+            page = info.user_fills_by_time(wallet, start) or []
+            for f in page:
+                key = f.get("tid") or (f.get("oid"), f.get("time"), f.get("sz"), f.get("px"))
+                if key not in seen:
+                    seen.add(key)
+                    fills.append(f)
+            if len(page) < FILL_SYNC_PAGE_LIMIT:
+                break
+            last = max(int(f.get("time", 0)) for f in page)
+            if last <= start:
+                break
+            start = last  # inclusivo: fills no mesmo ms da borda vêm de novo e são deduplicados acima
+    if fill_sync_cursor["replay_ms"] == replay:
+        fill_sync_cursor["replay_ms"] = None
+    return fills
+
+def fetch_loop_fills(info, wallet, storage):
+    """Única busca de fills do loop: serve ao ciclo de vida (auto_manage) e ao sync do histórico."""
+    min_ts_ms = None
+    if hasattr(storage, 'get_user_created_at_timestamp_ms'):
+        min_ts_ms = storage.get_user_created_at_timestamp_ms()
+    return fetch_new_fills(info, wallet, storage, min_ts_ms)
+
+def advance_fill_cursor(storage, cursor_ms, saved_trades=False):
+    """Avança o cursor em memória; persiste junto com trades novos ou a cada FILL_CURSOR_PERSIST_INTERVAL."""
+    if fill_sync_cursor["ms"] is not None and cursor_ms <= fill_sync_cursor["ms"]:
+        return
+    fill_sync_cursor["ms"] = cursor_ms
+    if not hasattr(storage, "save_fill_cursor"):
+        return
+    if fill_sync_cursor["persisted_ms"] is None or saved_trades or time.time() - fill_sync_cursor["persisted_at"] > FILL_CURSOR_PERSIST_INTERVAL:
+        storage.save_fill_cursor(cursor_ms)
+        fill_sync_cursor.update(persisted_ms=cursor_ms, persisted_at=time.time())
+
+def start_tracker_feed(storage):
+    """Liga o feed do bot_tracker do usuário (BOT_TRACKER_FEED=1 e storage Supabase)."""
+    global tracker_feed
+    if TRACKER_FEED and tracker_feed is None:
+        tracker_feed = tracker_feed_for(storage)
+    return tracker_feed
+
+def stop_tracker_feed():
+    global tracker_feed
+    if tracker_feed is not None:
+        tracker_feed.stop()
+        tracker_feed = None
+
+def load_trade_sync_cache(storage):
+    """Cache de OIDs/trades recentes do usuário; o histórico completo só é lido se o cache ainda não existe."""
+    global trade_sync_cache
+    if trade_sync_cache is None:
+        trade_sync_cache = TradeSyncCache.for_user(getattr(storage, "user_id", None))
+    if not trade_sync_cache.loaded:
+        bootstrap = storage.get_trade_summaries if hasattr(storage, "get_trade_summaries") else storage.get_trades_db
+        if not trade_sync_cache.load(bootstrap):
+            return None  # leitura do histórico falhou: o sync espera a próxima rodada
+        trade_index.load(trade_sync_cache.recent)
+    return trade_sync_cache
+
+def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage, fills=None):
+    """Grava os trades novos dos fills (os do loop, se vierem; senão busca desde o cursor) e alerta."""
     try:
         # Limite: só considera trades após criação da conta no Zeedo (multiusuário)
         min_ts_ms = None
@@ -721,28 +1103,43 @@ def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
 
         _merge_tracker_db_into_memory(entry_tracker, storage)
 
-        # Busca saldo atual da conta para calcular PNL % correto
+        # Busca saldo atual da conta para calcular PNL % correto (mesma leitura do loop, se houver)
         account_value = 0.0
+        clearing_state = {}
         try:
-            clearing_state = info.user_state(wallet)
+            clearing_state = loop_reads.get("user_state", lambda: info.user_state(wallet) or {})
             if clearing_state:
                 margin = clearing_state.get("marginSummary", {}) or {}
                 account_value = float(margin.get("accountValue", 0) or 0)
         except Exception as e:
             logging.warning(f"Erro ao buscar accountValue: {e}")
 
-        user_fills = info.user_fills(wallet)
+        # Posições vêm da leitura acima; fills posteriores a ela ficam para o próximo sync
+        # (senão o fill que zerou a posição não geraria "TRADE ENCERRADO")
+        state_ms = int((loop_reads.as_of("user_state") or time.time()) * 1000)
+
+        user_fills = fills if fills is not None else fetch_new_fills(info, wallet, storage, min_ts_ms)
+        history_from = history_fills_from_ms()
+        if history_from is not None:
+            user_fills = [f for f in user_fills if int(f.get('time') or f.get('t') or f.get('timestamp') or 0) >= history_from]
         if not user_fills:
+            advance_fill_cursor(storage, state_ms)
             return
 
-        trades_db = storage.get_trades_db()
-        if not isinstance(trades_db, list):
-            trades_db = []
-        processed_oids = {str(t.get('oid')) for t in trades_db if t.get('oid')}
-        all_known_trades = list(trades_db)
+        sync_cache = load_trade_sync_cache(storage)
+        if sync_cache is None:
+            return  # sem os OIDs já gravados todo fill pareceria novo (alertas e PnL em dobro)
+        # Cache local pode faltar ou estar velho (outro nó): confere os OIDs gravados desde o fill mais antigo
+        oldest_fill_ms = min(int(f.get('time') or f.get('t') or f.get('timestamp') or 0) for f in user_fills)
+        if hasattr(storage, "get_trade_oids") and not sync_cache.ensure_oids_since(
+            max(oldest_fill_ms - TRADE_OID_CHECK_MARGIN_MS, 0), storage.get_trade_oids
+        ):
+            return
+        processed_oids = sync_cache.oids
         
         # AGRUPA micro-fills com mesmo OID
         new_fills_by_oid = defaultdict(list)
+        deferred_oids = set()
         
         for fill in user_fills:
             oid = str(fill.get('oid') or fill.get('id') or "")
@@ -755,12 +1152,16 @@ def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
             if min_ts_ms is not None and fill_ts > 0 and fill_ts < min_ts_ms:
                 processed_oids.add(oid)  # evita reprocessar
                 continue
+            if fill_ts > state_ms:
+                deferred_oids.add(oid)  # a ordem inteira espera (não separa micro-fills do mesmo OID)
+                continue
 
             new_fills_by_oid[oid].append(fill)
+        for oid in deferred_oids:
+            new_fills_by_oid.pop(oid, None)
         
         new_trades = []
-        user_state = info.user_state(wallet) or {}
-        positions_by_coin = {p["position"]["coin"]: float(p["position"]["szi"]) for p in user_state.get("assetPositions", [])}
+        positions_by_coin = {p["position"]["coin"]: float(p["position"]["szi"]) for p in (clearing_state or {}).get("assetPositions", [])}
         
         for oid, fills in new_fills_by_oid.items():
             base_fill = fills[0]
@@ -785,37 +1186,31 @@ def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
             if (tf == "-" or trade_id == "-") and coin:
                 fill_ts = int(base_fill.get('time') or base_fill.get('t') or base_fill.get('timestamp') or 0)
                 
-                for past_trade in reversed(all_known_trades):
-                    past_coin = past_trade.get('coin') or past_trade.get('token')
-                    if past_coin == coin:
-                        past_ts = int(past_trade.get('time', 0))
-                        if abs(fill_ts - past_ts) < (72 * 3600 * 1000):
-                            candidate_tf = past_trade.get('tf', '-')
-                            candidate_tid = past_trade.get('trade_id', '-')
-                            past_side = _normalize_trade_side(past_trade.get("side"))
-                            if fill_side_inf and past_side and fill_side_inf != past_side:
-                                continue
-                            
-                            if candidate_tf != "-" and candidate_tid != "-":
-                                tf = candidate_tf
-                                trade_id = candidate_tid
-                                break
+                # Mais recente primeiro, só trades do coin a menos de 72h do fill
+                window = trade_index.between(coin, fill_ts - ATTRIBUTION_WINDOW_MS + 1, fill_ts + ATTRIBUTION_WINDOW_MS - 1)
+                for past_trade in reversed(window):
+                    candidate_tf = past_trade.get('tf', '-')
+                    candidate_tid = past_trade.get('trade_id', '-')
+                    past_side = _normalize_trade_side(past_trade.get("side"))
+                    if fill_side_inf and past_side and fill_side_inf != past_side:
+                        continue
+                    
+                    if candidate_tf != "-" and candidate_tid != "-":
+                        tf = candidate_tf
+                        trade_id = candidate_tid
+                        break
 
             # Órfãos (tf="-", trade_id="-"): agrupa por coin + janela de 12h
-            WINDOW_12H_MS = 12 * 3600 * 1000
             if tf == "-" and trade_id == "-" and coin:
                 fill_ts = int(base_fill.get('time') or base_fill.get('t') or base_fill.get('timestamp') or 0)
-                for t in all_known_trades + new_trades:
-                    tc = t.get('coin') or t.get('token')
-                    tt = int(t.get('time', 0) or 0)
-                    if tc == coin and tt and abs(fill_ts - tt) <= WINDOW_12H_MS:
-                        tid = t.get('trade_id', '-')
-                        if tid and tid != "-" and str(tid).startswith("MANUAL_"):
-                            past_side = _normalize_trade_side(t.get("side"))
-                            if fill_side_inf and past_side and fill_side_inf != past_side:
-                                continue
-                            trade_id = tid
-                            break
+                for t in trade_index.between(coin, fill_ts - ORPHAN_WINDOW_MS, fill_ts + ORPHAN_WINDOW_MS):
+                    tid = t.get('trade_id', '-')
+                    if tid and tid != "-" and str(tid).startswith("MANUAL_"):
+                        past_side = _normalize_trade_side(t.get("side"))
+                        if fill_side_inf and past_side and fill_side_inf != past_side:
+                            continue
+                        trade_id = tid
+                        break
                 if trade_id == "-":
                     trade_id = f"MANUAL_{coin}_{fill_ts}"
 
@@ -837,7 +1232,7 @@ def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
                 for fill in fills:
                     pnl_fill = float(fill.get("closedPnl", 0) or 0) - float(fill.get("fee", 0) or 0)
                     trade["pnl_realized"] += pnl_fill
-                storage.save_entry_tracker(entry_tracker)
+                save_entry_tracker(storage, entry_tracker)
             
             # Side: tracker quando alinhado ao fill; senão inferência HL (dir) evita confundir fechamento com lado da posição
             if trade and not tracker_side_mismatch:
@@ -863,8 +1258,8 @@ def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
             fill_safe['num_fills'] = len(fills)
             fill_safe['account_value_at_trade'] = account_value if account_value > 0 else None
             
-            trades_db.append(fill_safe)
             new_trades.append(fill_safe)
+            trade_index.add(fill_safe)
             processed_oids.add(oid)
 
             fill_timestamp = base_fill.get('time') or base_fill.get('t') or base_fill.get('timestamp') or 0
@@ -904,9 +1299,25 @@ def sync_trade_history(info, wallet, entry_tracker, history_tracker, storage):
                 )
 
         if new_trades:
-            storage.save_trades_db(trades_db)
+            if hasattr(storage, "append_trades"):
+                saved = storage.append_trades(new_trades)
+            else:
+                storage.save_trades_db(storage.get_trades_db() + new_trades)
+                saved = True
+            new_oids = {t['oid'] for t in new_trades}
+            if not saved:
+                # Não gravou: esquece os OIDs para o próximo sync tentar de novo
+                processed_oids.difference_update(new_oids)
+                return
+            sync_cache.add(new_trades)
+            # OIDs ficam enquanto o cursor ainda pode rebuscá-los (janela de sobreposição + folga)
+            cursor = fill_sync_cursor["ms"]
+            sync_cache.prune(keep_oids_since_ms=cursor - 2 * FILL_SYNC_OVERLAP_MS if cursor is not None else None)
+            sync_cache.save()
             total_fills = sum(t.get('num_fills', 1) for t in new_trades)
             logging.info(f"📚 Histórico: {len(new_trades)} trades ({total_fills} fills) adicionados.")
+        # Tudo até a leitura de posições foi visto; fills adiados (mais novos) ficam depois do cursor
+        advance_fill_cursor(storage, state_ms, saved_trades=bool(new_trades))
             
     except Exception as e:
         logging.error(f"Erro sync_trade_history: {e}")
@@ -917,6 +1328,207 @@ def is_stop_order(o):
     is_trig = o.get("isTrigger", False)
     return (is_trig or "stop" in ot or "below" in cond or "above" in cond) and o.get("reduceOnly", False)
 
+# CICLO DE VIDA DO TRADE: estado compacto em entry_tracker[sym]["lc"], avançado pelos fills das
+# ordens com cloid do bot (utils.trade_cloid). "e1"/"e2" = qty executada; "t1"/"t2" = último fill aplicado (ms).
+LC_PENDING = "pending"  # 1ª entrada no livro
+LC_ENTRY1 = "entry1"    # 1ª entrada executada
+LC_ENTRY2 = "entry2"    # 2ª entrada executada (posição completa)
+_LC_RANK = {LC_PENDING: 0, LC_ENTRY1: 1, LC_ENTRY2: 2}
+
+def trade_lifecycle(mem):
+    """
+    Retorna (criando se preciso) o estado do trade. Posições abertas antes do cloid ganham o
+    estado em advance_legacy_lifecycle (pelo tamanho da posição); aqui o padrão é pendente.
+    """
+    lc = mem.get("lc")
+    if isinstance(lc, dict) and lc.get("st") in _LC_RANK:
+        return lc
+    lc = {"st": LC_PENDING, "e1": 0.0, "e2": 0.0, "t1": 0, "t2": 0}
+    mem["lc"] = lc
+    return lc
+
+def advance_legacy_lifecycle(mem, size):
+    """
+    Migração de trades abertos antes do cloid (sem "lc"): as ordens de entrada deles não têm cloid,
+    então os fills nunca casam com o trade. O estado é semeado (marcado "legacy") e avançado pela
+    heurística antiga de tamanho: qty_entry_1 / qty_entry_2 com tolerância, e last_size para
+    disparar cada confirmação uma vez (o que a versão anterior já notificou não repete).
+    Retorna ([eventos LC_*], tracker alterado).
+    """
+    lc = mem.get("lc")
+    changed = False
+    if not (isinstance(lc, dict) and lc.get("st") in _LC_RANK):
+        lc = {"st": LC_PENDING, "e1": 0.0, "e2": 0.0, "t1": 0, "t2": 0, "legacy": True}
+        mem["lc"] = lc
+        changed = True
+        logging.info(f"♻️ Trade {mem.get('symbol', '?')} sem ciclo de vida (anterior ao cloid): migrando pelo tamanho da posição")
+    elif not lc.get("legacy"):
+        return [], False
+
+    events = []
+    last_size = mem.get("last_size", 0) or 0
+    qty_entry_1 = mem.get("qty_entry_1")
+    qty_entry_2 = mem.get("qty_entry_2")
+    entry2_qty = mem.get("entry2_qty", 0) or 0
+    has_entry2 = entry2_qty > 0 and qty_entry_2 and qty_entry_1 and qty_entry_2 > qty_entry_1
+    if size > 0 and lc["st"] == LC_PENDING:
+        lc["st"] = LC_ENTRY1
+        changed = True
+        if qty_entry_1 and _qty_matches(qty_entry_1, size) and (last_size == 0 or not _qty_matches(qty_entry_1, last_size)):
+            events.append(LC_ENTRY1)
+    if has_entry2 and lc["st"] != LC_ENTRY2 and _qty_matches(qty_entry_2, size):
+        lc["st"] = LC_ENTRY2
+        changed = True
+        if not (last_size > 0 and _qty_matches(qty_entry_2, last_size)):
+            events.append(LC_ENTRY2)
+    if abs(size - last_size) > 0.001:
+        mem["last_size"] = size
+        changed = True
+    return events, changed
+
+def lifecycle_awaiting_fills(entry_tracker):
+    """Há trade do bot esperando fill de entrada (pendente ou com 2ª entrada possível)?"""
+    for mem in entry_tracker.values():
+        if not isinstance(mem, dict) or not mem.get("trade_id") or mem.get("origin") == "MANUAL":
+            continue
+        st = (mem.get("lc") or {}).get("st", LC_PENDING)
+        if st == LC_PENDING or (st == LC_ENTRY1 and (mem.get("entry2_qty") or 0) > 0):
+            return True
+    return False
+
+def aggregate_fills_by_time(fills):
+    """
+    Um fill por (cloid, oid, time) com sz somado, como o aggregateByTime do userFillsByTime. O
+    userFills do WS (espelho) e o REST sem agregação trazem cada parte separada, todas com o mesmo
+    time: aplicadas uma a uma, a guarda por time de advance_lifecycles ficaria só com a 1ª parte.
+    Partes repetidas (mesmo tid, ex.: WS + REST após reconexão) contam uma vez.
+    """
+    seen, out = set(), {}
+    for f in fills or []:
+        tid = f.get("tid")
+        if tid is not None:
+            if tid in seen:
+                continue
+            seen.add(tid)
+        key = (f.get("cloid"), f.get("oid"), int(f.get("time", 0)))
+        agg = out.get(key)
+        if agg is None:
+            out[key] = dict(f)
+        else:
+            agg["sz"] = str(round(float(agg.get("sz", 0) or 0) + float(f.get("sz", 0) or 0), 8))
+    return list(out.values())
+
+def advance_lifecycles(entry_tracker, fills):
+    """
+    Aplica os fills das ordens do bot aos trades (chave = cloid). Entrada 1 confirmada quando os fills
+    do cloid da 1ª entrada somam qty_entry_1; entrada 2 quando os do cloid da 2ª somam entry2_qty.
+    Retorna ({sym: [eventos LC_*]}, símbolos alterados).
+    """
+    by_key = {
+        trade_key(mem["trade_id"]): sym
+        for sym, mem in entry_tracker.items()
+        if isinstance(mem, dict) and mem.get("trade_id") and mem.get("origin") != "MANUAL"
+    }
+    events, touched = {}, set()
+    if not by_key:
+        return events, touched
+    for f in sorted(aggregate_fills_by_time(fills), key=lambda x: int(x.get("time", 0))):
+        parsed = parse_cloid(f.get("cloid"))
+        if not parsed or parsed[0] not in by_key:
+            continue
+        _, role = parsed
+        if role not in (ROLE_ENTRY1, ROLE_ENTRY2):
+            continue
+        sym = by_key[parsed[0]]
+        mem = entry_tracker[sym]
+        lc = trade_lifecycle(mem)
+        n = "1" if role == ROLE_ENTRY1 else "2"
+        fill_ts = int(f.get("time", 0))
+        if fill_ts <= lc.get("t" + n, 0):
+            continue  # já aplicado (fills agregados por ordem/tempo)
+        lc["t" + n] = fill_ts
+        lc["e" + n] = round(lc.get("e" + n, 0.0) + float(f.get("sz", 0) or 0), 8)
+        touched.add(sym)
+        target_qty = mem.get("qty_entry_1") if role == ROLE_ENTRY1 else mem.get("entry2_qty")
+        new_st = LC_ENTRY1 if role == ROLE_ENTRY1 else LC_ENTRY2
+        if target_qty and lc["e" + n] >= target_qty * 0.999 and _LC_RANK[new_st] > _LC_RANK[lc["st"]]:
+            lc["st"] = new_st
+            events.setdefault(sym, []).append(new_st)
+    return events, touched
+
+class LoopSnapshot:
+    """
+    Visão indexada da conta montada UMA vez por iteração do loop principal.
+    Indexa ordens abertas por coin e por tipo (entrada, reduce-only, stop, TP), posições,
+    mids e exposição total, para que auto_manage e manage_risk_and_scan não reescaneiem listas.
+    """
+
+    def __init__(self, user_state, open_orders, mids):
+        self.user_state = user_state or {}
+        self.open_orders = open_orders or []
+        self.mids = mids or {}
+
+        self.positions = [
+            p["position"] for p in self.user_state.get("assetPositions", [])
+            if float(p["position"]["szi"]) != 0
+        ]
+        self.positions_by_coin = {p["coin"]: p for p in self.positions}
+
+        self._orders = {}
+        self._entry = {}         # não reduce-only (1ª/2ª entrada)
+        self._reduce_only = {}   # SL + TPs
+        self._stops = {}
+        self._tps = {}
+        for o in self.open_orders:
+            coin = o["coin"]
+            self._orders.setdefault(coin, []).append(o)
+            if o.get("reduceOnly", False):
+                self._reduce_only.setdefault(coin, []).append(o)
+                if is_stop_order(o):
+                    self._stops.setdefault(coin, []).append(o)
+                if not o.get("isTrigger", False):
+                    self._tps.setdefault(coin, []).append(o)
+            else:
+                self._entry.setdefault(coin, []).append(o)
+
+        self.active_symbols = set(self.positions_by_coin)
+        self.order_symbols = set(self._entry)
+        self.busy_symbols = self.active_symbols | self.order_symbols
+        self.exposure = sum(abs(float(p["szi"]) * float(self.mids.get(p["coin"], 0))) for p in self.positions)
+
+    def orders(self, coin):
+        return self._orders.get(coin, [])
+
+    def entry_orders(self, coin):
+        return self._entry.get(coin, [])
+
+    def reduce_only_orders(self, coin):
+        return self._reduce_only.get(coin, [])
+
+    def stop_orders(self, coin):
+        return self._stops.get(coin, [])
+
+    def tp_orders(self, coin):
+        return self._tps.get(coin, [])
+
+    def has_stop(self, coin):
+        return coin in self._stops
+
+    def drop_order(self, coin, oid):
+        """Tira do snapshot uma ordem cancelada nesta iteração (sem substituta no livro)."""
+        for index in (self._orders, self._entry, self._reduce_only, self._stops, self._tps):
+            remaining = [o for o in index.get(coin, []) if o.get("oid") != oid]
+            if remaining:
+                index[coin] = remaining
+            else:
+                index.pop(coin, None)
+
+    def has_tp(self, coin):
+        return coin in self._tps
+
+    def mid(self, coin, default=0.0):
+        return float(self.mids.get(coin, default))
+
 def fetch_candles_hyperliquid(info, symbol, timeframe, retries=3):
     tf_seconds = get_tf_seconds(timeframe)
     now_ms = int(time.time() * 1000)
@@ -1016,7 +1628,7 @@ def get_strength_blocks(info, symbols):
     strongest = {ranked[-1][0], ranked[-2][0]}
     return weakest, strongest
 
-def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_orders, history_tracker, analyzed_candles, user_state_cache, all_mids_cache, storage):
+def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_orders, history_tracker, analyzed_candles, user_state_cache, all_mids_cache, storage, snapshot=None):
     # Expira blocked_trades cujo preço atingiu TP1 ou Stop
     target1_level = FIB_LEVELS[0][0] if FIB_LEVELS else 0.618
     if hasattr(storage, "expire_blocked_trades") and all_mids_cache:
@@ -1024,24 +1636,16 @@ def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_o
         if n > 0:
             logging.info(f"🔄 {n} trade(s) bloqueado(s) expirado(s) (TP1/Stop atingido)")
 
-    user_state = user_state_cache
-    raw_positions = user_state.get("assetPositions", [])
-    positions = [p["position"] for p in raw_positions if float(p["position"]["szi"]) != 0]
-    pending_orders = [o for o in all_open_orders if not o["reduceOnly"]]
-    busy_symbols = set()
-    for p in positions: busy_symbols.add(p["coin"])
-    for o in all_open_orders:
-        if not o["reduceOnly"]: busy_symbols.add(o["coin"])
+    snap = snapshot or LoopSnapshot(user_state_cache, all_open_orders, all_mids_cache)
+    busy_symbols = set(snap.busy_symbols)
 
     # Não retorna mais aqui: continua procurando e bloqueia entrada se limite cheio
-    current_exposure = 0.0
-    all_mids = all_mids_cache
-
-    for p in positions: 
-        current_exposure += abs(float(p["szi"]) * float(all_mids.get(p["coin"], 0)))
+    current_exposure = snap.exposure
     available_exposure = MAX_GLOBAL_EXPOSURE - current_exposure
     if os.path.exists("bot_paused.lock"): return
     if available_exposure <= 50: return
+    # Fase 1: coleta todos os sinais válidos deste fechamento; fase 2 (_fill_free_slots) ordena e envia em lote
+    candidates = []
     for sym in SYMBOLS:
         if sym in busy_symbols:
             continue
@@ -1054,10 +1658,19 @@ def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_o
                 current_closed_candle_ts = 0
 
             candle_id = f"{sym}_{tf}_{current_closed_candle_ts}"
-            if candle_id in analyzed_candles:
+            cached = analyzed_candles.get(candle_id)
+            if isinstance(cached, dict) and sym not in entry_tracker and cached["sig"]["signal_ts"] > history_tracker.get(sym, {}).get(tf, 0):
+                # Candidato que não levou vaga neste candle: volta ao ranking sem rebuscar candles
+                candidates.append(cached)
+                continue
+            if cached is True:
                 continue
 
+            # Latência medida a partir do fechamento do candle analisado
+            trace = LatencyTrace((current_closed_candle_ts + tf_sec) * 1000)
+            trace.mark("scan_start")
             df_binance = fetch_candles_binance(sym, tf, limit=100)
+            trace.mark("binance_fetched")
             if df_binance is None or len(df_binance) < 5:
                 continue
             if df_binance.iloc[-1]["timestamp"] + tf_sec * 1000 > now * 1000:
@@ -1066,6 +1679,7 @@ def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_o
                 continue
 
             raw_hl = fetch_candles_hyperliquid(info, sym, tf)
+            trace.mark("hl_fetched")
             if not raw_hl or len(raw_hl) < 2:
                 continue
             try:
@@ -1082,6 +1696,7 @@ def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_o
                 continue
 
             sig = get_signal(df_binance, df_hyperliquid, sym, tf)
+            trace.mark("signal")
             if not sig:
                 analyzed_candles[candle_id] = True
                 continue
@@ -1154,32 +1769,12 @@ def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_o
             if sig_ts <= last_ts:
                 analyzed_candles[candle_id] = True
                 continue
-            try:        
+            try:
                 entry_px = round_px(sig["trigger"])
                 entry2_px = round_px(sig["entry2_px"])
                 stop_real = round_px(sig["stop_real"])
-                avg_entry = (entry_px + entry2_px) / 2
-                use_two_entries = ENTRY2_ALLOWED and ENTRY2_ENABLED
-                risk_per_unit = abs(avg_entry - stop_real) if use_two_entries else abs(entry_px - stop_real)
-                if risk_per_unit == 0: 
-                    analyzed_candles[candle_id] = True
-                    continue
-                total_size = TARGET_LOSS_USD / risk_per_unit
-                limit_notional = min(available_exposure, MAX_SINGLE_POS_EXPOSURE)
-                anchor_entry = avg_entry if use_two_entries else entry_px
-                # Respeitar AMBOS: target loss E patrimônio. Usar o menor size para nunca exceder target loss.
-                size_for_cap = limit_notional / anchor_entry
-                total_size = min(total_size, size_for_cap)
-                if use_two_entries:
-                    qty_first = total_size / 2
-                    qty_second = total_size / 2
-                else:
-                    qty_first = total_size
-                    qty_second = 0
-                sz_dec = get_precision(meta, sym)
-                final_qty = round_sz(qty_first, sz_dec)
-                second_qty = round_sz(qty_second, sz_dec) if use_two_entries else 0
-                if final_qty * entry_px < 10: 
+                sizes = _size_signal_entries(sym, meta, entry_px, entry2_px, stop_real, available_exposure)
+                if not sizes or sizes[0] * entry_px < 10:
                     analyzed_candles[candle_id] = True
                     continue
 
@@ -1206,102 +1801,216 @@ def manage_risk_and_scan(info, exchange, wallet, meta, entry_tracker, all_open_o
                     analyzed_candles[candle_id] = True
                     continue
 
-                # Limite de trades simultâneos: bloqueia entrada mas notifica
-                if len(busy_symbols) >= MAX_POSITIONS:
-                    tg_send(
-                        f"📡 NOVO SINAL DE TRADE\n"
-                        f"🚫ENTRADA NÃO ACIONADA! (Limite de trades simultâneos)\n"
-                        f"{sig['side'].upper()} {sym} | {tf}\n"
-                        f"1ª entrada: {entry_px:.4f}\n"
-                        f"2ª entrada: {entry2_px:.4f}\n"
-                        f"Stop: {stop_real:.4f}\n"
-                        f"https://app.hyperliquid.xyz/trade/{sym}\n"
-                        f"Recomendação: Analise os trades ativos/pendentes e compare qual o melhor. Você também pode dividir o capital entre os trades."
-                    )
-                    btd = {
-                        "symbol": sym, "tf": tf, "side": sig["side"],
-                        "entry_px": entry_px, "entry2_px": entry2_px, "stop_real": stop_real,
-                        "qty": final_qty, "reason": "limite_trades", "signal_ts": sig_ts,
-                        "tech_base": sig.get("tech_base", 0), "setup_high": sig.get("setup_high", 0),
-                        "setup_low": sig.get("setup_low", 0),
-                        "target1_level": FIB_LEVELS[0][0] if FIB_LEVELS else 0.618,
-                    }
-                    if hasattr(storage, "save_blocked_trade"):
-                        storage.save_blocked_trade(btd)
-                    if sym not in history_tracker:
-                        history_tracker[sym] = {}
-                    history_tracker[sym][tf] = sig_ts
-                    if hasattr(storage, "save_history_tracker"):
-                        storage.save_history_tracker(history_tracker)
-                    analyzed_candles[candle_id] = True
-                    continue
-
-                tg_send(
-                    f"📡 NOVO SINAL DE TRADE\n"
-                    f"{sym} | TF {tf}\n"
-                    f"Side: {sig['side'].upper()}\n"
-                    f"1ª entrada: {entry_px:.4f}\n"
-                    f"2ª entrada: {entry2_px:.4f}\n"
-                    f"Stop: {stop_real:.4f}\n"
-                    f"https://app.hyperliquid.xyz/trade/{sym}"   
-                )
-
-                res, trade_id = place_trade_entry(exchange, sym, sig["side"], final_qty, entry_px)
-                signal_ts_sec = sig["signal_ts"] / 1000
-                if res:
-                    # 1ª entrada: -0.618 (fixo). 2ª entrada (se permitido): -1.414. Apenas 2 entradas.
-                    qty_entry_1 = final_qty  # 1ª entrada
-                    qty_entry_2 = final_qty + second_qty  # 1ª + 2ª (apenas se ENTRY2_ALLOWED e ENTRY2_ENABLED)
-                    tracker_data = {
-                        'side': sig["side"],
-                        'tf': tf,
-                        'placed_at': time.time(),
-                        'signal_ts': signal_ts_sec,
-                        'planned_stop': stop_real,
-                        'tech_base': sig["tech_base"],
-                        'setup_high': sig["setup_high"],
-                        'setup_low': sig["setup_low"],
-                        'entry_px': entry_px,
-                        'qty': final_qty,
-                        'qty_entry_1': qty_entry_1,
-                        'qty_entry_2': qty_entry_2,
-                        'trade_id': trade_id,
-                        'pnl_realized': 0.0,
-                        'last_size': 0.0
-                    }
-                    if ENTRY2_ALLOWED and ENTRY2_ENABLED:
-                        tracker_data['entry2_px'] = entry2_px
-                        tracker_data['entry2_qty'] = second_qty
-                        tracker_data['entry2_placed'] = False
-                    else:
-                        tracker_data['entry2_placed'] = True  # Bloqueia entrada 2
-                    entry_tracker[sym] = tracker_data
-                    storage.save_entry_tracker(entry_tracker)
-                    
-                    if sym not in history_tracker: history_tracker[sym] = {}
-                    history_tracker[sym][tf] = sig_ts
-                    storage.save_history_tracker(history_tracker)
-                        
-                    analyzed_candles[candle_id] = True
-                    busy_symbols.add(sym)
-                    return 
+                candidates.append({
+                    "sym": sym, "tf": tf, "sig": sig, "candle_id": candle_id,
+                    "entry_px": entry_px, "entry2_px": entry2_px, "stop_real": stop_real,
+                    "score": score_signal(sig, tf, entry_px, entry2_px, stop_real),
+                    "trace": trace,
+                })
 
             except Exception as e:
                 logging.error(f"[{sym} {tf}] ❌ Erro lógica trade: {e}")
                 analyzed_candles[candle_id] = True
 
+    if candidates:
+        _fill_free_slots(exchange, meta, entry_tracker, history_tracker, analyzed_candles, storage, busy_symbols, available_exposure, candidates)
+
+
+def _size_signal_entries(sym, meta, entry_px, entry2_px, stop_real, available_exposure):
+    """
+    Dimensiona as entradas do sinal: respeita target loss e exposição disponível.
+    Retorna (qty_1ª, qty_2ª, notional_planejado) ou None se o risco por unidade for zero.
+    """
+    avg_entry = (entry_px + entry2_px) / 2
+    use_two_entries = ENTRY2_ALLOWED and ENTRY2_ENABLED
+    risk_per_unit = abs(avg_entry - stop_real) if use_two_entries else abs(entry_px - stop_real)
+    if risk_per_unit == 0:
+        return None
+    total_size = TARGET_LOSS_USD / risk_per_unit
+    limit_notional = min(available_exposure, MAX_SINGLE_POS_EXPOSURE)
+    anchor_entry = avg_entry if use_two_entries else entry_px
+    # Respeitar AMBOS: target loss E patrimônio. Usar o menor size para nunca exceder target loss.
+    size_for_cap = limit_notional / anchor_entry
+    total_size = min(total_size, size_for_cap)
+    if use_two_entries:
+        qty_first = total_size / 2
+        qty_second = total_size / 2
+    else:
+        qty_first = total_size
+        qty_second = 0
+    sz_dec = get_precision(meta, sym)
+    final_qty = round_sz(qty_first, sz_dec)
+    second_qty = round_sz(qty_second, sz_dec) if use_two_entries else 0
+    return final_qty, second_qty, total_size * anchor_entry
+
+def score_signal(sig, tf, entry_px, entry2_px, stop_real):
+    """
+    Score para disputar as vagas livres quando vários sinais fecham no mesmo loop.
+    score = SIGNAL_SCORE_RR_WEIGHT * risco/retorno (média ponderada dos alvos) + SIGNAL_SCORE_TF_WEIGHT * prioridade do TF (0..1).
+    """
+    use_two_entries = ENTRY2_ALLOWED and ENTRY2_ENABLED
+    anchor_entry = (entry_px + entry2_px) / 2 if use_two_entries else entry_px
+    risk = abs(anchor_entry - stop_real)
+    rr = 0.0
+    tech_base = sig.get("tech_base") or 0
+    if risk > 0 and tech_base > 0 and FIB_LEVELS:
+        if sig["side"] == "long":
+            start_px = sig.get("setup_high") or entry_px
+            reward = sum((start_px + tech_base * mult - anchor_entry) * pct for mult, pct in FIB_LEVELS)
+        else:
+            start_px = sig.get("setup_low") or entry_px
+            reward = sum((anchor_entry - (start_px - tech_base * mult)) * pct for mult, pct in FIB_LEVELS)
+        rr = reward / risk
 
-def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, user_state_cache, all_mids_cache, storage):
+    priority = SIGNAL_TF_PRIORITY or sorted(TIMEFRAMES, key=get_tf_seconds, reverse=True)
+    if tf in priority and len(priority) > 1:
+        tf_score = 1 - priority.index(tf) / (len(priority) - 1)
+    else:
+        tf_score = 1.0 if tf in priority else 0.0
+    return SIGNAL_SCORE_RR_WEIGHT * rr + SIGNAL_SCORE_TF_WEIGHT * tf_score
+
+def _fill_free_slots(exchange, meta, entry_tracker, history_tracker, analyzed_candles, storage, busy_symbols, available_exposure, candidates):
+    """
+    Fase 2 do scan: ordena os candidatos pelo score e envia as 1ªs entradas das vagas livres
+    (MAX_POSITIONS - ocupados) numa única ação bulk. Os demais recebem o aviso de limite.
+    Candidatos que ficam para o próximo loop são guardados em analyzed_candles[candle_id] (o
+    registro do candidato, não True): voltam ao ranking sem buscar os candles de novo.
+    """
+    # Um candidato por símbolo (o de maior score); os outros TFs ficam para o próximo loop
+    best_by_sym = {}
+    for c in candidates:
+        if c["sym"] not in best_by_sym or c["score"] > best_by_sym[c["sym"]]["score"]:
+            best_by_sym[c["sym"]] = c
+    for c in candidates:
+        if best_by_sym[c["sym"]] is not c:
+            analyzed_candles[c["candle_id"]] = c
+    ranked = sorted(best_by_sym.values(), key=lambda c: c["score"], reverse=True)
+    free_slots = max(MAX_POSITIONS - len(busy_symbols), 0)
+    if len(ranked) > 1:
+        logging.info("🏁 Ranking de sinais: " + " | ".join(f"{c['sym']} {c['tf']}={c['score']:.2f}" for c in ranked) + f" | Vagas: {free_slots}")
+
+    selected = []
+    for c in ranked:
+        sym, tf, sig = c["sym"], c["tf"], c["sig"]
+        entry_px, entry2_px, stop_real = c["entry_px"], c["entry2_px"], c["stop_real"]
+        sizes = _size_signal_entries(sym, meta, entry_px, entry2_px, stop_real, available_exposure) if available_exposure > 50 else None
+        if len(selected) < free_slots and sizes and sizes[0] * entry_px >= 10:
+            c["final_qty"], c["second_qty"], notional = sizes
+            available_exposure -= notional
+            selected.append(c)
+            tg_send(
+                f"📡 NOVO SINAL DE TRADE\n"
+                f"{sym} | TF {tf}\n"
+                f"Side: {sig['side'].upper()}\n"
+                f"1ª entrada: {entry_px:.4f}\n"
+                f"2ª entrada: {entry2_px:.4f}\n"
+                f"Stop: {stop_real:.4f}\n"
+                f"https://app.hyperliquid.xyz/trade/{sym}"
+            )
+            continue
+        if len(selected) < free_slots:
+            # Sem exposição disponível para este sinal: tenta de novo no próximo loop
+            analyzed_candles[c["candle_id"]] = c
+            continue
+
+        # Limite de trades simultâneos: bloqueia entrada mas notifica
+        final_qty = sizes[0] if sizes else 0
+        tg_send(
+            f"📡 NOVO SINAL DE TRADE\n"
+            f"🚫ENTRADA NÃO ACIONADA! (Limite de trades simultâneos)\n"
+            f"{sig['side'].upper()} {sym} | {tf}\n"
+            f"1ª entrada: {entry_px:.4f}\n"
+            f"2ª entrada: {entry2_px:.4f}\n"
+            f"Stop: {stop_real:.4f}\n"
+            f"https://app.hyperliquid.xyz/trade/{sym}\n"
+            f"Recomendação: Analise os trades ativos/pendentes e compare qual o melhor. Você também pode dividir o capital entre os trades."
+        )
+        btd = {
+            "symbol": sym, "tf": tf, "side": sig["side"],
+            "entry_px": entry_px, "entry2_px": entry2_px, "stop_real": stop_real,
+            "qty": final_qty, "reason": "limite_trades", "signal_ts": sig["signal_ts"],
+            "tech_base": sig.get("tech_base", 0), "setup_high": sig.get("setup_high", 0),
+            "setup_low": sig.get("setup_low", 0),
+            "target1_level": FIB_LEVELS[0][0] if FIB_LEVELS else 0.618,
+        }
+        if hasattr(storage, "save_blocked_trade"):
+            storage.save_blocked_trade(btd)
+        history_tracker.setdefault(sym, {})[tf] = sig["signal_ts"]
+        analyzed_candles[c["candle_id"]] = True
+    if hasattr(storage, "save_history_tracker") and len(selected) < len(ranked):
+        storage.save_history_tracker(history_tracker)
+
+    if not selected:
+        return
     try:
-        user_state = user_state_cache
-        positions = [
-            p["position"] for p in user_state.get("assetPositions", []) 
-            if float(p["position"]["szi"]) != 0
-        ]
+        placed = place_trade_entries(exchange, [(c["sym"], c["sig"]["side"], c["final_qty"], c["entry_px"]) for c in selected], traces=[c["trace"] for c in selected])
+    except Exception as e:
+        logging.error(f"❌ Erro lógica trade (batch de entradas): {e}")
+        for c in selected:
+            analyzed_candles[c["candle_id"]] = True
+        return
 
-        active_symbols = {p["coin"] for p in positions}
-        order_symbols = {o["coin"] for o in all_open_orders if not o["reduceOnly"]}
+    any_placed = False
+    for c, (res, trade_id) in zip(selected, placed):
+        sym, tf, sig = c["sym"], c["tf"], c["sig"]
+        analyzed_candles[c["candle_id"]] = True
+        if not res:
+            continue
+        # 1ª entrada: -0.618 (fixo). 2ª entrada (se permitido): -1.414. Apenas 2 entradas.
+        final_qty, second_qty = c["final_qty"], c["second_qty"]
+        tracker_data = {
+            'side': sig["side"],
+            'tf': tf,
+            'placed_at': time.time(),
+            'signal_ts': sig["signal_ts"] / 1000,
+            'planned_stop': c["stop_real"],
+            'tech_base': sig["tech_base"],
+            'setup_high': sig["setup_high"],
+            'setup_low': sig["setup_low"],
+            'entry_px': c["entry_px"],
+            'qty': final_qty,
+            'qty_entry_1': final_qty,  # 1ª entrada
+            'qty_entry_2': final_qty + second_qty,  # 1ª + 2ª (apenas se ENTRY2_ALLOWED e ENTRY2_ENABLED)
+            'trade_id': trade_id,
+            'pnl_realized': 0.0,
+            'lc': {"st": LC_PENDING, "e1": 0.0, "e2": 0.0, "t1": 0, "t2": 0},
+            'latency': c["trace"].to_record(),
+        }
+        record_signal_latency(storage, sym, tf, tracker_data['latency'])
+        if ENTRY2_ALLOWED and ENTRY2_ENABLED:
+            tracker_data['entry2_px'] = c["entry2_px"]
+            tracker_data['entry2_qty'] = second_qty
+            tracker_data['entry2_placed'] = False
+        else:
+            tracker_data['entry2_placed'] = True  # Bloqueia entrada 2
+        entry_tracker[sym] = tracker_data
+        history_tracker.setdefault(sym, {})[tf] = sig["signal_ts"]
+        busy_symbols.add(sym)
+        any_placed = True
+
+    if any_placed:
+        save_entry_tracker(storage, entry_tracker)
+        storage.save_history_tracker(history_tracker)
+        flush_storage(storage)  # ordens já estão no livro: o tracker não pode ficar só em memória
+        logging.info(f"⏱️ Latência sinal→ordem: {format_summary(latency_stats.summary())}")
+
+def record_signal_latency(storage, sym, tf, record):
+    """Guarda o registro de latência na janela do processo e em logs/latency/<user>.jsonl (resumo por nó)."""
+    record = {**record, "symbol": sym, "tf": tf}
+    latency_stats.add(record)
+    append_record(getattr(storage, "user_id", None) or "local", record)
+
+def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, user_state_cache, all_mids_cache, storage, snapshot=None, fills=None):
+    try:
+        snap = snapshot or LoopSnapshot(user_state_cache, all_open_orders, all_mids_cache)
+        lc_events, lc_touched = advance_lifecycles(entry_tracker, fills)
+        if lc_touched:
+            save_entry_tracker(storage, entry_tracker)
+        positions = snap.positions
+        active_symbols = snap.active_symbols
+        order_symbols = snap.order_symbols
         now = time.time()
+        cancels = CancelBatch(exchange)
 
         # Se o preço tocar no alvo 1, cancela ordens ativas (ex.: 2ª entrada pendente).
         # Com fib do 1º alvo = 0, o nível coincide com setup_high/setup_low e disparava
@@ -1318,7 +2027,7 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                 side = mem.get("side", "long")
                 if tech_base is None or tech_base <= 0:
                     continue
-                curr_price = float(all_mids_cache.get(sym, 0))
+                curr_price = snap.mid(sym)
                 if curr_price <= 0:
                     continue
                 cancel = False
@@ -1332,20 +2041,15 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                         cancel = True
                 if not cancel:
                     continue
-                for o in all_open_orders:
-                    if o["coin"] == sym and not o.get("reduceOnly"):
-                        try:
-                            exchange.cancel(sym, o["oid"])
-                            logging.info(f"⏹️ Ordem {sym} cancelada: preço atingiu alvo 1 ({target1_fib_cancel})")
-                        except Exception as e:
-                            logging.error(f"Erro ao cancelar ordem {sym}: {e}")
+                for o in snap.entry_orders(sym):
+                    cancels.add(sym, o["oid"], f"⏹️ Ordem {sym} cancelada: preço atingiu alvo 1 ({target1_fib_cancel})")
                 
                 mem["alvo1_cancel_done"] = True
                 if sym not in active_symbols:
                     entry_tracker.pop(sym, None)
-                    storage.save_entry_tracker(entry_tracker)
+                    save_entry_tracker(storage, entry_tracker)
                 else:
-                    storage.save_entry_tracker(entry_tracker)
+                    save_entry_tracker(storage, entry_tracker)
                     tg_send(
                         f"⏹️ Ordens canceladas (preço tocou alvo 1)\n"
                         f"{side.upper()} {sym} {mem.get('tf', '')}"
@@ -1354,17 +2058,13 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
         for sym in list(entry_tracker.keys()):
             if sym not in active_symbols and sym not in order_symbols:
                 logging.info(f"🧹 Trade encerrado detectado em {sym}. Cancelando ordens pendentes e removendo do tracker.")
-                for o in all_open_orders:
-                    if o["coin"] == sym:
-                        try:
-                            exchange.cancel(sym, o["oid"])
-                            logging.info(f"🧹 Ordem pendente cancelada (trade encerrado): {sym} oid={o.get('oid')}")
-                        except Exception as e:
-                            logging.error(f"Erro ao cancelar ordem {sym}: {e}")
+                for o in snap.orders(sym):
+                    cancels.add(sym, o["oid"], "🧹 Ordem pendente cancelada (trade encerrado)")
                 entry_tracker.pop(sym, None)
-                storage.save_entry_tracker(entry_tracker)
+                save_entry_tracker(storage, entry_tracker)
 
-        all_mids = all_mids_cache
+        # Alvo 1 + limpeza de trades encerrados: um único bulk cancel
+        cancels.flush()
 
         for pos in positions:
             sym = pos["coin"]
@@ -1374,26 +2074,17 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
             entry = float(pos["entryPx"])
             side = "long" if raw_size > 0 else "short"
             
-            # Só aplica detecção de entrada 1/2 para trades do bot (não manuais)
+            # Só aplica ciclo de vida (entrada 1/2) para trades do bot (não manuais)
             is_bot_trade = mem_data.get('tf') is not None and mem_data.get('origin') != 'MANUAL'
-            
-            # Identificação determinística baseada em qty esperado (apenas 2 entradas)
-            qty_entry_1 = mem_data.get('qty_entry_1')
-            qty_entry_2 = mem_data.get('qty_entry_2')
-            
-            # Tolerância para arredondamentos de precisão (0.1% ou mínimo 0.01)
-            def qty_matches(expected, actual):
-                if expected is None:
-                    return False
-                tolerance = max(expected * 0.001, 0.01)
-                return abs(actual - expected) <= tolerance
-            
-            # Verifica se o tamanho mudou para evitar detecções múltiplas
-            last_size = mem_data.get("last_size", 0)
-            size_changed = abs(size - last_size) > 0.001  # Tolerância mínima
-            
-            # Entrada 1 confirmada (apenas para trade do bot)
-            if is_bot_trade and qty_entry_1 and qty_matches(qty_entry_1, size) and (last_size == 0 or not qty_matches(qty_entry_1, last_size)):
+            sym_events = []
+            if is_bot_trade:
+                legacy_events, legacy_changed = advance_legacy_lifecycle(entry_tracker[sym], size)
+                if legacy_changed:
+                    save_entry_tracker(storage, entry_tracker)
+                sym_events = lc_events.get(sym, []) + legacy_events
+
+            # Entrada 1 confirmada (fills do cloid da 1ª entrada)
+            if LC_ENTRY1 in sym_events:
                 usd_value = size * entry
                 logging.info(f"🚀 ENTRADA 1 CONFIRMADA: {side.upper()} {sym} | Qty:{size:.2f} | Preço:{entry:.4f} | Valor: ${usd_value:.2f}")
                 tg_send(
@@ -1403,11 +2094,9 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                     f"Tamanho: {size:.2f}\n"
                     f"Valor: ${usd_value:.2f}"
                 )
-                entry_tracker[sym]["last_size"] = size
-                storage.save_entry_tracker(entry_tracker)
-            
-            # Entrada 2 confirmada (apenas para trade do bot; só dispara uma vez ao atingir qty_entry_2)
-            elif is_bot_trade and qty_entry_2 and qty_matches(qty_entry_2, size) and size_changed and (not qty_matches(qty_entry_1, size) if qty_entry_1 else True) and (not qty_matches(qty_entry_2, last_size) if last_size > 0 else True):
+
+            # Entrada 2 confirmada (fills do cloid da 2ª entrada; dispara uma vez na transição de estado)
+            if LC_ENTRY2 in sym_events:
                 usd_value = size * entry
                 logging.info(f"🚀 ENTRADA 2 CONFIRMADA: {side.upper()} {sym} | Qty:{size:.2f} | Preço:{entry:.4f} | Valor: ${usd_value:.2f}")
                 tg_send(
@@ -1418,21 +2107,18 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                     f"Valor: ${usd_value:.2f}"
                 )
                 
-                # Cancela SL/TP para recalcular
-                for o in all_open_orders:
-                    if o["coin"] == sym and o.get("reduceOnly", False):
-                        try:
-                            exchange.cancel(sym, o["oid"])
-                        except Exception as e:
-                            logging.error(f"Erro ao cancelar SL/TP {sym}: {e}")
-                
-                entry_tracker[sym]["last_size"] = size
-                storage.save_entry_tracker(entry_tracker)
-            curr_price = float(all_mids.get(sym, entry))
+                # Ajusta SL/TP existentes (batchModify) para o tamanho total e alvos pós-entrada 2
+                repriced = reprice_protection_after_entry2(exchange, meta, sym, side, size, entry, mem_data, snap, cancels)
+                if any(repriced.values()):
+                    flush_storage(storage)  # lc da entrada 2 gravado antes do próximo passo de risco
+                # Modify gera novos OIDs: o snapshot deste símbolo ficou desatualizado, gestão segue no próximo loop
+                if repriced.get("Stop"):
+                    continue
+            curr_price = snap.mid(sym, entry)
 
-            my_orders = [o for o in all_open_orders if o["coin"] == sym]
-            has_sl = any(is_stop_order(o) for o in my_orders)
-            has_tp = any((not o.get("isTrigger", False)) and o.get("reduceOnly", False) for o in my_orders)
+            my_orders = snap.orders(sym)
+            has_sl = snap.has_stop(sym)
+            has_tp = snap.has_tp(sym)
             
             mem_data = entry_tracker.get(sym, {})
             planned_stop = mem_data.get('planned_stop')
@@ -1445,6 +2131,9 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                 tech_base = None
 
             is_manual = (mem_data.get("tf") is None)
+            # Stop, TPs e 2ª entrada faltantes vão juntos numa única ação bulk (menos exposição sem proteção)
+            group_legs = []
+            on_leg_ok = {}
             if not has_sl and not is_manual:
                 logging.info(f"🛡️ Pânico: Posição sem Stop em {sym}! Colocando...")
                 stop_px = planned_stop if planned_stop else round_px(entry * (1 - FALLBACK_STOP_PCT) if side == "long" else entry * (1 + FALLBACK_STOP_PCT))
@@ -1457,71 +2146,62 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                         stop_qty = size + entry2_qty  # Quantidade total (entrada 1 + entrada 2)
                         logging.info(f"🛡️ Stop com proteção para 2 entradas: {stop_qty} (atual: {size} + futura: {entry2_qty})")
                 
-                exchange.order(sym, not (side=="long"), stop_qty, stop_px, {"trigger": {"triggerPx": stop_px, "isMarket": True, "tpsl": "sl"}}, reduce_only=True)
-                if sym in entry_tracker:
-                    entry_tracker[sym]['planned_stop'] = stop_px
-                    storage.save_entry_tracker(entry_tracker)
+                group_legs.append(("Stop", _order_request(sym, not (side=="long"), stop_qty, stop_px, {"trigger": {"triggerPx": stop_px, "isMarket": True, "tpsl": "sl"}}, reduce_only=True)))
+
+                def _stop_ok(stop_px=stop_px):
+                    if sym in entry_tracker:
+                        entry_tracker[sym]['planned_stop'] = stop_px
+                on_leg_ok["Stop"] = _stop_ok
             
             if not has_tp and not is_manual:
                 logging.info(f"💰 Posição sem TP em {sym}. Colocando Fibs...")
                 sz_dec = get_precision(meta, sym)
-
-                if tech_base and setup_high and setup_low:
-                    base_to_use = tech_base
-
-                    if side == "long":
-                        anchor = setup_high
-                    else:
-                        anchor = setup_low
-
-                    logging.info(f"📐 Fibs técnicos | Base={base_to_use:.4f} | Anchor={anchor}")
-                else:
-                    base_to_use = abs(entry * FALLBACK_STOP_PCT)
-                    anchor = entry
-                    logging.warning(f"⚠️ Fallback Fib para {sym}")
-
-                qty_entry_2 = mem_data.get('qty_entry_2')
-                qty_entry_1 = mem_data.get('qty_entry_1')
-                entry2_qty = mem_data.get('entry2_qty', 0) or 0
-                def _qty_matches(exp, act):
-                    if exp is None: return False
-                    tol = max(exp * 0.001, 0.01)
-                    return abs(act - exp) <= tol
-                # Só considera entrada 2 preenchida se realmente há entrada 2 (entry2_qty > 0)
-                # e o tamanho da posição atingiu qty_entry_2 (1ª + 2ª)
-                has_entry2 = entry2_qty > 0 and qty_entry_2 and qty_entry_1 and qty_entry_2 > qty_entry_1
-                entry2_filled = bool(has_entry2 and _qty_matches(qty_entry_2, abs(size)))
-                place_fib_tps(exchange, sym, side, entry, None, abs(size), sz_dec, custom_base=base_to_use, anchor_px=anchor, entry2_filled=entry2_filled)
+                base_to_use, anchor = _tp_base_and_anchor(mem_data, side, entry, sym)
+                entry2_filled = _entry2_filled(mem_data)
+                group_legs += build_fib_tp_legs(sym, side, entry, None, abs(size), sz_dec, custom_base=base_to_use, anchor_px=anchor, entry2_filled=entry2_filled)
 
             # Segunda entrada (limit) no nível fib da 2ª entrada (Pro/Satoshi, se ativada)
             if not is_manual and not mem_data.get('entry2_placed', True):
                 if mem_data.get("pnl_realized", 0) > 0:
                     entry_tracker[sym]['entry2_placed'] = True
-                    storage.save_entry_tracker(entry_tracker)
+                    save_entry_tracker(storage, entry_tracker)
                     logging.info(f"🚫 2ª entrada bloqueada em {sym}: PnL já realizado (TP parcial).")
                 else:
                     entry2_px = mem_data.get('entry2_px')
                     entry2_qty = mem_data.get('entry2_qty')
                     if entry2_px is not None and entry2_qty and entry2_qty > 0:
-                        my_add_orders = [o for o in my_orders if not o.get("reduceOnly") and not o.get("isTrigger", False)]
+                        my_add_orders = [o for o in snap.entry_orders(sym) if not o.get("isTrigger", False)]
                         if my_add_orders:
                             entry_tracker[sym]['entry2_placed'] = True
-                            storage.save_entry_tracker(entry_tracker)
+                            save_entry_tracker(storage, entry_tracker)
                             logging.info(f"📥 2ª entrada já existente em {sym} (ordem limit ativa). Marcando como colocada.")
                         else:
-                            try:
-                                is_buy_add = (side == "long")
-                                trade_id = mem_data.get('trade_id', sym)
-                                client_oid = f"{trade_id}_{int(time.time()*1000)}".replace(" ", "_").replace("-", "_")
-                                exchange.order(sym, is_buy_add, entry2_qty, round_px(entry2_px), {"limit": {"tif": "Gtc"}, "clientOrderId": client_oid}, reduce_only=False)
-                                logging.info(f"📥 2ª entrada pendente: {sym} @ {entry2_px} qty {entry2_qty} | oid={client_oid}")
+                            is_buy_add = (side == "long")
+                            trade_id = mem_data.get('trade_id')
+                            client_oid = make_cloid(trade_id, ROLE_ENTRY2) if trade_id else None
+                            group_legs.append(("Entrada 2", _order_request(sym, is_buy_add, entry2_qty, round_px(entry2_px), {"limit": {"tif": "Gtc"}}, reduce_only=False, cloid=client_oid)))
+
+                            def _entry2_ok(entry2_px=entry2_px, entry2_qty=entry2_qty, client_oid=client_oid):
+                                logging.info(f"📥 2ª entrada pendente: {sym} @ {entry2_px} qty {entry2_qty} | cloid={client_oid}")
                                 entry_tracker[sym]['entry2_placed'] = True
-                                storage.save_entry_tracker(entry_tracker)
-                            except Exception as e:
-                                logging.error(f"Erro ao colocar 2ª entrada {sym}: {e}")
+                            on_leg_ok["Entrada 2"] = _entry2_ok
+
+            if group_legs:
+                tracker_changed = False
+                for label, st in submit_order_group(exchange, group_legs):
+                    if not order_leg_ok(st):
+                        continue
+                    if label in on_leg_ok:
+                        on_leg_ok[label]()
+                        tracker_changed = True
+                    elif label.startswith("TP"):
+                        logging.info(f"🎯 {label}")
+                if tracker_changed and sym in entry_tracker:
+                    save_entry_tracker(storage, entry_tracker)
+                flush_storage(storage)  # stop/TPs/2ª entrada no livro: o tracker não pode ficar só em memória
 
             pnl_pct = (curr_price - entry) / entry if side == "long" else (entry - curr_price) / entry
-            sl_order = next((o for o in my_orders if is_stop_order(o)), None)
+            sl_order = next(iter(snap.stop_orders(sym)), None)
             
             if sl_order and tech_base and not is_manual:
                 base = tech_base
@@ -1572,23 +2252,10 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                             )
 
                 if new_sl:
-                    # Cancela o SL antigo
-                    exchange.cancel(sym, sl_order["oid"])
                     new_sl = round_px(new_sl)
-
-                    # Ao mover para breakeven, cancelamos qualquer ordem de 2ª entrada pendente
-                    # (ordens adicionais não-reduceOnly) para este símbolo
-                    for o in my_orders:
-                        try:
-                            if o["coin"] == sym and not o.get("reduceOnly", False) and not o.get("isTrigger", False):
-                                exchange.cancel(sym, o["oid"])
-                        except Exception as e:
-                            logging.error(f"Erro ao cancelar ordem de entrada extra em {sym} ao mover para BE: {e}")
-
                     # Usa apenas a quantidade atual da posição para o novo stop
                     stop_qty = abs(size)
-
-                    exchange.order(
+                    stop_req = _order_request(
                         sym,
                         False if side == "long" else True,
                         stop_qty,
@@ -1596,50 +2263,29 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                         {"trigger": {"triggerPx": new_sl, "isMarket": True, "tpsl": "sl"}},
                         reduce_only=True,
                     )
-                    if sym in entry_tracker:
+                    # Move o SL com batchModify (sem janela sem stop); fallback cancel + novo stop se rejeitado
+                    stop_moved = replace_orders(exchange, [("Stop BE", sl_order["oid"], stop_req)], cancels, snap).get("Stop BE", False)
+
+                    # Ao mover para breakeven, cancelamos qualquer ordem de 2ª entrada pendente
+                    # (ordens adicionais não-reduceOnly) para este símbolo
+                    for o in snap.entry_orders(sym):
+                        if not o.get("isTrigger", False):
+                            cancels.add(sym, o["oid"])
+                    cancels.flush()
+
+                    if stop_moved and sym in entry_tracker:
                         entry_tracker[sym]["planned_stop"] = new_sl
                         entry_tracker[sym]["breakeven_moved"] = True
                         # Marca entrada 2 como desativada para este trade
                         entry_tracker[sym]["entry2_placed"] = True
                         entry_tracker[sym]["entry2_qty"] = 0
-                        storage.save_entry_tracker(entry_tracker)
-
-            # Atualiza last_size apenas se mudou significativamente (para manter estado sincronizado)
-            if sym in entry_tracker:
-                current_last_size = entry_tracker[sym].get("last_size", 0)
-                if abs(size - current_last_size) > 0.001:  # Tolerância mínima
-                    entry_tracker[sym]["last_size"] = size
-                    storage.save_entry_tracker(entry_tracker)
-            
-            # Detecta trade manual apenas se não há ordens pendentes do bot para este símbolo
+                        save_entry_tracker(storage, entry_tracker)
+                        flush_storage(storage)  # breakeven persistido já (não reabre a 2ª entrada num restart)
+
+            # Detecta trade manual apenas se não há ordens pendentes do bot para este símbolo.
+            # Trades acionados no site (execute-blocked-trade) chegam via merge do bot_tracker no loop principal.
             if sym not in entry_tracker:
-                # Antes de marcar como manual: recarrega do storage. Pode ser trade acionado via
-                # execute-blocked-trade (site) que já está em bot_tracker com tf, etc.
-                fresh_tracker = storage.get_entry_tracker() if hasattr(storage, "get_entry_tracker") else {}
-                if sym in fresh_tracker:
-                    stored = fresh_tracker[sym]
-                    # Tem tf ou estrutura de trade do bot (entry_px, planned_stop) = não é manual
-                    if stored.get("tf") or stored.get("entry_px") or stored.get("planned_stop"):
-                        entry_tracker[sym] = dict(stored)
-                        entry_tracker[sym]["last_size"] = size
-                        entry_tracker[sym]["entry"] = entry
-                        entry_tracker[sym]["entry_px"] = entry
-                        storage.save_entry_tracker(entry_tracker)
-                        continue  # Não é manual, já tratado
-
-                has_bot_orders = False
-                for o in my_orders:
-                    if o["coin"] == sym:
-                        client_oid = str(o.get("clientOrderId", "")).lower()
-                        # Padrões de ordens do bot: trade_id, TP1, TP2
-                        if any(pattern in client_oid for pattern in ["tp1", "tp2", "tp1_", "tp2_"]):
-                            has_bot_orders = True
-                            break
-                        # Verifica se o clientOrderId começa com um padrão conhecido de trade_id
-                        # trade_id geralmente é "SYMBOL-timestamp"
-                        if sym.lower() in client_oid and any(char.isdigit() for char in client_oid):
-                            has_bot_orders = True
-                            break
+                has_bot_orders = any(is_bot_cloid(o.get("cloid")) for o in my_orders)
                 
                 # Só considera manual se não há ordens pendentes do bot
                 if not has_bot_orders:
@@ -1661,7 +2307,10 @@ def auto_manage(info, exchange, wallet, meta, entry_tracker, all_open_orders, us
                         "opened_at": time.time(),
                         "pnl_realized": 0.0
                     }
-                    storage.save_entry_tracker(entry_tracker)
+                    save_entry_tracker(storage, entry_tracker)
+
+        # Cancelamentos acumulados no loop de posições (ex.: SL/TP após entrada 2)
+        cancels.flush()
     except Exception as e:
         logging.error(f"Erro gestão: {e}")
         return
@@ -1756,21 +2405,59 @@ def run_main_loop(info, exchange, wallet, storage, config_overrides=None):
         if g.get("TIMEFRAMES") is None:
             g["TIMEFRAMES"] = []
 
-    exchange_meta = info.meta() or {}
+    if FAST_SIGNING:
+        # Assinatura EIP-712 com domain/type hash pré-computados (conferida com o SDK antes de trocar)
+        install_fast_l1_signing()
+    # Meta indexado por coin e atualizado em background (novas listagens sem reiniciar)
+    exchange_meta = get_market_meta(getattr(info, "base_url", BASE_URL), fetch=info.meta)
     entry_tracker = storage.get_entry_tracker()
     history_tracker = storage.get_history_tracker()
     logging.info(f"Memória carregada: {len(entry_tracker)} ordens.")
     analyzed_candles = {}
     last_history_sync = 0
+    # Fills de entrada que aconteceram com o bot parado são reaplicados desde o trade mais antigo em aberto
+    open_since = [m.get("placed_at") for m in entry_tracker.values() if isinstance(m, dict) and m.get("placed_at")]
+    if open_since:
+        request_fill_replay(int(min(open_since) * 1000))
+    new_fills = []
     last_lsr_global_update = 0
+    mirror = AccountMirror(getattr(info, "base_url", BASE_URL), wallet) if ACCOUNT_MIRROR else None
+    start_tracker_feed(storage)
 
     try:
         while True:
             loop_start = time.time()
+            loop_reads.begin()
+            history_due = time.time() - last_history_sync > 20
+            loop_fills = None
+            # Fills antes do snapshot: a posição lida abaixo já reflete todo fill recebido.
+            # Acumulam até o auto_manage rodar (erro de API no snapshot não perde fills).
+            # Uma busca REST por loop (cursor do histórico), usada pelo ciclo de vida e pelo sync.
             try:
-                all_open_orders = info.frontend_open_orders(wallet) or []
-                user_state_cache = info.user_state(wallet) or {}
-                all_mids_cache = info.all_mids() or {}
+                if mirror:
+                    # Fills chegam pelo WS; após reconexão a busca REST cobre a lacuna
+                    resynced = mirror.ensure_connected(info)
+                    new_fills += mirror.drain_fills()
+                    fetch_fills = resynced or history_due
+                else:
+                    fetch_fills = history_due or lifecycle_awaiting_fills(entry_tracker)
+                if fetch_fills:
+                    loop_fills = fetch_loop_fills(info, wallet, storage)
+                    new_fills += loop_fills
+
+                if mirror:
+                    if mirror.needs_resync():
+                        mirror.resync(info)
+                    all_open_orders, user_state_cache, all_mids_cache = mirror.read()
+                    state_as_of = mirror.state_as_of
+                else:
+                    state_as_of = time.time()
+                    all_open_orders = info.frontend_open_orders(wallet) or []
+                    user_state_cache = info.user_state(wallet) or {}
+                    all_mids_cache = info.all_mids() or {}
+                loop_reads.put("open_orders", all_open_orders, as_of=state_as_of)
+                loop_reads.put("user_state", user_state_cache, as_of=state_as_of)
+                loop_reads.put("mids", all_mids_cache, as_of=state_as_of)
             
             except Exception as e:
                 if "429" in str(e):
@@ -1783,8 +2470,8 @@ def run_main_loop(info, exchange, wallet, storage, config_overrides=None):
 
             _merge_tracker_db_into_memory(entry_tracker, storage)
 
-            if time.time() - last_history_sync > 20:
-                sync_trade_history(info, wallet, entry_tracker, history_tracker, storage)
+            if loop_fills is not None:
+                sync_trade_history(info, wallet, entry_tracker, history_tracker, storage, fills=loop_fills)
                 last_history_sync = time.time()
 
             if time.time() - last_lsr_global_update > LSR_UPDATE_INTERVAL:
@@ -1821,25 +2508,40 @@ def run_main_loop(info, exchange, wallet, storage, config_overrides=None):
                 strength_block_cache["blocked_shorts"] = blocked_shorts
                 strength_block_cache["last_update"] = time.time()
 
-            auto_manage(info, exchange, wallet, exchange_meta, entry_tracker, all_open_orders, user_state_cache, all_mids_cache, storage)
-            manage_risk_and_scan(info, exchange, wallet, exchange_meta, entry_tracker, all_open_orders, history_tracker, analyzed_candles, user_state_cache, all_mids_cache, storage)
+            # Índice por coin/tipo montado uma vez e compartilhado pelas funções do loop
+            snapshot = LoopSnapshot(user_state_cache, all_open_orders, all_mids_cache)
+            auto_manage(info, exchange, wallet, exchange_meta, entry_tracker, all_open_orders, user_state_cache, all_mids_cache, storage, snapshot=snapshot, fills=new_fills)
+            new_fills = []
+            manage_risk_and_scan(info, exchange, wallet, exchange_meta, entry_tracker, all_open_orders, history_tracker, analyzed_candles, user_state_cache, all_mids_cache, storage, snapshot=snapshot)
                 
             # LIMPA CANDLES NO FIM DO LOOP
             if len(analyzed_candles) > 1000:
                 analyzed_candles.clear()
             elapsed = time.time() - loop_start
-            time.sleep(max(1, 30 - elapsed)) # Fez em 5 dorme 25
+            if mirror:
+                # Acorda antes dos 30s se chegar fill ou ordem mudar de status (stop/TP executado)
+                mirror.wait(max(1, 30 - elapsed))
+                time.sleep(max(0, MIRROR_MIN_LOOP_SECONDS - (time.time() - loop_start)))
+            else:
+                time.sleep(max(1, 30 - elapsed)) # Fez em 5 dorme 25
 
     except KeyboardInterrupt:
         logging.info("Parado.")
     except Exception as e:
         logging.error(f"Erro Crítico: {e}", exc_info=True)
+    finally:
+        if mirror:
+            mirror.stop()
+        stop_tracker_feed()
+        flush_storage(storage)
 
 
 def main():
     """Entrypoint modo local/online: usa .env e storage (JSON ou Supabase)."""
     try:
         storage = get_storage()
+        if storage_metrics_enabled():
+            storage = InstrumentedStorage(storage)
         info, exchange, wallet = setup_client()
         register_process()
         load_config(storage)
@@ -61,6 +61,9 @@ class BotEngine:
             "ENTRY2_ENABLED": self.config.entry2_enabled,
             "ENTRY2_ALLOWED": self.config.entry2_allowed,
             "SIGNAL_MODE": self.config.signal_mode,
+            "SIGNAL_SCORE_RR_WEIGHT": self.config.signal_score_rr_weight,
+            "SIGNAL_SCORE_TF_WEIGHT": self.config.signal_score_tf_weight,
+            "SIGNAL_TF_PRIORITY": self.config.signal_tf_priority,
         }
 
     def run(self, info, exchange, wallet_addr):
@@ -36,6 +36,11 @@ class BotConfig:
     max_single_pos_exposure: float = 2500.0
     max_positions: int = 2
     fallback_stop_pct: float = 0.005
+
+    # Ranking de sinais: vários sinais no mesmo fechamento disputam as vagas livres
+    signal_score_rr_weight: float = 1.0
+    signal_score_tf_weight: float = 0.25
+    signal_tf_priority: List[str] = field(default_factory=list)  # vazio = TFs maiores primeiro
     
     # Indicators
     rsi_period: int = 14
@@ -10,8 +10,9 @@ from hyperliquid.exchange import Exchange
 
 from engine.config import BotConfig
 from engine.bot_engine import BotEngine
-from storage import get_storage
+from storage import InstrumentedStorage, get_storage, storage_metrics_enabled
 from storage.user_storage import UserStorage
+from storage.write_behind import WriteBehindStorage
 from utils.telegram import TelegramClient
 from utils.logging import setup_user_logger
 from auth.encryption import EncryptionManager
@@ -31,6 +32,7 @@ class BotInstance:
         self.logger = setup_user_logger(user_id)
         self.config = None
         self.storage = None
+        self._backend = None
         self.telegram = None
         self.info = None
         self.exchange = None
@@ -55,8 +57,13 @@ class BotInstance:
                 return
             
             # 3. Cria storage com user_id
-            backend_storage = get_storage()
-            self.storage = UserStorage(self.user_id, backend_storage)
+            self.storage = UserStorage(self.user_id, self._backend_storage())
+            if storage_metrics_enabled():
+                # Latência/bytes por método do storage real (abaixo do write-behind)
+                self.storage = InstrumentedStorage(self.storage, self.user_id)
+            if os.getenv("BOT_WRITE_BEHIND", "0") == "1":
+                # Gravações do tracker/history saem do loop (thread em background)
+                self.storage = WriteBehindStorage(self.storage)
             
             # 4. Cria Telegram client
             self.telegram = TelegramClient(self.user_id, self.storage)
@@ -181,14 +188,18 @@ class BotInstance:
         self.running = False
         # TODO: Implementar sinalização de parada para o engine
     
+    def _backend_storage(self):
+        """Backend de storage da instância (um só para config, credenciais, plano e o engine)."""
+        if self._backend is None:
+            self._backend = get_storage()
+        return self._backend
+
     def _get_user_plan(self) -> str:
         """Retorna o plano do usuário (basic, pro, satoshi)."""
         try:
-            backend = get_storage()
-            if hasattr(backend, '_client') and backend._client:
-                r = backend._client.table("users").select("subscription_tier").eq("id", self.user_id).limit(1).execute()
-                if r.data and r.data[0].get("subscription_tier"):
-                    return (r.data[0]["subscription_tier"] or "basic").lower()
+            backend = self._backend_storage()
+            if hasattr(backend, 'get_subscription_tier'):
+                return backend.get_subscription_tier(self.user_id) or "basic"
         except Exception as e:
             self.logger.warning(f"Erro ao buscar plano: {e}")
         return "basic"
@@ -196,7 +207,7 @@ class BotInstance:
     def _load_user_config(self) -> dict:
         """Carrega configuração do usuário do banco."""
         try:
-            backend = get_storage()
+            backend = self._backend_storage()
             if hasattr(backend, 'get_user_config'):
                 return backend.get_user_config(self.user_id)
             
@@ -215,7 +226,7 @@ class BotInstance:
     def _load_credentials(self) -> dict:
         """Carrega e descriptografa credenciais do usuário."""
         try:
-            backend = get_storage()
+            backend = self._backend_storage()
             if hasattr(backend, '_client') and backend._client:
                 from storage.supabase_storage import TABLE_TRADES
                 # Busca em trading_accounts
@@ -0,0 +1,22 @@
+-- Migration: Estado de sincronização do bot por usuário
+-- fills_cursor_ms: até onde (timestamp ms dos fills na Hyperliquid) o histórico já foi sincronizado.
+-- O bot busca só fills a partir daí (userFillsByTime), com uma janela de sobreposição.
+
+CREATE TABLE IF NOT EXISTS bot_sync_state (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    fills_cursor_ms BIGINT,
+    updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- RLS
+ALTER TABLE bot_sync_state ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS bot_sync_state_user_policy ON bot_sync_state;
+CREATE POLICY bot_sync_state_user_policy ON bot_sync_state
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Service role pode fazer tudo (backend/bot)
+DROP POLICY IF EXISTS "Service role full access bot_sync_state" ON bot_sync_state;
+CREATE POLICY "Service role full access bot_sync_state"
+    ON bot_sync_state FOR ALL
+    USING (auth.role() = 'service_role');
@@ -0,0 +1,6 @@
+-- Migration: Índice para leitura paginada de trades_database
+-- O bot e o dashboard leem o histórico em páginas ordenadas por (closed_at, id), continuando
+-- depois da última linha da página anterior (keyset). O índice cobre filtro + ordem.
+
+CREATE INDEX IF NOT EXISTS idx_trades_database_user_closed_id
+    ON trades_database(user_id, closed_at, id);
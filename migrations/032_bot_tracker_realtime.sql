@@ -0,0 +1,13 @@
+-- Migration: bot_tracker no Supabase Realtime
+-- Com BOT_TRACKER_FEED=1 o bot assina inserts/updates do próprio bot_tracker (ex.: trade acionado
+-- no site via execute-blocked-trade) em vez de reler a tabela inteira a cada loop.
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_publication_tables
+        WHERE pubname = 'supabase_realtime' AND schemaname = 'public' AND tablename = 'bot_tracker'
+    ) THEN
+        ALTER PUBLICATION supabase_realtime ADD TABLE bot_tracker;
+    END IF;
+END $$;
@@ -0,0 +1,117 @@
+"""
+Benchmark de assinaturas EIP-712 por segundo (ações L1 de ordem da Hyperliquid).
+Compara: SDK (encode_typed_data a cada ordem) e utils.signer pré-computado, assinando
+ordens de várias contas, e confere que as assinaturas são idênticas.
+
+--procs N repete o cenário pré-computado em N processos simultâneos, como na frota (o
+InstanceManager roda um processo por usuário): mostra o total de assinaturas/s da máquina e
+quanto escala em relação a 1 processo. É esse modelo que espalha a assinatura pelos núcleos;
+o bot não tem pool de assinatura próprio.
+
+Execute a partir da raiz do projeto:
+  python scripts/bench_signing.py
+  python scripts/bench_signing.py --accounts 200 --orders 2000
+  python scripts/bench_signing.py --procs 4
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from eth_account import Account  # noqa: E402
+from hyperliquid.utils import signing as sdk_signing  # noqa: E402
+
+from utils import signer  # noqa: E402
+
+
+def _order_action(rnd: random.Random) -> dict:
+    px = round(rnd.uniform(10, 60000), 1)
+    return {
+        "type": "order",
+        "orders": [{"a": rnd.randint(0, 50), "b": rnd.random() < 0.5, "p": str(px), "s": "0.1", "r": False,
+                    "t": {"limit": {"tif": "Gtc"}}}],
+        "grouping": "na",
+    }
+
+
+def _rate(n: int, seconds: float) -> str:
+    return f"{n / seconds:,.0f} assinaturas/s ({seconds * 1000 / n:.2f} ms cada)"
+
+
+def _jobs(accounts: int, orders: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    wallets = [Account.create() for _ in range(accounts)]
+    nonce0 = int(time.time() * 1000)
+    return [
+        (rnd.choice(wallets), _order_action(rnd), None, nonce0 + i, None, True)
+        for i in range(orders)
+    ]
+
+
+def _sign_worker(accounts: int, orders: int, seed: int, barrier, results) -> None:
+    """Um 'usuário' da frota: contas e ordens próprias, assinatura pré-computada."""
+    jobs = _jobs(accounts, orders, seed)
+    barrier.wait()
+    for j in jobs:
+        signer.sign_l1_action(*j)
+    results.put(time.perf_counter())
+
+
+def _bench_processes(procs: int, accounts: int, orders: int, seed: int) -> float:
+    """Assinaturas/s somadas de `procs` processos assinando ao mesmo tempo."""
+    ctx = multiprocessing.get_context()
+    barrier = ctx.Barrier(procs + 1)
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_sign_worker, args=(accounts, orders, seed + i, barrier, results))
+        for i in range(procs)
+    ]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    t0 = time.perf_counter()
+    end = max(results.get() for _ in workers)
+    for w in workers:
+        w.join()
+    return procs * orders / (end - t0)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de assinatura EIP-712 (ordens Hyperliquid)")
+    parser.add_argument("--accounts", type=int, default=50, help="Nº de contas distintas")
+    parser.add_argument("--orders", type=int, default=500, help="Nº de ordens a assinar por cenário")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--procs", type=int, default=0, help="Nº de processos simultâneos (0 = só o cenário de 1 processo)")
+    args = parser.parse_args()
+
+    jobs = _jobs(args.accounts, args.orders, args.seed)
+
+    t0 = time.perf_counter()
+    expected = [sdk_signing.sign_l1_action(*j) for j in jobs]
+    print(f"SDK sign_l1_action:         {_rate(len(jobs), time.perf_counter() - t0)}")
+
+    t0 = time.perf_counter()
+    fast = [signer.sign_l1_action(*j) for j in jobs]
+    print(f"utils.signer pré-computado: {_rate(len(jobs), time.perf_counter() - t0)}")
+    if fast != expected:
+        print("❌ Assinaturas divergentes do SDK")
+        return 1
+
+    if args.procs > 0:
+        single = _bench_processes(1, args.accounts, args.orders, args.seed)
+        total = _bench_processes(args.procs, args.accounts, args.orders, args.seed)
+        print(
+            f"{args.procs} processos (1 por usuário): {total:,.0f} assinaturas/s no total "
+            f"({total / single:.1f}x de 1 processo, {os.cpu_count()} núcleos)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
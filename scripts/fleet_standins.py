@@ -0,0 +1,624 @@
+"""
+Dublês locais (stand-ins) usados pelo harness de carga da frota (scripts/load_test_fleet.py).
+Simulam Supabase (tabelas em memória), Hyperliquid (Info/Exchange com conta simulada)
+e Binance (klines + LSR), contando cada requisição que sairia para a rede.
+Nada aqui é usado em produção.
+"""
+import itertools
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Optional
+
+# Contadores de requisições "externas" do processo atual (cada filho tem a sua cópia após o fork)
+REQUEST_COUNTS: Counter = Counter()
+_counts_lock = threading.Lock()
+
+
+def count_request(category: str, name: str) -> None:
+    """Registra uma requisição de saída (categoria = hl_info, hl_exchange, supabase, binance, telegram)."""
+    with _counts_lock:
+        REQUEST_COUNTS[category] += 1
+        REQUEST_COUNTS[f"{category}.{name}"] += 1
+
+
+# ---------------------------------------------------------------------------
+# Supabase (PostgREST) em memória
+# ---------------------------------------------------------------------------
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """Subconjunto do query builder do supabase-py (select/insert/upsert/update/delete + filtros)."""
+
+    def __init__(self, db: "FakeSupabase", table: str):
+        self._db = db
+        self._table = table
+        self._op = "select"
+        self._columns = "*"
+        self._payload = None
+        self._on_conflict = None
+        self._filters = []
+        self._order = []
+        self._limit = None
+        self._range = None
+
+    # Operações
+    def select(self, columns: str = "*", **_kwargs):
+        self._op, self._columns = "select", columns
+        return self
+
+    def insert(self, payload, **_kwargs):
+        self._op, self._payload = "insert", payload
+        return self
+
+    def upsert(self, payload, on_conflict: str = None, **_kwargs):
+        self._op, self._payload, self._on_conflict = "upsert", payload, on_conflict
+        return self
+
+    def update(self, payload, **_kwargs):
+        self._op, self._payload = "update", payload
+        return self
+
+    def delete(self, **_kwargs):
+        self._op = "delete"
+        return self
+
+    # Filtros
+    def eq(self, col, val):
+        self._filters.append(lambda r: r.get(col) == val)
+        return self
+
+    def neq(self, col, val):
+        self._filters.append(lambda r: r.get(col) != val)
+        return self
+
+    def in_(self, col, vals):
+        vals = set(vals)
+        self._filters.append(lambda r: r.get(col) in vals)
+        return self
+
+    def gt(self, col, val):
+        self._filters.append(lambda r: r.get(col) is not None and r.get(col) > val)
+        return self
+
+    def gte(self, col, val):
+        self._filters.append(lambda r: r.get(col) is not None and r.get(col) >= val)
+        return self
+
+    def lt(self, col, val):
+        self._filters.append(lambda r: r.get(col) is not None and r.get(col) < val)
+        return self
+
+    def lte(self, col, val):
+        self._filters.append(lambda r: r.get(col) is not None and r.get(col) <= val)
+        return self
+
+    def is_(self, col, val):
+        self._filters.append(lambda r: _is_match(r.get(col), str(val)))
+        return self
+
+    def or_(self, expr: str):
+        """Árvore lógica do PostgREST (ex.: 'a.gt.1,and(a.eq.1,id.gt.5),a.is.null')."""
+        self._filters.append(_parse_logic("or", expr))
+        return self
+
+    def order(self, col, desc: bool = False, **_kwargs):
+        self._order.append((col, desc))
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def _project(self, row: dict) -> dict:
+        if self._columns.strip() == "*":
+            return dict(row)
+        out = {}
+        for col in (c.strip() for c in self._columns.split(",") if c.strip()):
+            # "alias:coluna->chave" / "coluna->>chave" (JSONB), como o PostgREST
+            alias, _, path = col.rpartition(":")
+            parts = [p.strip() for p in path.replace("->>", "->").split("->")]
+            value = row.get(parts[0])
+            for key in parts[1:]:
+                value = value.get(key) if isinstance(value, dict) else None
+            out[alias.strip() or parts[-1]] = value
+        return out
+
+    def execute(self):
+        count_request("supabase", f"{self._table}.{self._op}")
+        return self._db._execute(self)
+
+
+def _split_top_level(expr: str) -> list:
+    """Separa por vírgulas fora de parênteses e aspas."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(expr):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _coerce(row_value, text: str):
+    """Valor do filtro no tipo da coluna (números comparam como números, o resto como texto)."""
+    if isinstance(row_value, (int, float)) and not isinstance(row_value, bool):
+        try:
+            return float(text)
+        except ValueError:
+            return text
+    return text
+
+
+def _is_match(value, text: str) -> bool:
+    text = text.lower()
+    if text == "null":
+        return value is None
+    if text in ("true", "false"):
+        return value is (text == "true")
+    return False
+
+
+_COMPARE = {
+    "eq": lambda a, b: a == b,
+    "neq": lambda a, b: a != b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _parse_condition(term: str):
+    if term.startswith(("and(", "or(")) and term.endswith(")"):
+        op, _, inner = term.partition("(")
+        return _parse_logic(op, inner[:-1])
+    col, op, text = term.split(".", 2)
+    if text.startswith('"') and text.endswith('"'):
+        text = text[1:-1]
+    if op == "is":
+        return lambda r: _is_match(r.get(col), text)
+    if op == "in":
+        vals = [v.strip().strip('"') for v in text.strip("()").split(",")]
+        return lambda r: r.get(col) is not None and r.get(col) in [_coerce(r.get(col), v) for v in vals]
+    compare = _COMPARE[op]
+    return lambda r: r.get(col) is not None and compare(r.get(col), _coerce(r.get(col), text))
+
+
+def _parse_logic(op: str, expr: str):
+    conditions = [_parse_condition(term) for term in _split_top_level(expr)]
+    combine = all if op == "and" else any
+    return lambda r: combine(cond(r) for cond in conditions)
+
+
+class FakeSupabase:
+    """Cliente Supabase em memória com a mesma interface encadeada (table(...).select(...).eq(...).execute())."""
+
+    def __init__(self):
+        self.tables: dict[str, list[dict]] = defaultdict(list)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _Query:
+        return _Query(self, name)
+
+    def _matches(self, q: _Query, row: dict) -> bool:
+        return all(f(row) for f in q._filters)
+
+    def _execute(self, q: _Query) -> _Result:
+        with self._lock:
+            rows = self.tables[q._table]
+            if q._op == "select":
+                out = [r for r in rows if self._matches(q, r)]
+                for col, desc in reversed(q._order):
+                    out.sort(key=lambda r: (r.get(col) is None, r.get(col)), reverse=desc)
+                if q._range:
+                    out = out[q._range[0]:q._range[1] + 1]
+                if q._limit is not None:
+                    out = out[:q._limit]
+                return _Result([q._project(r) for r in out])
+            payload = q._payload if isinstance(q._payload, list) else [q._payload] if q._payload else []
+            if q._op == "insert":
+                for rec in payload:
+                    rec = dict(rec)
+                    rec.setdefault("id", next(self._ids))
+                    rows.append(rec)
+                return _Result(payload)
+            if q._op == "upsert":
+                keys = [k.strip() for k in (q._on_conflict or "id").split(",")]
+                for rec in payload:
+                    existing = next((r for r in rows if all(r.get(k) == rec.get(k) for k in keys)), None)
+                    if existing is not None:
+                        existing.update(rec)
+                    else:
+                        rec = dict(rec)
+                        rec.setdefault("id", next(self._ids))
+                        rows.append(rec)
+                return _Result(payload)
+            if q._op == "update":
+                out = []
+                for r in rows:
+                    if self._matches(q, r):
+                        r.update(q._payload or {})
+                        out.append(dict(r))
+                return _Result(out)
+            if q._op == "delete":
+                keep, gone = [], []
+                for r in rows:
+                    (gone if self._matches(q, r) else keep).append(r)
+                self.tables[q._table] = keep
+                return _Result(gone)
+        return _Result([])
+
+
+# ---------------------------------------------------------------------------
+# Mercado simulado (preços compartilhados por Hyperliquid e Binance)
+# ---------------------------------------------------------------------------
+
+BASE_PRICES = {
+    "BTC": 65000.0, "ETH": 3200.0, "SOL": 150.0, "XRP": 0.55, "BNB": 580.0, "ADA": 0.45,
+    "AAVE": 95.0, "SUI": 1.2, "DOGE": 0.12, "AVAX": 28.0, "LINK": 14.0, "LTC": 80.0,
+    "DOT": 6.5, "NEAR": 5.0, "ARB": 0.9, "OP": 1.8, "APT": 8.0, "INJ": 22.0,
+}
+SZ_DECIMALS = {"BTC": 5, "ETH": 4, "SOL": 2, "BNB": 3, "AAVE": 2, "LTC": 2, "AVAX": 2, "LINK": 1, "INJ": 1}
+
+
+def _tf_ms(tf: str) -> int:
+    unit, value = tf[-1], int(tf[:-1])
+    return value * {"m": 60, "h": 3600, "d": 86400}.get(unit, 60) * 1000
+
+
+def simulated_price(symbol: str, ts_ms: int) -> float:
+    """Preço determinístico por (símbolo, minuto): passeio suave com ruído, igual em todos os processos."""
+    base = BASE_PRICES.get(symbol, 10.0)
+    minute = ts_ms // 60000
+    seed = sum(ord(c) for c in symbol)
+    drift = 0.02 * math.sin(minute / 240.0 + seed) + 0.01 * math.sin(minute / 37.0 + seed * 3)
+    noise = random.Random(minute * 7919 + seed).uniform(-0.002, 0.002)
+    return base * (1 + drift + noise)
+
+
+def simulated_candle(symbol: str, tf: str, open_ms: int) -> tuple:
+    """(open, high, low, close, volume) de um candle simulado começando em open_ms."""
+    step = _tf_ms(tf)
+    o = simulated_price(symbol, open_ms)
+    c = simulated_price(symbol, open_ms + step - 60000)
+    rnd = random.Random(open_ms // 60000 + sum(ord(ch) for ch in symbol + tf))
+    spread = abs(o - c) + o * rnd.uniform(0.0005, 0.01)
+    h = max(o, c) + spread * rnd.uniform(0.1, 1.0)
+    lo = min(o, c) - spread * rnd.uniform(0.1, 1.0)
+    vol = rnd.uniform(500, 5000)
+    return o, h, lo, c, vol
+
+
+# ---------------------------------------------------------------------------
+# Hyperliquid (Info + Exchange sobre uma conta simulada)
+# ---------------------------------------------------------------------------
+
+class SimulatedAccount:
+    """Estado de uma conta HL: ordens abertas, posições e fills, com execução quando o preço cruza."""
+
+    def __init__(self, wallet: str, account_value: float = 1000.0):
+        self.wallet = wallet
+        self.account_value = account_value
+        self.orders: dict[int, dict] = {}
+        self.positions: dict[str, dict] = {}
+        self.fills: list[dict] = []
+        self._oids = itertools.count(random.randint(10**9, 2 * 10**9))
+        self._lock = threading.Lock()
+
+    def mids(self) -> dict:
+        now = int(time.time() * 1000)
+        return {sym: str(simulated_price(sym, now)) for sym in BASE_PRICES}
+
+    def place(self, coin, is_buy, sz, px, order_type, reduce_only, cloid=None) -> dict:
+        with self._lock:
+            oid = next(self._oids)
+            trigger = (order_type or {}).get("trigger")
+            self.orders[oid] = {
+                "coin": coin, "oid": oid, "side": "B" if is_buy else "A",
+                "limitPx": str(px), "sz": str(sz), "origSz": str(sz),
+                "reduceOnly": bool(reduce_only), "isTrigger": bool(trigger),
+                "triggerPx": str(trigger["triggerPx"]) if trigger else "0.0",
+                "triggerCondition": ("Price below" if not is_buy else "Price above") if trigger else "N/A",
+                "orderType": "Stop Market" if trigger else "Limit",
+                "cloid": str(cloid) if cloid else None,
+                "timestamp": int(time.time() * 1000),
+            }
+            return {"resting": {"oid": oid}}
+
+    def cancel(self, oid) -> dict:
+        with self._lock:
+            if self.orders.pop(oid, None) is None:
+                return {"error": "Order was never placed, already canceled, or filled."}
+            return "success"
+
+    def find_oid(self, oid_or_cloid) -> Optional[int]:
+        if isinstance(oid_or_cloid, int):
+            return oid_or_cloid
+        raw = str(oid_or_cloid)
+        return next((o["oid"] for o in self.orders.values() if o.get("cloid") == raw), None)
+
+    def tick(self) -> None:
+        """Executa ordens cujo preço foi cruzado pelo mid atual."""
+        now = int(time.time() * 1000)
+        with self._lock:
+            for oid, o in list(self.orders.items()):
+                coin = o["coin"]
+                mid = simulated_price(coin, now)
+                is_buy = o["side"] == "B"
+                if o["isTrigger"]:
+                    trig = float(o["triggerPx"])
+                    hit = mid >= trig if is_buy else mid <= trig
+                    px = mid
+                else:
+                    lim = float(o["limitPx"])
+                    hit = mid <= lim if is_buy else mid >= lim
+                    px = lim
+                if not hit:
+                    continue
+                pos = self.positions.get(coin)
+                if o["reduceOnly"] and not pos:
+                    self.orders.pop(oid, None)
+                    continue
+                self.orders.pop(oid, None)
+                self._fill(coin, oid, is_buy, float(o["sz"]), px, now, o.get("cloid"))
+
+    def _fill(self, coin, oid, is_buy, sz, px, now, cloid=None) -> None:
+        signed = sz if is_buy else -sz
+        pos = self.positions.get(coin) or {"szi": 0.0, "entryPx": px}
+        old = pos["szi"]
+        closed_pnl = 0.0
+        new = old + signed
+        if old and (old > 0) != (signed > 0):
+            closed = min(abs(old), abs(signed))
+            closed_pnl = closed * (px - pos["entryPx"]) * (1 if old > 0 else -1)
+            direction = "Close Long" if old > 0 else "Close Short"
+        else:
+            if old:
+                pos["entryPx"] = (pos["entryPx"] * abs(old) + px * sz) / (abs(old) + sz)
+            else:
+                pos["entryPx"] = px
+            direction = "Open Long" if is_buy else "Open Short"
+        pos["szi"] = round(new, 8)
+        if abs(pos["szi"]) < 1e-9:
+            self.positions.pop(coin, None)
+        else:
+            self.positions[coin] = pos
+        self.account_value += closed_pnl
+        self.fills.append({
+            "coin": coin, "px": str(px), "sz": str(sz), "side": "B" if is_buy else "A",
+            "time": now, "oid": oid, "closedPnl": str(closed_pnl), "fee": str(abs(px * sz) * 0.00035),
+            "dir": direction, "hash": f"0x{oid:064x}", "crossed": False, "startPosition": str(old),
+            "tid": next(self._oids), "cloid": cloid,
+        })
+        self.fills = self.fills[-2000:]
+
+    def user_state(self) -> dict:
+        now = int(time.time() * 1000)
+        asset_positions = []
+        for coin, p in self.positions.items():
+            asset_positions.append({"type": "oneWay", "position": {
+                "coin": coin, "szi": str(p["szi"]), "entryPx": str(p["entryPx"]),
+                "positionValue": str(abs(p["szi"]) * simulated_price(coin, now)),
+                "unrealizedPnl": "0.0", "leverage": {"type": "cross", "value": 10},
+            }})
+        return {
+            "marginSummary": {"accountValue": str(self.account_value), "totalNtlPos": "0.0"},
+            "assetPositions": asset_positions,
+            "time": now,
+        }
+
+
+def build_meta() -> dict:
+    return {"universe": [
+        {"name": sym, "szDecimals": SZ_DECIMALS.get(sym, 0), "maxLeverage": 20}
+        for sym in BASE_PRICES
+    ]}
+
+
+class FakeInfo:
+    """Stand-in de hyperliquid.info.Info (apenas os endpoints usados pelo bot)."""
+
+    def __init__(self, account: SimulatedAccount):
+        self.account = account
+        self.coin_to_asset = {sym: i for i, sym in enumerate(BASE_PRICES)}
+
+    def name_to_asset(self, name: str) -> int:
+        return self.coin_to_asset[name]
+
+    def meta(self, dex: str = ""):
+        count_request("hl_info", "meta")
+        return build_meta()
+
+    def frontend_open_orders(self, address, dex: str = ""):
+        count_request("hl_info", "frontendOpenOrders")
+        self.account.tick()
+        return [dict(o) for o in self.account.orders.values()]
+
+    def open_orders(self, address, dex: str = ""):
+        count_request("hl_info", "openOrders")
+        return [dict(o) for o in self.account.orders.values()]
+
+    def user_state(self, address, dex: str = ""):
+        count_request("hl_info", "clearinghouseState")
+        return self.account.user_state()
+
+    def all_mids(self, dex: str = ""):
+        count_request("hl_info", "allMids")
+        return self.account.mids()
+
+    def user_fills(self, address):
+        count_request("hl_info", "userFills")
+        return list(reversed(self.account.fills[-2000:]))
+
+    def user_fills_by_time(self, address, start_time, end_time=None, aggregate_by_time=False):
+        count_request("hl_info", "userFillsByTime")
+        end = end_time or int(time.time() * 1000)
+        return [f for f in self.account.fills if start_time <= f["time"] <= end]
+
+    def candles_snapshot(self, name, interval, startTime, endTime):
+        count_request("hl_info", "candleSnapshot")
+        step = _tf_ms(interval)
+        out = []
+        t = (startTime // step) * step
+        while t <= endTime:
+            o, h, lo, c, v = simulated_candle(name, interval, t)
+            out.append({"t": t, "T": t + step - 1, "s": name, "i": interval,
+                        "o": str(o), "h": str(h), "l": str(lo), "c": str(c), "v": str(v), "n": 100})
+            t += step
+        return out
+
+
+class FakeExchange:
+    """Stand-in de hyperliquid.exchange.Exchange: mesmas assinaturas, respostas no formato da API."""
+
+    def __init__(self, account: SimulatedAccount, info: FakeInfo):
+        self.account = account
+        self.info = info
+
+    @staticmethod
+    def _ok(kind: str, statuses: list) -> dict:
+        return {"status": "ok", "response": {"type": kind, "data": {"statuses": statuses}}}
+
+    def order(self, name, is_buy, sz, limit_px, order_type, reduce_only=False, cloid=None, builder=None):
+        return self.bulk_orders([{
+            "coin": name, "is_buy": is_buy, "sz": sz, "limit_px": limit_px,
+            "order_type": order_type, "reduce_only": reduce_only, "cloid": cloid,
+        }])
+
+    def bulk_orders(self, order_requests, builder=None, grouping="na"):
+        count_request("hl_exchange", "order")
+        statuses = [
+            self.account.place(o["coin"], o["is_buy"], o["sz"], o["limit_px"], o["order_type"],
+                               o.get("reduce_only", False), o.get("cloid"))
+            for o in order_requests
+        ]
+        return self._ok("order", statuses)
+
+    def cancel(self, name, oid):
+        return self.bulk_cancel([{"coin": name, "oid": oid}])
+
+    def cancel_by_cloid(self, name, cloid):
+        return self.bulk_cancel_by_cloid([{"coin": name, "cloid": cloid}])
+
+    def bulk_cancel(self, cancel_requests):
+        count_request("hl_exchange", "cancel")
+        return self._ok("cancel", [self.account.cancel(c["oid"]) for c in cancel_requests])
+
+    def bulk_cancel_by_cloid(self, cancel_requests):
+        count_request("hl_exchange", "cancelByCloid")
+        return self._ok("cancel", [
+            self.account.cancel(self.account.find_oid(c["cloid"])) for c in cancel_requests
+        ])
+
+    def modify_order(self, oid, name, is_buy, sz, limit_px, order_type, reduce_only=False, cloid=None):
+        return self.bulk_modify_orders_new([{"oid": oid, "order": {
+            "coin": name, "is_buy": is_buy, "sz": sz, "limit_px": limit_px,
+            "order_type": order_type, "reduce_only": reduce_only, "cloid": cloid,
+        }}])
+
+    def bulk_modify_orders_new(self, modify_requests):
+        count_request("hl_exchange", "batchModify")
+        statuses = []
+        for m in modify_requests:
+            oid = self.account.find_oid(m["oid"])
+            if oid is None or self.account.cancel(oid) != "success":
+                statuses.append({"error": "Cannot modify canceled or filled order"})
+                continue
+            o = m["order"]
+            statuses.append(self.account.place(o["coin"], o["is_buy"], o["sz"], o["limit_px"],
+                                               o["order_type"], o.get("reduce_only", False), o.get("cloid")))
+        return self._ok("order", statuses)
+
+    def market_close(self, coin, sz=None, px=None, slippage=0.05, cloid=None, builder=None):
+        count_request("hl_exchange", "order")
+        pos = self.account.positions.get(coin)
+        if not pos:
+            return None
+        is_buy = pos["szi"] < 0
+        self.account._fill(coin, 0, is_buy, sz or abs(pos["szi"]), simulated_price(coin, int(time.time() * 1000)),
+                           int(time.time() * 1000))
+        return self._ok("order", [{"filled": {"totalSz": str(sz or abs(pos["szi"]))}}])
+
+
+# ---------------------------------------------------------------------------
+# Binance + Telegram (substituem requests.get / requests.post no processo filho)
+# ---------------------------------------------------------------------------
+
+class _FakeResponse:
+    def __init__(self, payload: Any, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.ok = status_code < 400
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+def _binance_klines(params: dict) -> list:
+    symbol = str(params.get("symbol", "BTCUSDT")).replace("USDT", "")
+    interval = params.get("interval", "15m")
+    limit = int(params.get("limit", 100))
+    step = _tf_ms(interval)
+    now = int(time.time() * 1000)
+    last_open = (now // step) * step
+    rows = []
+    for i in range(limit - 1, -1, -1):
+        t = last_open - i * step
+        o, h, lo, c, v = simulated_candle(symbol, interval, t)
+        rows.append([t, str(o), str(h), str(lo), str(c), str(v), t + step - 1, "0", 0, "0", "0", "0"])
+    return rows
+
+
+def _binance_lsr(params: dict) -> list:
+    symbol = str(params.get("symbol", "BTCUSDT")).replace("USDT", "")
+    limit = int(params.get("limit", 4))
+    rnd = random.Random(int(time.time()) // 1800 + sum(ord(c) for c in symbol))
+    base = rnd.uniform(1.2, 2.8)
+    return [{"symbol": f"{symbol}USDT", "longShortRatio": str(base * rnd.uniform(0.98, 1.02))} for _ in range(limit)]
+
+
+def fake_requests_get(url, params=None, **_kwargs):
+    """Substitui requests.get: responde klines e LSR da Binance a partir do mercado simulado."""
+    params = params or {}
+    if "klines" in url:
+        count_request("binance", "klines")
+        return _FakeResponse(_binance_klines(params))
+    if "LongShortAccountRatio" in url:
+        count_request("binance", "lsr")
+        return _FakeResponse(_binance_lsr(params))
+    count_request("other", "get")
+    return _FakeResponse({}, 404)
+
+
+def fake_requests_post(url, json=None, **_kwargs):
+    """Substitui requests.post: Telegram e /info da Hyperliquid (ex.: meta usado pelo backend)."""
+    if "api.telegram.org" in url:
+        count_request("telegram", "sendMessage")
+        return _FakeResponse({"ok": True})
+    if "hyperliquid" in url and isinstance(json, dict) and json.get("type") == "meta":
+        count_request("hl_info", "meta")
+        return _FakeResponse(build_meta())
+    count_request("other", "post")
+    return _FakeResponse({}, 404)
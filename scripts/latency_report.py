@@ -0,0 +1,50 @@
+"""
+Resumo de latência sinal → ordem do nó: p50/p95/p99 por etapa, por usuário e do nó inteiro.
+Lê os registros gravados pelo bot em logs/latency/<user>.jsonl (utils/latency.py).
+
+Execute a partir da raiz do projeto:
+  python scripts/latency_report.py
+  python scripts/latency_report.py --hours 24 --json latency_summary.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from utils.latency import LATENCY_LOG_DIR, format_summary, load_records, summarize  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Resumo p50/p95/p99 da latência sinal → ordem")
+    parser.add_argument("--dir", default=LATENCY_LOG_DIR, help="Diretório dos registros (default: logs/latency)")
+    parser.add_argument("--hours", type=float, default=0, help="Só considera trades das últimas N horas (0 = todos)")
+    parser.add_argument("--json", dest="json_out", default="", help="Também salva o resumo em JSON neste caminho")
+    args = parser.parse_args()
+
+    since_ms = int((time.time() - args.hours * 3600) * 1000) if args.hours > 0 else 0
+    by_user = load_records(args.dir, since_ms=since_ms)
+    if not any(by_user.values()):
+        print(f"Nenhum registro de latência em {args.dir}")
+        return 1
+
+    report = {"node": summarize(r for records in by_user.values() for r in records), "users": {}}
+    print(f"NÓ ({sum(len(r) for r in by_user.values())} trades): {format_summary(report['node'])}")
+    for user_id, records in by_user.items():
+        if not records:
+            continue
+        report["users"][user_id] = summarize(records)
+        print(f"  {user_id} ({len(records)}): {format_summary(report['users'][user_id])}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,469 @@
+"""
+Harness de carga da frota: sobe o InstanceManager contra dublês locais de Supabase,
+Hyperliquid e Binance (scripts/fleet_standins.py), faz rampa de 10 até 1000 usuários
+simulados e mede por usuário: CPU, RSS, latência do loop e requisições de saída.
+Gera um relatório de capacidade (JSON + Markdown) para ser reexecutado após cada mudança de performance.
+
+Execute a partir da raiz do projeto (Linux; usa /proc e multiprocessing com fork):
+  python scripts/load_test_fleet.py
+  python scripts/load_test_fleet.py --steps 10,50,100 --step-seconds 90 --out fleet_report
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if _root not in sys.path:
+    sys.path.insert(0, _root)
+
+from scripts import fleet_standins as standins  # noqa: E402
+
+SYMBOL_POOL = list(standins.BASE_PRICES.keys())
+TIMEFRAME_POOL = ["5m", "15m", "30m", "1h", "4h"]
+PLAN_WEIGHTS = {"basic": 0.5, "pro": 0.35, "satoshi": 0.15}
+DEFAULT_STEPS = [10, 50, 100, 250, 500, 1000]
+
+
+def _percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+# ---------------------------------------------------------------------------
+# Usuários simulados
+# ---------------------------------------------------------------------------
+
+def _simulated_user(rng: random.Random, index: int) -> dict:
+    """Gera linhas realistas de users, bot_config, trading_accounts e telegram_configs para um usuário."""
+    user_id = f"loadtest-{index:05d}"
+    plan = rng.choices(list(PLAN_WEIGHTS), weights=list(PLAN_WEIGHTS.values()))[0]
+    symbols = rng.sample(SYMBOL_POOL, rng.randint(3, 8))
+    timeframes = sorted(rng.sample(TIMEFRAME_POOL, rng.randint(1, 3)), key=TIMEFRAME_POOL.index)
+    created_at = datetime.now(timezone.utc) - timedelta(days=rng.randint(1, 90))
+    config = {
+        "user_id": user_id,
+        "bot_enabled": True,
+        "symbols": symbols,
+        "timeframes": timeframes,
+        "trade_mode": rng.choices(["BOTH", "LONG_ONLY", "SHORT_ONLY"], weights=[0.8, 0.1, 0.1])[0],
+        "signal_mode": plan == "basic" or rng.random() < 0.1,
+        "entry2_enabled": rng.random() < 0.7,
+        "target_loss_usd": rng.choice([5.0, 10.0, 15.0, 25.0]),
+        "max_global_exposure": rng.choice([1000.0, 2500.0, 5000.0]),
+        "max_single_pos_exposure": rng.choice([500.0, 1000.0, 2500.0]),
+        "max_positions": rng.randint(1, 4),
+        "stop_multiplier": 1.8,
+        "entry1_multiplier": 0.618,
+        "entry2_multiplier": 1.414,
+        "entry2_adjust_last_target": True,
+        "target1_level": 0.618,
+        "target1_percent": 50,
+        "target2_level": 1.0,
+        "target2_percent": 50,
+        "target3_level": None,
+        "target3_percent": 0,
+    }
+    return {
+        "user_id": user_id,
+        "users": {"id": user_id, "created_at": created_at.isoformat(), "subscription_tier": plan},
+        "bot_config": config,
+        "trading_accounts": {
+            "user_id": user_id,
+            "wallet_address": "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(40)),
+            "private_key": "0x" + "".join(rng.choice("0123456789abcdef") for _ in range(64)),
+            "network": "mainnet",
+            "is_active": True,
+        },
+        "telegram_configs": {"user_id": user_id, "bot_token": "loadtest-token", "chat_id": f"{index}"},
+    }
+
+
+def _seed_user(db: standins.FakeSupabase, user: dict) -> None:
+    for table in ("users", "bot_config", "trading_accounts", "telegram_configs"):
+        db.tables[table].append(dict(user[table]))
+
+
+# ---------------------------------------------------------------------------
+# Instrumentação do processo filho (roda após o fork do InstanceManager)
+# ---------------------------------------------------------------------------
+
+class _ChildProbe:
+    """Mede a latência de cada iteração do run_main_loop e grava métricas do usuário em disco."""
+
+    def __init__(self, user_id: str, metrics_dir: str, time_scale: float):
+        self.user_id = user_id
+        self.path = os.path.join(metrics_dir, f"user_{user_id}.json")
+        self.time_scale = time_scale
+        self.loop_started_at = None
+        self.loops = 0
+        self.samples = deque(maxlen=2000)  # (timestamp, latência em s)
+        self._real_sleep = time.sleep
+
+    def loop_start(self) -> None:
+        if self.loop_started_at is None:
+            self.loop_started_at = time.time()
+
+    def sleep(self, seconds: float) -> None:
+        # O sleep de fim de iteração do run_main_loop é sempre >= 1s
+        if seconds >= 1 and self.loop_started_at is not None:
+            now = time.time()
+            self.samples.append((now, now - self.loop_started_at))
+            self.loops += 1
+            self.loop_started_at = None
+            self.flush()
+        self._real_sleep(seconds * self.time_scale)
+
+    def flush(self) -> None:
+        payload = {
+            "user_id": self.user_id,
+            "pid": os.getpid(),
+            "loops": self.loops,
+            "samples": list(self.samples),
+            "requests": dict(standins.REQUEST_COUNTS),
+            "updated_at": time.time(),
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp, self.path)
+
+
+class _ClockProxy:
+    """Substitui o módulo time dentro de bot.py: time() real, sleep() medido e escalado."""
+
+    def __init__(self, probe: _ChildProbe):
+        self._probe = probe
+
+    def sleep(self, seconds):
+        self._probe.sleep(seconds)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+class _ProbedInfo(standins.FakeInfo):
+    def __init__(self, account, probe: _ChildProbe):
+        super().__init__(account)
+        self._probe = probe
+
+    def frontend_open_orders(self, address, dex: str = ""):
+        # Primeira chamada de cada iteração do run_main_loop
+        self._probe.loop_start()
+        return super().frontend_open_orders(address, dex)
+
+
+def _install_patches(db: standins.FakeSupabase, metrics_dir: str, time_scale: float, child_log_level: int) -> None:
+    """Aponta InstanceManager/BotInstance para os dublês. Herdado pelos filhos via fork."""
+    import requests
+    import manager.instance_manager as im_module
+    import instance.bot_instance as bi_module
+    from storage.supabase_storage import SupabaseStorage
+
+    def make_storage():
+        storage = SupabaseStorage(url="", key="")
+        storage._client = db
+        return storage
+
+    im_module.get_storage = make_storage
+    bi_module.get_storage = make_storage
+
+    original_logger = bi_module.setup_user_logger
+
+    def quiet_user_logger(user_id, log_dir="logs"):
+        logger = original_logger(user_id, log_dir=os.path.join(metrics_dir, "logs"))
+        logger.handlers = [h for h in logger.handlers if not type(h) is logging.StreamHandler]
+        logger.setLevel(child_log_level)
+        return logger
+
+    bi_module.setup_user_logger = quiet_user_logger
+
+    def load_credentials(self):
+        # Credenciais em claro na tabela simulada: a descriptografia real é custo único de start
+        rows = [r for r in db.tables["trading_accounts"] if r.get("user_id") == self.user_id]
+        if not rows:
+            return {}
+        return {
+            "wallet_address": rows[0]["wallet_address"],
+            "private_key": rows[0]["private_key"],
+            "network": rows[0].get("network", "mainnet"),
+        }
+
+    bi_module.BotInstance._load_credentials = load_credentials
+
+    original_start = bi_module.BotInstance.start
+
+    def start(self):
+        probe = _ChildProbe(self.user_id, metrics_dir, time_scale)
+        requests.get = standins.fake_requests_get
+        requests.post = standins.fake_requests_post
+        import bot as bot_module
+        logging.getLogger().setLevel(child_log_level)
+        bot_module.time = _ClockProxy(probe)
+        self._loadtest_probe = probe
+        probe.flush()
+        return original_start(self)
+
+    bi_module.BotInstance.start = start
+
+    def setup_client(self):
+        account = standins.SimulatedAccount(self.config.wallet_address)
+        self.wallet_address = self.config.wallet_address
+        self.info = _ProbedInfo(account, self._loadtest_probe)
+        self.exchange = standins.FakeExchange(account, self.info)
+        self.telegram.send("🟢 Zeedo Conectado")
+
+    bi_module.BotInstance._setup_client = setup_client
+
+
+# ---------------------------------------------------------------------------
+# Amostragem do processo pai (/proc)
+# ---------------------------------------------------------------------------
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _proc_cpu_seconds(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / _CLK_TCK
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def _proc_rss_mb(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _host_memory_mb() -> float:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return 0.0
+
+
+def _read_child_metrics(metrics_dir: str, user_id: str) -> dict:
+    try:
+        with open(os.path.join(metrics_dir, f"user_{user_id}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _run_step(manager, metrics_dir: str, n_users: int, step_seconds: int, sample_every: float) -> dict:
+    """Mantém a frota com n_users por step_seconds e agrega as métricas por usuário."""
+    manager._check_users()
+    step_start = time.time()
+    pids = {uid: p.pid for uid, p in manager.active_instances.items()}
+    cpu_start = {uid: _proc_cpu_seconds(pid) for uid, pid in pids.items()}
+    req_start = {uid: _read_child_metrics(metrics_dir, uid).get("requests", {}) for uid in pids}
+    rss_samples: dict[str, list] = {uid: [] for uid in pids}
+
+    while time.time() - step_start < step_seconds:
+        for uid, pid in pids.items():
+            rss = _proc_rss_mb(pid)
+            if rss is not None:
+                rss_samples[uid].append(rss)
+        time.sleep(sample_every)
+
+    wall = time.time() - step_start
+    per_user = []
+    latencies_all = []
+    requests_total: dict[str, float] = {}
+    for uid, pid in pids.items():
+        cpu_end = _proc_cpu_seconds(pid)
+        cpu_pct = None
+        if cpu_end is not None and cpu_start.get(uid) is not None:
+            cpu_pct = 100.0 * (cpu_end - cpu_start[uid]) / wall
+        metrics = _read_child_metrics(metrics_dir, uid)
+        lat = [s[1] for s in metrics.get("samples", []) if s[0] >= step_start]
+        latencies_all.extend(lat)
+        reqs = metrics.get("requests", {})
+        before = req_start.get(uid, {})
+        req_per_min = {
+            k: (v - before.get(k, 0)) * 60.0 / wall
+            for k, v in reqs.items() if "." not in k
+        }
+        for k, v in req_per_min.items():
+            requests_total[k] = requests_total.get(k, 0.0) + v
+        per_user.append({
+            "user_id": uid,
+            "pid": pid,
+            "alive": manager.active_instances[uid].is_alive() if uid in manager.active_instances else False,
+            "cpu_pct": round(cpu_pct, 3) if cpu_pct is not None else None,
+            "rss_mb": round(max(rss_samples[uid]), 2) if rss_samples[uid] else None,
+            "loops": len(lat),
+            "loop_latency_p50": round(_percentile(lat, 50), 4),
+            "loop_latency_p95": round(_percentile(lat, 95), 4),
+            "requests_per_min": {k: round(v, 3) for k, v in req_per_min.items()},
+        })
+
+    cpus = [u["cpu_pct"] for u in per_user if u["cpu_pct"] is not None]
+    rss = [u["rss_mb"] for u in per_user if u["rss_mb"] is not None]
+    n = max(len(per_user), 1)
+    return {
+        "users": n_users,
+        "running": sum(1 for u in per_user if u["alive"]),
+        "wall_seconds": round(wall, 1),
+        "cpu_pct_per_user_avg": round(statistics.mean(cpus), 3) if cpus else None,
+        "cpu_pct_per_user_p95": round(_percentile(cpus, 95), 3) if cpus else None,
+        "cpu_pct_total": round(sum(cpus), 2) if cpus else None,
+        "rss_mb_per_user_avg": round(statistics.mean(rss), 2) if rss else None,
+        "rss_mb_total": round(sum(rss), 1) if rss else None,
+        "loop_latency_p50": round(_percentile(latencies_all, 50), 4),
+        "loop_latency_p95": round(_percentile(latencies_all, 95), 4),
+        "loop_latency_p99": round(_percentile(latencies_all, 99), 4),
+        "requests_per_user_per_min": {k: round(v / n, 3) for k, v in sorted(requests_total.items())},
+        "per_user": per_user,
+    }
+
+
+def _capacity(steps: list, latency_budget: float, cpu_budget_pct: float, mem_budget_mb: float) -> int:
+    """Maior degrau que respeita latência p95, CPU total e memória total, sem processos mortos."""
+    best = 0
+    for s in steps:
+        ok = (
+            s["running"] == s["users"]
+            and s["loop_latency_p95"] <= latency_budget
+            and (s["cpu_pct_total"] or 0) <= cpu_budget_pct
+            and (s["rss_mb_total"] or 0) <= mem_budget_mb
+        )
+        if not ok:
+            break
+        best = s["users"]
+    return best
+
+
+def _write_report(out_dir: str, report: dict) -> None:
+    with open(os.path.join(out_dir, "capacity_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    lines = [
+        "# Relatório de capacidade da frota",
+        "",
+        f"- Gerado em: {report['generated_at']}",
+        f"- Host: {report['host']['cpus']} CPUs, {report['host']['memory_mb']:.0f} MB",
+        f"- Duração por degrau: {report['params']['step_seconds']}s | time_scale: {report['params']['time_scale']}",
+        f"- Orçamentos: latência p95 ≤ {report['params']['latency_budget']}s, "
+        f"CPU ≤ {report['params']['cpu_budget_pct']:.0f}%, memória ≤ {report['params']['mem_budget_mb']:.0f} MB",
+        f"- **Capacidade estimada: {report['capacity_users']} usuários**",
+        "",
+        "| Usuários | Rodando | CPU/usuário (média / p95 %) | CPU total % | RSS/usuário MB | RSS total MB "
+        "| Loop p50 / p95 / p99 s | Req/usuário/min |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for s in report["steps"]:
+        reqs = ", ".join(f"{k}={v}" for k, v in s["requests_per_user_per_min"].items())
+        lines.append(
+            f"| {s['users']} | {s['running']} | {s['cpu_pct_per_user_avg']} / {s['cpu_pct_per_user_p95']} "
+            f"| {s['cpu_pct_total']} | {s['rss_mb_per_user_avg']} | {s['rss_mb_total']} "
+            f"| {s['loop_latency_p50']} / {s['loop_latency_p95']} / {s['loop_latency_p99']} | {reqs} |"
+        )
+    with open(os.path.join(out_dir, "capacity_report.md"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga do InstanceManager com usuários simulados")
+    parser.add_argument("--steps", default=",".join(str(s) for s in DEFAULT_STEPS),
+                        help="Degraus de usuários (ex.: 10,50,100,250,500,1000)")
+    parser.add_argument("--step-seconds", type=int, default=120, help="Duração de cada degrau")
+    parser.add_argument("--sample-every", type=float, default=5.0, help="Intervalo de amostragem de RSS (s)")
+    parser.add_argument("--time-scale", type=float, default=1.0,
+                        help="Multiplica o sleep do loop do bot (1.0 = 30s reais; 0.1 = 3s)")
+    parser.add_argument("--latency-budget", type=float, default=5.0, help="Latência p95 máxima do loop (s)")
+    parser.add_argument("--out", default="fleet_report", help="Diretório de saída do relatório")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child-log-level", default="WARNING")
+    args = parser.parse_args()
+
+    steps = sorted({int(s) for s in args.steps.split(",") if s.strip()})
+    out_dir = os.path.abspath(args.out)
+    metrics_dir = os.path.join(out_dir, "metrics")
+    os.makedirs(metrics_dir, exist_ok=True)
+
+    # Nunca falar com serviços reais
+    for var in ("SUPABASE_URL", "SUPABASE_SERVICE_KEY", "SUPABASE_ANON_KEY", "SUPABASE_KEY"):
+        os.environ.pop(var, None)
+    os.environ["BOT_STORAGE"] = "supabase"
+    os.chdir(out_dir)  # bot_trades.log e logs/ dos filhos ficam no diretório do relatório
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s", datefmt="%H:%M:%S")
+    log = logging.getLogger("load_test_fleet")
+
+    db = standins.FakeSupabase()
+    _install_patches(db, metrics_dir, args.time_scale, getattr(logging, args.child_log_level.upper(), logging.WARNING))
+
+    from manager.instance_manager import InstanceManager
+
+    manager = InstanceManager(check_interval=30)
+    rng = random.Random(args.seed)
+    seeded = 0
+    results = []
+    cpus = os.cpu_count() or 1
+    mem_mb = _host_memory_mb()
+    try:
+        for n_users in steps:
+            while seeded < n_users:
+                _seed_user(db, _simulated_user(rng, seeded))
+                seeded += 1
+            log.info(f"Degrau {n_users} usuários: iniciando instâncias e medindo por {args.step_seconds}s")
+            step = _run_step(manager, metrics_dir, n_users, args.step_seconds, args.sample_every)
+            results.append(step)
+            log.info(
+                f"  rodando={step['running']} CPU/usuário={step['cpu_pct_per_user_avg']}% "
+                f"RSS/usuário={step['rss_mb_per_user_avg']}MB loop p95={step['loop_latency_p95']}s"
+            )
+            if step["running"] < n_users:
+                log.warning(f"  {n_users - step['running']} instância(s) morreram; encerrando a rampa")
+                break
+    except KeyboardInterrupt:
+        log.info("Interrompido; gerando relatório parcial")
+    finally:
+        manager.stop_all_instances()
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "host": {"cpus": cpus, "memory_mb": mem_mb},
+        "params": {
+            "steps": steps,
+            "step_seconds": args.step_seconds,
+            "time_scale": args.time_scale,
+            "latency_budget": args.latency_budget,
+            "cpu_budget_pct": cpus * 100.0 * 0.8,
+            "mem_budget_mb": mem_mb * 0.8,
+            "seed": args.seed,
+        },
+        "steps": results,
+    }
+    report["capacity_users"] = _capacity(
+        results, args.latency_budget, report["params"]["cpu_budget_pct"], report["params"]["mem_budget_mb"]
+    )
+    _write_report(out_dir, report)
+    log.info(f"Relatório salvo em {out_dir}/capacity_report.md (capacidade estimada: {report['capacity_users']})")
+
+
+if __name__ == "__main__":
+    main()
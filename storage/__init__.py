@@ -1,21 +1,26 @@
 """
 Pacote de persistência do bot.
-Uso: storage = get_storage() (lê BOT_STORAGE=local|supabase) ou storage = LocalStorage() / SupabaseStorage()
+Uso: storage = get_storage() (lê BOT_STORAGE=local|supabase|sqlite) ou storage = LocalStorage() / SupabaseStorage() / SqliteStorage()
 """
 import os
 
 from .base import StorageBase
 from .local_storage import LocalStorage
 from .supabase_storage import SupabaseStorage
+from .sqlite_storage import SqliteStorage
 from .user_storage import UserStorage
+from .write_behind import WriteBehindStorage
+from .instrumented import InstrumentedStorage, storage_metrics_enabled
 
 
 def get_storage() -> StorageBase:
-    """Retorna implementação de persistência conforme BOT_STORAGE (local|supabase)."""
+    """Retorna implementação de persistência conforme BOT_STORAGE (local|supabase|sqlite)."""
     backend = (os.environ.get("BOT_STORAGE") or "local").strip().lower()
     if backend == "supabase":
         return SupabaseStorage()
+    if backend == "sqlite":
+        return SqliteStorage()
     return LocalStorage()
 
 
-__all__ = ["StorageBase", "LocalStorage", "SupabaseStorage", "UserStorage", "get_storage"]
+__all__ = ["StorageBase", "LocalStorage", "SupabaseStorage", "SqliteStorage", "UserStorage", "WriteBehindStorage", "InstrumentedStorage", "storage_metrics_enabled", "get_storage"]
@@ -6,6 +6,26 @@ deve passar por uma implementação desta interface.
 from abc import ABC, abstractmethod
 
 
+def blocked_trade_expired(row: dict, px: float) -> bool:
+    """Trade bloqueado expirou: preço já atingiu o stop ou o alvo 1 (regra comum aos backends)."""
+    stop = float(row.get("stop_real", 0))
+    tech = float(row.get("tech_base", 0) or 0)
+    setup_high = float(row.get("setup_high", 0) or 0)
+    setup_low = float(row.get("setup_low", 0) or 0)
+    t1 = float(row.get("target1_level", 0.618) or 0.618)
+    side = (row.get("side") or "long").lower()
+    # Stop: sempre verifica
+    if side == "long":
+        if px <= stop:
+            return True
+        # TP1 = setup_high + (tech_base × 0.618) — alvo 1 para long
+        return px >= setup_high + (tech * t1)
+    if px >= stop:
+        return True
+    # TP1 = setup_low - (tech_base × 0.618) — alvo 1 para short
+    return px <= setup_low - (tech * t1)
+
+
 class StorageBase(ABC):
     """Interface que abstrai persistência (JSON local ou Supabase)."""
 
@@ -0,0 +1,237 @@
+"""
+Instrumentação opcional do storage: contagem, bytes e histograma de latência por método e usuário.
+
+InstrumentedStorage envolve qualquer StorageBase (LocalStorage, SupabaseStorage, UserStorage...) e
+mede cada chamada: tempo (histograma em STORAGE_LATENCY_BUCKETS_MS), erros e bytes do payload
+(JSON do que foi gravado / lido). A cada STORAGE_METRICS_EXPORT_INTERVAL segundos o resumo vai
+para o log, para logs/storage_metrics/<user>.jsonl e para <user>.prom (formato texto do
+Prometheus, para o textfile collector do node_exporter). Ligado por BOT_STORAGE_METRICS=1;
+desligado o wrapper nem é criado (custo zero).
+"""
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, Optional
+
+from .base import StorageBase
+
+STORAGE_METRICS_DIR = os.path.join("logs", "storage_metrics")
+STORAGE_METRICS_EXPORT_INTERVAL = 300.0  # segundos entre exportações
+STORAGE_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def storage_metrics_enabled() -> bool:
+    return os.getenv("BOT_STORAGE_METRICS", "0") == "1"
+
+
+def payload_bytes(obj) -> int:
+    """Tamanho aproximado do payload (JSON compacto); 0 se não serializável."""
+    if obj is None:
+        return 0
+    try:
+        return len(json.dumps(obj, separators=(",", ":"), default=str))
+    except Exception:
+        return 0
+
+
+class MethodStats:
+    """Contadores e histograma de latência de um método."""
+
+    __slots__ = ("count", "errors", "bytes", "total_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(STORAGE_LATENCY_BUCKETS_MS) + 1)  # último = acima do maior bucket
+
+    def observe(self, ms: float, nbytes: int, error: bool) -> None:
+        self.count += 1
+        self.errors += int(error)
+        self.bytes += nbytes
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.buckets[bisect_left(STORAGE_LATENCY_BUCKETS_MS, ms)] += 1
+
+    def quantile_ms(self, q: float) -> float:
+        """Limite superior do bucket que contém o quantil q (0..1)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(STORAGE_LATENCY_BUCKETS_MS[i]) if i < len(STORAGE_LATENCY_BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "p50_ms": self.quantile_ms(0.50),
+            "p95_ms": self.quantile_ms(0.95),
+            "p99_ms": self.quantile_ms(0.99),
+            "buckets": dict(zip([*map(str, STORAGE_LATENCY_BUCKETS_MS), "inf"], self.buckets)),
+        }
+
+
+class StorageMetrics:
+    """Métricas do processo por (usuário, método)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple, MethodStats] = {}
+
+    def observe(self, user_id: str, method: str, ms: float, nbytes: int, error: bool) -> None:
+        with self._lock:
+            stats = self._stats.get((user_id, method))
+            if stats is None:
+                stats = self._stats[(user_id, method)] = MethodStats()
+            stats.observe(ms, nbytes, error)
+
+    def snapshot(self, user_id: str = None) -> Dict[str, Dict[str, dict]]:
+        """{user_id: {method: stats}} (só do usuário informado, se houver)."""
+        with self._lock:
+            out: Dict[str, Dict[str, dict]] = {}
+            for (uid, method), stats in sorted(self._stats.items(), key=lambda kv: (str(kv[0][0]), kv[0][1])):
+                if user_id is None or uid == user_id:
+                    out.setdefault(uid or "local", {})[method] = stats.to_dict()
+            return out
+
+    def format_summary(self, user_id: str = None) -> str:
+        parts = []
+        for methods in self.snapshot(user_id).values():
+            for method, s in sorted(methods.items(), key=lambda kv: -kv[1]["total_ms"]):
+                parts.append(
+                    f"{method}: n={s['count']} p50≤{s['p50_ms']:.0f} p95≤{s['p95_ms']:.0f} "
+                    f"max={s['max_ms']:.0f}ms total={s['total_ms']:.0f}ms {s['bytes'] / 1024:.0f}KB"
+                    + (f" erros={s['errors']}" if s["errors"] else "")
+                )
+        return " | ".join(parts)
+
+    def to_prometheus(self, user_id: str = None) -> str:
+        """Exposição em texto do Prometheus (histograma cumulativo em segundos)."""
+        lines = [
+            "# TYPE zeedo_storage_call_seconds histogram",
+            "# TYPE zeedo_storage_errors_total counter",
+            "# TYPE zeedo_storage_bytes_total counter",
+        ]
+        for uid, methods in self.snapshot(user_id).items():
+            for method, s in methods.items():
+                labels = f'user_id="{uid}",method="{method}"'
+                cumulative = 0
+                for le, n in s["buckets"].items():
+                    cumulative += n
+                    le_s = "+Inf" if le == "inf" else f"{int(le) / 1000:g}"
+                    lines.append(f'zeedo_storage_call_seconds_bucket{{{labels},le="{le_s}"}} {cumulative}')
+                lines.append(f"zeedo_storage_call_seconds_sum{{{labels}}} {s['total_ms'] / 1000:.6f}")
+                lines.append(f"zeedo_storage_call_seconds_count{{{labels}}} {s['count']}")
+                lines.append(f"zeedo_storage_errors_total{{{labels}}} {s['errors']}")
+                lines.append(f"zeedo_storage_bytes_total{{{labels}}} {s['bytes']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, user_id: str = None, out_dir: str = STORAGE_METRICS_DIR) -> None:
+        """Grava o snapshot em <out_dir>/<user>.jsonl (append) e <user>.prom (substitui)."""
+        name = user_id or "local"
+        try:
+            os.makedirs(out_dir, exist_ok=True)
+            record = {"ts": int(time.time() * 1000), "methods": self.snapshot(user_id).get(name, {})}
+            with open(os.path.join(out_dir, f"{name}.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            prom = os.path.join(out_dir, f"{name}.prom")
+            with open(f"{prom}.tmp", "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus(user_id))
+            os.replace(f"{prom}.tmp", prom)
+        except Exception as e:
+            logging.error(f"Erro ao exportar métricas do storage: {e}")
+
+
+storage_metrics = StorageMetrics()  # compartilhado por todos os wrappers do processo
+
+
+class InstrumentedStorage(StorageBase):
+    """Wrapper que mede cada chamada ao storage (latência, bytes, erros) por método e usuário."""
+
+    def __init__(
+        self,
+        backend: StorageBase,
+        user_id: Optional[str] = None,
+        metrics: StorageMetrics = None,
+        export_interval: float = STORAGE_METRICS_EXPORT_INTERVAL,
+    ):
+        """
+        Args:
+            backend: Storage a medir
+            user_id: Usuário das métricas (default: backend.user_id, se houver)
+            metrics: Destino das métricas (default: storage_metrics do processo)
+            export_interval: Segundos entre exportações para log/arquivo (0 = não exporta)
+        """
+        self.backend = backend
+        self.metrics_user_id = user_id or getattr(backend, "user_id", None)
+        self.metrics = metrics or storage_metrics
+        self.export_interval = export_interval
+        self._last_export = time.monotonic()
+
+    def __getattr__(self, name):
+        if name == "backend":
+            raise AttributeError(name)
+        attr = getattr(self.backend, name)
+        if not callable(attr) or name.startswith("_"):
+            return attr
+        return lambda *args, **kwargs: self._call(name, attr, args, kwargs)
+
+    def _call(self, name: str, method, args: tuple, kwargs: dict):
+        start = time.perf_counter()
+        error = False
+        result = None
+        try:
+            result = method(*args, **kwargs)
+            return result
+        except Exception:
+            error = True
+            raise
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            # Gravação: mede o que foi enviado; leitura: o que voltou
+            nbytes = payload_bytes(args[0]) if name.startswith(("save_", "append_")) and args else payload_bytes(result)
+            self.metrics.observe(self.metrics_user_id, name, ms, nbytes, error)
+            self._maybe_export()
+
+    def _maybe_export(self) -> None:
+        if not self.export_interval or time.monotonic() - self._last_export < self.export_interval:
+            return
+        self._last_export = time.monotonic()
+        summary = self.metrics.format_summary(self.metrics_user_id)
+        if summary:
+            logging.info(f"📊 Storage: {summary}")
+        self.metrics.export(self.metrics_user_id)
+
+    def get_entry_tracker(self) -> dict:
+        return self._call("get_entry_tracker", self.backend.get_entry_tracker, (), {})
+
+    def save_entry_tracker(self, data: dict) -> None:
+        return self._call("save_entry_tracker", self.backend.save_entry_tracker, (data,), {})
+
+    def get_history_tracker(self) -> dict:
+        return self._call("get_history_tracker", self.backend.get_history_tracker, (), {})
+
+    def save_history_tracker(self, data: dict) -> None:
+        return self._call("save_history_tracker", self.backend.save_history_tracker, (data,), {})
+
+    def get_trades_db(self) -> list:
+        return self._call("get_trades_db", self.backend.get_trades_db, (), {})
+
+    def save_trades_db(self, data: list) -> None:
+        return self._call("save_trades_db", self.backend.save_trades_db, (data,), {})
+
+    def get_config(self) -> dict:
+        return self._call("get_config", self.backend.get_config, (), {})
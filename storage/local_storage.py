@@ -1,5 +1,10 @@
 """
 Implementação de persistência em arquivos JSON (comportamento atual do bot).
+
+Arquivos gravados de forma compacta e atômica (arquivo temporário + os.replace): um crash no
+meio da gravação deixa o arquivo anterior intacto. Trades novos vão para um log JSONL
+(trades_database.jsonl, uma linha por trade) em vez de regravar o histórico; a cada
+TRADES_LOG_COMPACT_LINES linhas o log é incorporado ao trades_database.json.
 """
 import json
 import logging
@@ -12,6 +17,8 @@ TRACKER_FILE = "bot_tracker.json"
 HISTORY_FILE = "bot_history.json"
 TRADES_DB_FILE = "trades_database.json"
 CONFIG_FILE = "bot_config.json"
+SYNC_STATE_FILE = "bot_sync_state.json"
+TRADES_LOG_COMPACT_LINES = 500  # Linhas no JSONL antes de compactar no trades_database.json
 
 
 def _load_json(filename: str) -> Any:
@@ -24,12 +31,50 @@ def _load_json(filename: str) -> Any:
     return {} if "tracker" in filename or "history" in filename or "config" in filename else []
 
 
-def _save_json(filename: str, data: Any) -> None:
+def _save_json(filename: str, data: Any) -> bool:
+    """Grava atômica e duravelmente; False (arquivo anterior intacto) se a gravação falhou."""
+    tmp = f"{filename}.tmp"
     try:
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, filename)
+        return True
     except Exception as e:
         logging.error(f"Erro ao salvar {filename}: {e}")
+        return False
+
+
+def _trades_log_path(trades_db_file: str) -> str:
+    base, _ = os.path.splitext(trades_db_file)
+    return f"{base}.jsonl"
+
+
+def _ends_with_newline(filename: str) -> bool:
+    with open(filename, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _load_jsonl(filename: str) -> list:
+    """Linhas do log de trades; linha incompleta (crash no meio do append) é ignorada."""
+    if not os.path.exists(filename):
+        return []
+    out = []
+    try:
+        with open(filename, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    logging.warning(f"Linha inválida ignorada em {filename}")
+    except Exception as e:
+        logging.error(f"Erro ao carregar {filename}: {e}")
+    return out
 
 
 class LocalStorage(StorageBase):
@@ -41,39 +86,101 @@ class LocalStorage(StorageBase):
         history_file: str = HISTORY_FILE,
         trades_db_file: str = TRADES_DB_FILE,
         config_file: str = CONFIG_FILE,
+        sync_state_file: str = SYNC_STATE_FILE,
     ):
         self.tracker_file = tracker_file
         self.history_file = history_file
         self.trades_db_file = trades_db_file
         self.config_file = config_file
+        self.sync_state_file = sync_state_file
+        self.trades_log_file = _trades_log_path(trades_db_file)
+        self._trades_log_lines = None  # contado no 1º append
 
     def get_entry_tracker(self) -> dict:
         out = _load_json(self.tracker_file)
         return out if isinstance(out, dict) else {}
 
-    def save_entry_tracker(self, data: dict) -> None:
-        _save_json(self.tracker_file, data)
+    def save_entry_tracker(self, data: dict) -> bool:
+        return _save_json(self.tracker_file, data)
 
     def get_history_tracker(self) -> dict:
         out = _load_json(self.history_file)
         return out if isinstance(out, dict) else {}
 
-    def save_history_tracker(self, data: dict) -> None:
-        _save_json(self.history_file, data)
+    def save_history_tracker(self, data: dict) -> bool:
+        return _save_json(self.history_file, data)
 
     def get_trades_db(self) -> list:
         out = _load_json(self.trades_db_file)
-        return out if isinstance(out, list) else []
+        trades = out if isinstance(out, list) else []
+        logged = _load_jsonl(self.trades_log_file)
+        if not logged:
+            return trades
+        # Snapshot + log, sem repetir OID (append repetido após falha/crash)
+        seen = {str(t.get("oid")) for t in trades if t.get("oid")}
+        for t in logged:
+            oid = str(t.get("oid") or "")
+            if oid and oid in seen:
+                continue
+            seen.add(oid)
+            trades.append(t)
+        return trades
+
+    def save_trades_db(self, data: list) -> bool:
+        """Regrava o histórico inteiro (snapshot) e zera o log JSONL (só se o snapshot foi gravado)."""
+        if not _save_json(self.trades_db_file, data):
+            return False  # log JSONL fica: os trades dele não estão no snapshot
+        try:
+            if os.path.exists(self.trades_log_file):
+                os.remove(self.trades_log_file)
+        except Exception as e:
+            logging.error(f"Erro ao remover {self.trades_log_file}: {e}")
+        self._trades_log_lines = 0
+        return True
+
+    def append_trades(self, trades: list, user_id: str = None) -> bool:
+        """Acrescenta os trades ao log JSONL (custo proporcional só aos trades novos)."""
+        if not trades:
+            return True
+        try:
+            if self._trades_log_lines is None:
+                self._trades_log_lines = len(_load_jsonl(self.trades_log_file))
+            with open(self.trades_log_file, "a", encoding="utf-8") as f:
+                if f.tell() > 0 and not _ends_with_newline(self.trades_log_file):
+                    f.write("\n")  # fecha a linha incompleta de um crash anterior
+                for t in trades:
+                    f.write(json.dumps(t, separators=(",", ":"), ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._trades_log_lines += len(trades)
+        except Exception as e:
+            logging.error(f"Erro ao gravar {self.trades_log_file}: {e}")
+            return False
+        if self._trades_log_lines >= TRADES_LOG_COMPACT_LINES:
+            self.compact_trades()
+        return True
 
-    def save_trades_db(self, data: list) -> None:
-        _save_json(self.trades_db_file, data)
+    def compact_trades(self) -> None:
+        """Incorpora o log JSONL ao trades_database.json (atômico) e zera o log."""
+        self.save_trades_db(self.get_trades_db())
 
     def get_config(self) -> dict:
         return _load_json(self.config_file)
 
-    def save_blocked_trade(self, data: dict, user_id: str = None) -> None:
+    def get_fill_cursor(self, user_id: str = None) -> int | None:
+        out = _load_json(self.sync_state_file)
+        cursor = out.get("fills_cursor_ms") if isinstance(out, dict) else None
+        return int(cursor) if cursor is not None else None
+
+    def save_fill_cursor(self, cursor_ms: int, user_id: str = None) -> None:
+        out = _load_json(self.sync_state_file)
+        state = out if isinstance(out, dict) else {}
+        state["fills_cursor_ms"] = int(cursor_ms)
+        _save_json(self.sync_state_file, state)
+
+    def save_blocked_trade(self, data: dict, user_id: str = None) -> bool:
         """No-op: local storage não persiste blocked trades."""
-        pass
+        return True
 
     def expire_blocked_trades(self, user_id: str, all_mids: dict, target1_level: float = 0.618) -> int:
         """No-op: local storage não persiste blocked trades."""
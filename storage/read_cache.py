@@ -0,0 +1,66 @@
+"""
+Cache read-through por processo para leituras por usuário que quase nunca mudam.
+
+created_at do usuário, plano, config do bot e config do Telegram eram consultados de novo a cada
+sync de histórico / início de instância. Aqui cada leitura fica em memória por um TTL por tipo
+(READ_CACHE_TTL). O cache é por processo: só gravações feitas no próprio processo invalidam a
+chave (SqliteStorage.save_config). O dashboard grava bot_config/telegram_configs pelo backend,
+que é outro processo, então no bot a mudança aparece no fim do TTL (o TTL é o limite de
+defasagem: 60s para config, 300s para Telegram) ou no restart da instância pelo manager.
+Resultados vazios ({} / None) não são guardados: os backends também devolvem isso em erro.
+"""
+import copy
+import threading
+import time
+from typing import Any, Callable, Optional
+
+READ_CACHE_TTL = {
+    "user_created_at": 3600.0,  # não muda
+    "subscription_tier": 300.0,
+    "config": 60.0,
+    "telegram_config": 300.0,
+}
+DEFAULT_READ_CACHE_TTL = 60.0
+
+
+class ReadCache:
+    """Valores por (tipo, user_id) com expiração, invalidação explícita e contadores hit/miss."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values: dict = {}  # (kind, user_id) -> (expira_em, valor)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind: str, user_id: Optional[str], load: Callable[[], Any], ttl: float = None) -> Any:
+        """Valor em cache se ainda válido; senão chama load() e guarda (se não vazio)."""
+        key = (kind, user_id)
+        now = self._clock()
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return copy.deepcopy(entry[1])  # quem chama pode alterar o dict
+            self.misses += 1
+        value = load()
+        if value:
+            if ttl is None:
+                ttl = READ_CACHE_TTL.get(kind, DEFAULT_READ_CACHE_TTL)
+            with self._lock:
+                self._values[key] = (self._clock() + ttl, copy.deepcopy(value))
+        return value
+
+    def invalidate(self, kind: str = None, user_id: str = None) -> None:
+        """Descarta entradas do tipo e/ou usuário informados (sem argumentos: tudo)."""
+        with self._lock:
+            for key in list(self._values):
+                if (kind is None or key[0] == kind) and (user_id is None or key[1] == user_id):
+                    del self._values[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._values)}
+
+
+read_cache = ReadCache()  # compartilhado por todos os storages do processo
@@ -0,0 +1,394 @@
+"""
+Persistência em SQLite (BOT_STORAGE=sqlite) para instalações de um nó só.
+
+Mesmas tabelas/semântica do SupabaseStorage, num arquivo local: consultas indexadas sem ida
+à rede. WAL permite leitores concorrentes (ex.: dashboard Streamlit) enquanto o bot grava;
+cada thread usa a própria conexão (o write-behind grava de uma thread separada).
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .base import StorageBase, blocked_trade_expired
+from .local_storage import CONFIG_FILE, _load_json
+from .read_cache import read_cache
+
+SQLITE_PATH = "zeedo_bot.db"
+BUSY_TIMEOUT_MS = 5000  # espera por lock de escrita de outro processo antes de falhar
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bot_tracker (
+    user_id TEXT NOT NULL DEFAULT '',
+    symbol TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (user_id, symbol)
+);
+CREATE TABLE IF NOT EXISTS bot_history (
+    user_id TEXT NOT NULL DEFAULT '',
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    last_signal_ts INTEGER,
+    PRIMARY KEY (user_id, symbol, timeframe)
+);
+CREATE TABLE IF NOT EXISTS trades_database (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL DEFAULT '',
+    oid TEXT,
+    symbol TEXT,
+    side TEXT,
+    tf TEXT,
+    trade_id TEXT,
+    time INTEGER,
+    pnl_usd REAL,
+    num_fills INTEGER,
+    raw TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_trades_user_oid ON trades_database(user_id, oid);
+CREATE INDEX IF NOT EXISTS idx_trades_user_time ON trades_database(user_id, time);
+CREATE INDEX IF NOT EXISTS idx_trades_user_symbol ON trades_database(user_id, symbol);
+CREATE TABLE IF NOT EXISTS bot_config (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS telegram_configs (
+    user_id TEXT PRIMARY KEY,
+    bot_token TEXT,
+    chat_id TEXT
+);
+CREATE TABLE IF NOT EXISTS blocked_trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL DEFAULT '',
+    symbol TEXT NOT NULL,
+    tf TEXT NOT NULL,
+    side TEXT NOT NULL,
+    entry_px REAL NOT NULL,
+    entry2_px REAL NOT NULL,
+    stop_real REAL NOT NULL,
+    qty REAL NOT NULL,
+    reason TEXT NOT NULL,
+    signal_ts INTEGER NOT NULL,
+    tech_base REAL,
+    setup_high REAL,
+    setup_low REAL,
+    target1_level REAL DEFAULT 0.618,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_blocked_user_symbol ON blocked_trades(user_id, symbol);
+CREATE TABLE IF NOT EXISTS bot_sync_state (
+    user_id TEXT PRIMARY KEY,
+    fills_cursor_ms INTEGER
+);
+"""
+
+
+class SqliteStorage(StorageBase):
+    """Persistência em SQLite (WAL, índices por user_id); mesma semântica que SupabaseStorage."""
+
+    def __init__(self, path: str = None, user_id: str = None):
+        self.path = path or os.environ.get("BOT_SQLITE_PATH") or SQLITE_PATH
+        self._user_id = user_id
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(_SCHEMA)
+
+    def set_user_id(self, user_id: str):
+        """Define user_id para operações multiusuário."""
+        self._user_id = user_id
+
+    def _uid(self, user_id: str = None) -> str:
+        return user_id or self._user_id or ""
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            self._local.conn = conn
+        return conn
+
+    # --- tracker / history -----------------------------------------------------------------
+
+    def get_entry_tracker(self, user_id: str = None) -> dict:
+        try:
+            rows = self._conn().execute(
+                "SELECT symbol, data FROM bot_tracker WHERE user_id = ?", (self._uid(user_id),)
+            ).fetchall()
+            result = {}
+            for row in rows:
+                data = json.loads(row["data"]) if row["data"] else None
+                if row["symbol"] and data:
+                    result[row["symbol"]] = data
+            return result
+        except Exception as e:
+            logging.error(f"SQLite get_entry_tracker: {e}")
+            return {}
+
+    def save_entry_tracker(self, data: dict, user_id: str = None) -> bool:
+        """Upsert por symbol e remove os symbols que não estão mais em data (uma transação)."""
+        if not isinstance(data, dict):
+            return True
+        try:
+            uid = self._uid(user_id)
+            rows = [
+                (uid, symbol, json.dumps(symbol_data, default=str))
+                for symbol, symbol_data in data.items()
+                if symbol and isinstance(symbol_data, dict)
+            ]
+            with self._conn() as conn:
+                placeholders = ",".join("?" for _ in data) or "''"
+                conn.execute(
+                    f"DELETE FROM bot_tracker WHERE user_id = ? AND symbol NOT IN ({placeholders})",
+                    (uid, *data.keys()),
+                )
+                conn.executemany(
+                    "INSERT INTO bot_tracker (user_id, symbol, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(user_id, symbol) DO UPDATE SET data = excluded.data",
+                    rows,
+                )
+            return True
+        except Exception as e:
+            logging.error(f"SQLite save_entry_tracker: {e}")
+            return False
+
+    def get_history_tracker(self, user_id: str = None) -> dict:
+        try:
+            rows = self._conn().execute(
+                "SELECT symbol, timeframe, last_signal_ts FROM bot_history WHERE user_id = ?", (self._uid(user_id),)
+            ).fetchall()
+            result = {}
+            for row in rows:
+                if row["symbol"] and row["timeframe"]:
+                    result.setdefault(row["symbol"], {})[row["timeframe"]] = row["last_signal_ts"]
+            return result
+        except Exception as e:
+            logging.error(f"SQLite get_history_tracker: {e}")
+            return {}
+
+    def save_history_tracker(self, data: dict, user_id: str = None) -> bool:
+        if not isinstance(data, dict):
+            return True
+        try:
+            uid = self._uid(user_id)
+            rows = [
+                (uid, symbol, timeframe, timestamp)
+                for symbol, timeframes in data.items() if symbol and isinstance(timeframes, dict)
+                for timeframe, timestamp in timeframes.items() if timeframe
+            ]
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT INTO bot_history (user_id, symbol, timeframe, last_signal_ts) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(user_id, symbol, timeframe) DO UPDATE SET last_signal_ts = excluded.last_signal_ts",
+                    rows,
+                )
+            return True
+        except Exception as e:
+            logging.error(f"SQLite save_history_tracker: {e}")
+            return False
+
+    # --- trades ----------------------------------------------------------------------------
+
+    def get_trades_db(self, user_id: str = None) -> list:
+        try:
+            rows = self._conn().execute(
+                "SELECT symbol, oid, side, tf, trade_id, time, pnl_usd, num_fills, raw FROM trades_database "
+                "WHERE user_id = ? ORDER BY time, id",
+                (self._uid(user_id),),
+            ).fetchall()
+            result = []
+            for row in rows:
+                trade = {
+                    "coin": row["symbol"],
+                    "oid": row["oid"],
+                    "time": row["time"],
+                    "pnl_usd": float(row["pnl_usd"]) if row["pnl_usd"] is not None else 0.0,
+                    "side": row["side"],
+                    "tf": row["tf"],
+                    "trade_id": row["trade_id"],
+                    "num_fills": row["num_fills"] or 1,
+                }
+                raw = json.loads(row["raw"]) if row["raw"] else None
+                if isinstance(raw, dict):
+                    trade.update(raw)
+                result.append(trade)
+            return result
+        except Exception as e:
+            logging.error(f"SQLite get_trades_db: {e}")
+            return []
+
+    def get_trade_oids(self, since_ms: int, user_id: str = None) -> dict | None:
+        """OIDs gravados com time >= since_ms (oid -> time em ms). None = leitura falhou."""
+        try:
+            rows = self._conn().execute(
+                "SELECT oid, time FROM trades_database WHERE user_id = ? AND time >= ?",
+                (self._uid(user_id), int(since_ms)),
+            ).fetchall()
+            return {str(row["oid"]): row["time"] for row in rows if row["oid"]}
+        except Exception as e:
+            logging.error(f"SQLite get_trade_oids: {e}")
+            return None
+
+    def save_trades_db(self, data: list, user_id: str = None) -> None:
+        """Insere os trades ainda não gravados (por OID); não sobrescreve os existentes."""
+        if isinstance(data, list):
+            self.append_trades(data, user_id=user_id)
+
+    def append_trades(self, trades: list, user_id: str = None) -> bool:
+        if not isinstance(trades, list):
+            return False
+        try:
+            uid = self._uid(user_id)
+            rows = []
+            for trade in trades:
+                oid = str(trade.get("oid") or "")
+                if not oid:
+                    continue
+                trade_time = trade.get("time") or trade.get("t") or trade.get("timestamp")
+                rows.append((
+                    uid, oid, trade.get("coin") or trade.get("symbol"), trade.get("side"),
+                    trade.get("tf", "-"), trade.get("trade_id", "-"),
+                    int(trade_time) if trade_time else int(time.time() * 1000),
+                    trade.get("pnl_usd", 0.0), trade.get("num_fills", 1),
+                    json.dumps(trade, default=str, ensure_ascii=False),
+                ))
+            with self._conn() as conn:
+                cur = conn.executemany(
+                    "INSERT OR IGNORE INTO trades_database "
+                    "(user_id, oid, symbol, side, tf, trade_id, time, pnl_usd, num_fills, raw) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            if cur.rowcount:
+                logging.info(f"💾 {cur.rowcount} novos trades salvos no SQLite")
+            return True
+        except Exception as e:
+            logging.error(f"SQLite append_trades: {e}")
+            return False
+
+    # --- config / extras -------------------------------------------------------------------
+
+    def get_config(self, user_id: str = None) -> dict:
+        """
+        Config do usuário em bot_config. Só a instalação local (sem user_id) cai no bot_config.json
+        quando não há linha; usuário sem linha recebe {} (não herda a config do arquivo).
+        """
+        uid = self._uid(user_id)
+        try:
+            row = self._conn().execute(
+                "SELECT data FROM bot_config WHERE user_id = ?", (uid,)
+            ).fetchone()
+            if row and row["data"]:
+                return json.loads(row["data"])
+        except Exception as e:
+            logging.error(f"SQLite get_config: {e}")
+        if uid:
+            return {}
+        out = _load_json(CONFIG_FILE)
+        return out if isinstance(out, dict) else {}
+
+    def save_config(self, data: dict, user_id: str = None) -> None:
+        try:
+            uid = self._uid(user_id)
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT INTO bot_config (user_id, data) VALUES (?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data",
+                    (uid, json.dumps(data, default=str)),
+                )
+            read_cache.invalidate("config", uid)
+        except Exception as e:
+            logging.error(f"SQLite save_config: {e}")
+
+    def get_telegram_config(self, user_id: str = None) -> dict | None:
+        """Retorna config do Telegram (bot_token, chat_id) do usuário."""
+        try:
+            row = self._conn().execute(
+                "SELECT bot_token, chat_id FROM telegram_configs WHERE user_id = ?", (self._uid(user_id),)
+            ).fetchone()
+            if not row or not row["bot_token"] or not row["chat_id"]:
+                return None
+            return {"bot_token": row["bot_token"], "chat_id": row["chat_id"]}
+        except Exception as e:
+            logging.error(f"SQLite get_telegram_config: {e}")
+            return None
+
+    def get_fill_cursor(self, user_id: str = None) -> int | None:
+        try:
+            row = self._conn().execute(
+                "SELECT fills_cursor_ms FROM bot_sync_state WHERE user_id = ?", (self._uid(user_id),)
+            ).fetchone()
+            return int(row["fills_cursor_ms"]) if row and row["fills_cursor_ms"] is not None else None
+        except Exception as e:
+            logging.error(f"SQLite get_fill_cursor: {e}")
+            return None
+
+    def save_fill_cursor(self, cursor_ms: int, user_id: str = None) -> None:
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT INTO bot_sync_state (user_id, fills_cursor_ms) VALUES (?, ?) "
+                    "ON CONFLICT(user_id) DO UPDATE SET fills_cursor_ms = excluded.fills_cursor_ms",
+                    (self._uid(user_id), int(cursor_ms)),
+                )
+        except Exception as e:
+            logging.error(f"SQLite save_fill_cursor: {e}")
+
+    def save_blocked_trade(self, data: dict, user_id: str = None) -> bool:
+        """Salva trade bloqueado para exibição e acionamento manual. False = falha na gravação."""
+        if not data or not data.get("symbol"):
+            return True
+        try:
+            with self._conn() as conn:
+                conn.execute(
+                    "INSERT INTO blocked_trades (user_id, symbol, tf, side, entry_px, entry2_px, stop_real, qty, reason, "
+                    "signal_ts, tech_base, setup_high, setup_low, target1_level, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self._uid(user_id), data["symbol"], data["tf"], data["side"],
+                        float(data["entry_px"]), float(data["entry2_px"]), float(data["stop_real"]), float(data["qty"]),
+                        data["reason"], int(data["signal_ts"]),
+                        float(data.get("tech_base", 0) or 0), float(data.get("setup_high", 0) or 0),
+                        float(data.get("setup_low", 0) or 0), float(data.get("target1_level", 0.618) or 0.618),
+                        time.time(),
+                    ),
+                )
+            logging.info(f"blocked_trade salvo: {data.get('symbol')} {data.get('tf')} ({data.get('reason')})")
+            return True
+        except Exception as e:
+            logging.error(f"SQLite save_blocked_trade: {e}", exc_info=True)
+            return False
+
+    def expire_blocked_trades(self, user_id: str, all_mids: dict, target1_level: float = 0.618) -> int:
+        """Remove blocked_trades expirados (preço atingiu TP1 ou Stop). Retorna quantidade removida."""
+        if not all_mids:
+            return 0
+        try:
+            grace_minutes = 5  # Não expira trades criados há menos de 5 min
+            rows = self._conn().execute(
+                "SELECT id, symbol, side, stop_real, tech_base, setup_high, setup_low, target1_level FROM blocked_trades "
+                "WHERE user_id = ? AND created_at <= ?",
+                (self._uid(user_id), time.time() - grace_minutes * 60),
+            ).fetchall()
+            to_delete = []
+            for row in rows:
+                px = float(all_mids.get(row["symbol"], 0) or 0)
+                if px > 0 and blocked_trade_expired(dict(row), px):
+                    to_delete.append((row["id"],))
+            if to_delete:
+                with self._conn() as conn:
+                    conn.executemany("DELETE FROM blocked_trades WHERE id = ?", to_delete)
+            return len(to_delete)
+        except Exception as e:
+            logging.error(f"SQLite expire_blocked_trades: {e}")
+            return 0
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
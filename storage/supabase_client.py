@@ -0,0 +1,60 @@
+"""
+Cliente Supabase compartilhado por processo.
+
+Antes cada get_storage()/SupabaseStorage() (e cada request do backend) criava um cliente com o
+seu próprio pool HTTP: conexão TLS nova, memória a mais e nenhum keep-alive entre chamadas.
+get_shared_client() devolve um único cliente por (url, key) no processo, sobre um httpx.Client
+com pool, keep-alive, timeouts e HTTP/2 (se o pacote h2 estiver instalado). httpx.Client é
+thread-safe. Processos filhos (InstanceManager usa multiprocessing) criam o seu na 1ª chamada:
+o pool herdado do pai no fork não é reutilizado.
+"""
+import importlib.util
+import logging
+import os
+import threading
+
+SUPABASE_HTTP_TIMEOUT = 20.0          # segundos por request (leitura/escrita)
+SUPABASE_CONNECT_TIMEOUT = 5.0
+SUPABASE_POOL_MAX_CONNECTIONS = 20
+SUPABASE_POOL_MAX_KEEPALIVE = 10
+SUPABASE_KEEPALIVE_EXPIRY = 60.0      # segundos que uma conexão ociosa fica no pool
+
+_clients: dict = {}  # (url, key) -> cliente
+_clients_pid = None
+_lock = threading.Lock()
+
+
+def get_shared_client(url: str, key: str):
+    """Cliente Supabase único do processo para (url, key); criado na primeira chamada."""
+    global _clients_pid
+    with _lock:
+        if _clients_pid != os.getpid():
+            _clients.clear()  # processo filho: não usa as conexões do pai
+            _clients_pid = os.getpid()
+        client = _clients.get((url, key))
+        if client is None:
+            client = _create_client(url, key)
+            _clients[(url, key)] = client
+        return client
+
+
+def _create_client(url: str, key: str):
+    from supabase import create_client
+    try:
+        import httpx
+        from supabase import ClientOptions
+        http = httpx.Client(
+            http2=importlib.util.find_spec("h2") is not None,
+            timeout=httpx.Timeout(SUPABASE_HTTP_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=SUPABASE_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+            ),
+        )
+        options = ClientOptions(httpx_client=http, postgrest_client_timeout=SUPABASE_HTTP_TIMEOUT)
+    except (ImportError, TypeError) as e:
+        # supabase antigo sem httpx_client em ClientOptions: cliente padrão (ainda único por processo)
+        logging.warning(f"Cliente Supabase sem pool configurado: {e}")
+        return create_client(url, key)
+    return create_client(url, key, options=options)
@@ -1,8 +1,10 @@
 import datetime
+import json
 import logging
 import os
-from typing import Any
-from .base import StorageBase
+from typing import Any, Iterator
+from .base import StorageBase, blocked_trade_expired
+from .read_cache import read_cache
 
 # Desabilita logs HTTP das bibliotecas usadas pelo Supabase
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -15,6 +17,13 @@ TABLE_HISTORY = "bot_history"
 TABLE_TRADES = "trades_database"
 TABLE_CONFIG = "bot_config"
 TABLE_BLOCKED = "blocked_trades"
+TABLE_SYNC_STATE = "bot_sync_state"
+
+# Leitura paginada de trades_database: páginas por (closed_at, id), abaixo do max-rows do PostgREST
+TRADES_PAGE_SIZE = 1000
+TRADE_COLUMNS = "id, closed_at, symbol, oid, side, tf, trade_id, pnl_usd, num_fills, raw"
+# Só o que o sync precisa para deduplicar/atribuir (time vem do JSONB sem trazer o raw inteiro)
+TRADE_SUMMARY_COLUMNS = "id, closed_at, symbol, oid, side, tf, trade_id, time:raw->time"
 
 class SupabaseStorage(StorageBase):
     """Persistência no Supabase usando tabelas normalizadas; mesma semântica que LocalStorage."""
@@ -24,10 +33,15 @@ class SupabaseStorage(StorageBase):
         self._key = key or os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY") or os.environ.get("SUPABASE_KEY")
         self._user_id = user_id  # user_id opcional para multiusuário
         self._client = None
+        # Último estado gravado/lido do bot_tracker por usuário: {user_id: {symbol: json do data}}.
+        # save_entry_tracker só envia o que mudou em relação a ele.
+        self._tracker_persisted: dict = {}
+        # Idem para bot_history: {user_id: {(symbol, timeframe): last_signal_ts}}
+        self._history_persisted: dict = {}
         if self._url and self._key:
             try:
-                from supabase import create_client
-                self._client = create_client(self._url, self._key)
+                from .supabase_client import get_shared_client
+                self._client = get_shared_client(self._url, self._key)
             except Exception as e:
                 logging.error(f"Erro ao criar cliente Supabase: {e}")
                 raise
@@ -49,6 +63,9 @@ class SupabaseStorage(StorageBase):
                 query = query.eq("user_id", user_id)
             
             r = query.execute()
+            self._tracker_persisted[user_id] = {
+                row["symbol"]: self._fingerprint(row.get("data")) for row in (r.data or []) if row.get("symbol")
+            }
             if not r.data:
                 return {}
             # Converte lista de {symbol, data} para dict {symbol: data}
@@ -63,46 +80,92 @@ class SupabaseStorage(StorageBase):
             logging.error(f"Supabase get_entry_tracker: {e}")
             return {}
 
-    def save_entry_tracker(self, data: dict, user_id: str = None) -> None:
+    def get_tracker_entries(self, symbols: list, user_id: str = None) -> dict | None:
+        """Só as linhas de bot_tracker dos symbols informados (feed de mudanças). None = erro na leitura."""
+        if not self._client:
+            return None
+        if not symbols:
+            return {}
+        try:
+            user_id = user_id or self._user_id
+            query = self._client.table(TABLE_TRACKER).select("symbol, data").in_("symbol", list(symbols))
+            if user_id:
+                query = query.eq("user_id", user_id)
+            r = query.execute()
+            result = {row["symbol"]: row["data"] for row in (r.data or []) if row.get("symbol") and row.get("data")}
+            persisted = self._tracker_persisted.get(user_id)
+            if persisted is not None:
+                # Mantém o diff do save_entry_tracker coerente com o que foi lido
+                for symbol in symbols:
+                    if symbol in result:
+                        persisted[symbol] = self._fingerprint(result[symbol])
+                    else:
+                        persisted.pop(symbol, None)
+            return result
+        except Exception as e:
+            logging.error(f"Supabase get_tracker_entries: {e}")
+            return None
+
+    @staticmethod
+    def _fingerprint(data: Any) -> str:
+        return json.dumps(data, sort_keys=True, default=str)
+
+    def save_entry_tracker(self, data: dict, user_id: str = None) -> bool:
         """
         Salva entry_tracker em bot_tracker (upsert por symbol).
         Remove do banco os symbols que não estão mais em data (equivalente ao LocalStorage,
         que sobrescreve o arquivo inteiro). Assim entry_tracker.pop(sym) + save persiste a remoção.
+        Só envia o que mudou desde a última leitura/gravação: um upsert em lote dos symbols
+        alterados e um delete ... in (...) dos removidos; sem mudança, nenhuma requisição.
+        Retorna False se a gravação falhou (o write-behind tenta de novo).
         """
-        if not self._client or not isinstance(data, dict):
-            return
+        if not self._client:
+            return False
+        if not isinstance(data, dict):
+            return True
         try:
             user_id = user_id or self._user_id
-            current_symbols = set(data.keys()) if data else set()
-            # Busca symbols atuais no DB para este user
-            query = self._client.table(TABLE_TRACKER).select("symbol")
-            if user_id:
-                query = query.eq("user_id", user_id)
-            r = query.execute()
-            db_symbols = {row["symbol"] for row in (r.data or []) if row.get("symbol")}
+            persisted = self._tracker_persisted.get(user_id)
+            if persisted is None:
+                # 1ª gravação do processo sem leitura prévia: estado atual do DB para este user
+                query = self._client.table(TABLE_TRACKER).select("symbol, data")
+                if user_id:
+                    query = query.eq("user_id", user_id)
+                r = query.execute()
+                persisted = {
+                    row["symbol"]: self._fingerprint(row.get("data")) for row in (r.data or []) if row.get("symbol")
+                }
+            current = {
+                symbol: self._fingerprint(symbol_data)
+                for symbol, symbol_data in data.items()
+                if symbol and isinstance(symbol_data, dict)
+            }
             # Remove do banco os symbols que não estão mais no data
-            to_delete = db_symbols - current_symbols
+            to_delete = [symbol for symbol in persisted if symbol not in data]
+            to_upsert = [symbol for symbol, fp in current.items() if persisted.get(symbol) != fp]
             if to_delete:
-                for symbol in to_delete:
-                    q = self._client.table(TABLE_TRACKER).delete().eq("symbol", symbol)
-                    if user_id:
-                        q = q.eq("user_id", user_id)
-                    q.execute()
-            # Upsert cada symbol que está no data
-            for symbol, symbol_data in data.items():
-                if symbol and isinstance(symbol_data, dict):
-                    record = {
-                        "symbol": symbol,
-                        "data": symbol_data
-                    }
+                q = self._client.table(TABLE_TRACKER).delete().in_("symbol", to_delete)
+                if user_id:
+                    q = q.eq("user_id", user_id)
+                q.execute()
+            if to_upsert:
+                records = []
+                for symbol in to_upsert:
+                    record = {"symbol": symbol, "data": data[symbol]}
                     if user_id:
                         record["user_id"] = user_id
-                    self._client.table(TABLE_TRACKER).upsert(
-                        record,
-                        on_conflict="symbol" if not user_id else "user_id,symbol"
-                    ).execute()
+                    records.append(record)
+                self._client.table(TABLE_TRACKER).upsert(
+                    records,
+                    on_conflict="symbol" if not user_id else "user_id,symbol"
+                ).execute()
+            updated = {symbol: fp for symbol, fp in persisted.items() if symbol in data}
+            updated.update((symbol, current[symbol]) for symbol in to_upsert)
+            self._tracker_persisted[user_id] = updated
+            return True
         except Exception as e:
             logging.error(f"Supabase save_entry_tracker: {e}")
+            return False
 
     def get_history_tracker(self, user_id: str = None) -> dict:
         """Retorna history_tracker carregando de bot_history."""
@@ -116,6 +179,9 @@ class SupabaseStorage(StorageBase):
                 query = query.eq("user_id", user_id)
             
             r = query.execute()
+            self._history_persisted[user_id] = {
+                (row.get("symbol"), row.get("timeframe")): row.get("last_signal_ts") for row in (r.data or [])
+            }
             if not r.data:
                 return {}
             # Converte lista para dict {symbol: {timeframe: timestamp}}
@@ -133,72 +199,158 @@ class SupabaseStorage(StorageBase):
             logging.error(f"Supabase get_history_tracker: {e}")
             return {}
 
-    def save_history_tracker(self, data: dict, user_id: str = None) -> None:
-        """Salva history_tracker em bot_history (upsert por symbol+timeframe)."""
-        if not self._client or not isinstance(data, dict):
-            return
+    def save_history_tracker(self, data: dict, user_id: str = None) -> bool:
+        """
+        Salva history_tracker em bot_history (upsert por symbol+timeframe).
+        Só as combinações alteradas desde a última leitura/gravação, num único upsert em lote.
+        Retorna False se a gravação falhou.
+        """
+        if not self._client:
+            return False
+        if not isinstance(data, dict):
+            return True
         try:
             user_id = user_id or self._user_id
-            # Upsert cada combinação symbol+timeframe
+            persisted = self._history_persisted.get(user_id, {})
+            dirty = {}
             for symbol, timeframes in data.items():
                 if symbol and isinstance(timeframes, dict):
                     for timeframe, timestamp in timeframes.items():
-                        if timeframe:
-                            record = {
-                                "symbol": symbol,
-                                "timeframe": timeframe,
-                                "last_signal_ts": timestamp
-                            }
-                            if user_id:
-                                record["user_id"] = user_id
-                            self._client.table(TABLE_HISTORY).upsert(
-                                record,
-                                on_conflict="symbol,timeframe" if not user_id else "user_id,symbol,timeframe"
-                            ).execute()
+                        if timeframe and persisted.get((symbol, timeframe), object()) != timestamp:
+                            dirty[(symbol, timeframe)] = timestamp
+            if not dirty:
+                return True
+            records = []
+            for (symbol, timeframe), timestamp in dirty.items():
+                record = {
+                    "symbol": symbol,
+                    "timeframe": timeframe,
+                    "last_signal_ts": timestamp
+                }
+                if user_id:
+                    record["user_id"] = user_id
+                records.append(record)
+            self._client.table(TABLE_HISTORY).upsert(
+                records,
+                on_conflict="symbol,timeframe" if not user_id else "user_id,symbol,timeframe"
+            ).execute()
+            self._history_persisted[user_id] = {**persisted, **dirty}
+            return True
         except Exception as e:
             logging.error(f"Supabase save_history_tracker: {e}")
+            return False
+
+    def iter_trades(self, user_id: str = None, columns: str = TRADE_COLUMNS, page_size: int = TRADES_PAGE_SIZE) -> Iterator[dict]:
+        """
+        Linhas de trades_database em ordem (closed_at, id), página a página (keyset: cada página
+        continua depois da última linha da anterior). Memória limitada a uma página e sem o corte
+        silencioso do max-rows do PostgREST. `columns` precisa incluir id e closed_at.
+        """
+        if not self._client:
+            return
+        user_id = user_id or self._user_id
+        last = None  # (closed_at, id) da última linha lida
+        while True:
+            query = self._client.table(TABLE_TRADES).select(columns)
+            if user_id:
+                query = query.eq("user_id", user_id)
+            if last is not None:
+                closed_at, last_id = last
+                if closed_at is None:
+                    # closed_at nulo vem por último (ASC): segue só pelo id
+                    query = query.is_("closed_at", "null").gt("id", last_id)
+                else:
+                    query = query.or_(
+                        f'closed_at.gt."{closed_at}",and(closed_at.eq."{closed_at}",id.gt.{last_id}),closed_at.is.null'
+                    )
+            rows = query.order("closed_at").order("id").limit(page_size).execute().data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            last = (rows[-1].get("closed_at"), rows[-1].get("id"))
+
+    @staticmethod
+    def _row_to_trade(row: dict) -> dict:
+        """Converte uma linha de trades_database para o formato do trades_db do bot."""
+        raw = row.get("raw") if isinstance(row.get("raw"), dict) else {}
+        trade = {
+            "coin": row.get("symbol"),
+            "oid": row.get("oid"),
+            "time": raw.get("time"),
+            "closedPnl": raw.get("closedPnl"),
+            "pnl": raw.get("pnl"),
+            "fee": raw.get("fee"),
+            "pnl_usd": float(row.get("pnl_usd", 0)) if row.get("pnl_usd") is not None else 0.0,
+            "side": row.get("side"),
+            "tf": row.get("tf"),
+            "trade_id": row.get("trade_id"),
+            "num_fills": row.get("num_fills", 1),
+            "dir": raw.get("dir"),
+        }
+        # Inclui todos os campos do raw JSONB
+        trade.update(raw)
+        return trade
 
     def get_trades_db(self, user_id: str = None) -> list:
-        """Retorna trades_db carregando de trades_database."""
+        """Retorna trades_db carregando de trades_database (paginado, em ordem cronológica)."""
         if not self._client:
             return []
         try:
-            user_id = user_id or self._user_id
-            # Ordena por closed_at DESC para manter ordem cronológica
-            query = self._client.table(TABLE_TRADES).select("*").order("closed_at", desc=False)
-            
-            if user_id:
-                query = query.eq("user_id", user_id)
-            
-            r = query.execute()
-            if not r.data:
-                return []
-            # Converte registros da tabela para formato esperado pelo código
-            result = []
-            for row in r.data:
-                # Monta objeto no formato esperado (compatível com sync_trade_history)
-                trade = {
+            return [self._row_to_trade(row) for row in self.iter_trades(user_id)]
+        except Exception as e:
+            logging.error(f"Supabase get_trades_db: {e}")
+            return []
+
+    def get_trade_summaries(self, user_id: str = None) -> list | None:
+        """
+        Resumo dos trades (coin, time, side, tf, trade_id, oid) sem ler o JSONB raw: bootstrap do sync.
+        None = leitura falhou (diferente de histórico vazio).
+        """
+        if not self._client:
+            return None
+        try:
+            return [
+                {
                     "coin": row.get("symbol"),
-                    "oid": row.get("oid"),
-                    "time": row.get("raw", {}).get("time") if isinstance(row.get("raw"), dict) else None,
-                    "closedPnl": row.get("raw", {}).get("closedPnl") if isinstance(row.get("raw"), dict) else None,
-                    "pnl": row.get("raw", {}).get("pnl") if isinstance(row.get("raw"), dict) else None,
-                    "fee": row.get("raw", {}).get("fee") if isinstance(row.get("raw"), dict) else None,
-                    "pnl_usd": float(row.get("pnl_usd", 0)) if row.get("pnl_usd") is not None else 0.0,
+                    "time": row.get("time"),
                     "side": row.get("side"),
                     "tf": row.get("tf"),
                     "trade_id": row.get("trade_id"),
-                    "num_fills": row.get("num_fills", 1),
-                    "dir": row.get("raw", {}).get("dir") if isinstance(row.get("raw"), dict) else None,
+                    "oid": row.get("oid"),
                 }
-                # Inclui todos os campos do raw JSONB
-                if isinstance(row.get("raw"), dict):
-                    trade.update(row["raw"])
-                result.append(trade)
-            return result
+                for row in self.iter_trades(user_id, columns=TRADE_SUMMARY_COLUMNS)
+            ]
         except Exception as e:
-            logging.error(f"Supabase get_trades_db: {e}")
-            return []
+            logging.error(f"Supabase get_trade_summaries: {e}")
+            return None
+
+    def get_trade_oids(self, since_ms: int, user_id: str = None) -> dict | None:
+        """
+        OIDs gravados com closed_at >= since_ms (oid -> time em ms): confere o cache local do sync
+        contra o banco (arquivo ausente, de outro nó ou desatualizado). None = leitura falhou.
+        """
+        if not self._client:
+            return None
+        try:
+            user_id = user_id or self._user_id
+            since = datetime.datetime.fromtimestamp(int(since_ms) / 1000, tz=datetime.timezone.utc).isoformat()
+            out, last_id = {}, None
+            while True:
+                query = self._client.table(TABLE_TRADES).select("id, oid, time:raw->time").gte("closed_at", since)
+                if user_id:
+                    query = query.eq("user_id", user_id)
+                if last_id is not None:
+                    query = query.gt("id", last_id)
+                rows = query.order("id").limit(TRADES_PAGE_SIZE).execute().data or []
+                for row in rows:
+                    if row.get("oid"):
+                        out[str(row["oid"])] = row.get("time") or int(since_ms)
+                if len(rows) < TRADES_PAGE_SIZE:
+                    return out
+                last_id = rows[-1].get("id")
+        except Exception as e:
+            logging.error(f"Supabase get_trade_oids: {e}")
+            return None
 
     def save_trades_db(self, data: list, user_id: str = None) -> None:
         """Salva novos trades em trades_database (apenas novos, não sobrescreve)."""
@@ -206,44 +358,17 @@ class SupabaseStorage(StorageBase):
             return
         try:
             user_id = user_id or self._user_id
-            # Busca OIDs já processados (filtrado por user_id se disponível)
-            query = self._client.table(TABLE_TRADES).select("oid")
-            if user_id:
-                query = query.eq("user_id", user_id)
-            existing_r = query.execute()
-            existing_oids = {str(row.get("oid")) for row in (existing_r.data or []) if row.get("oid")}
+            # Busca OIDs já processados (filtrado por user_id se disponível), paginado
+            existing_oids = {
+                str(row.get("oid")) for row in self.iter_trades(user_id, columns="id, closed_at, oid") if row.get("oid")
+            }
             
             # Insere apenas trades novos
             new_trades = []
             for trade in data:
                 oid = str(trade.get("oid") or "")
                 if oid and oid not in existing_oids:
-                    # Calcula closed_at a partir do timestamp do trade
-                    trade_time = trade.get("time") or trade.get("t") or trade.get("timestamp")
-                    if trade_time:
-                        # Converte timestamp (ms) para datetime
-                        try:
-                            closed_at = datetime.datetime.fromtimestamp(int(trade_time) / 1000, tz=datetime.timezone.utc)
-                        except (ValueError, TypeError, OSError):
-                            closed_at = datetime.datetime.now(datetime.timezone.utc)
-                    else:
-                        closed_at = datetime.datetime.now(datetime.timezone.utc)
-                    
-                    # Prepara registro para inserção
-                    record = {
-                        "trade_id": trade.get("trade_id", "-"),
-                        "symbol": trade.get("coin") or trade.get("symbol"),
-                        "side": trade.get("side"),
-                        "tf": trade.get("tf", "-"),
-                        "oid": oid,
-                        "raw": trade,  # Armazena objeto completo no JSONB raw
-                        "pnl_usd": trade.get("pnl_usd", 0.0),
-                        "num_fills": trade.get("num_fills", 1),
-                        "closed_at": closed_at.isoformat(),  # Supabase aceita ISO string
-                    }
-                    if user_id:
-                        record["user_id"] = user_id
-                    new_trades.append(record)
+                    new_trades.append(self._trade_record(trade, oid, user_id))
                     existing_oids.add(oid)  # Evita duplicatas na mesma execução
             
             if new_trades:
@@ -252,12 +377,69 @@ class SupabaseStorage(StorageBase):
         except Exception as e:
             logging.error(f"Supabase save_trades_db: {e}")
 
+    def append_trades(self, trades: list, user_id: str = None) -> bool:
+        """
+        Insere só os trades informados (sync incremental). Confere duplicatas apenas entre os
+        OIDs do lote, sem ler o histórico inteiro. Retorna True se gravou (ou nada a gravar).
+        """
+        if not self._client or not isinstance(trades, list):
+            return False
+        try:
+            user_id = user_id or self._user_id
+            batch = {str(t.get("oid")): t for t in trades if t.get("oid")}
+            if not batch:
+                return True
+            query = self._client.table(TABLE_TRADES).select("oid").in_("oid", list(batch))
+            if user_id:
+                query = query.eq("user_id", user_id)
+            existing = {str(row.get("oid")) for row in (query.execute().data or [])}
+            records = [self._trade_record(t, oid, user_id) for oid, t in batch.items() if oid not in existing]
+            if records:
+                self._client.table(TABLE_TRADES).insert(records).execute()
+                logging.info(f"💾 {len(records)} novos trades salvos no Supabase")
+            return True
+        except Exception as e:
+            logging.error(f"Supabase append_trades: {e}")
+            return False
+
+    @staticmethod
+    def _trade_record(trade: dict, oid: str, user_id: str = None) -> dict:
+        """Linha de trades_database a partir do trade do sync."""
+        # Calcula closed_at a partir do timestamp do trade
+        trade_time = trade.get("time") or trade.get("t") or trade.get("timestamp")
+        if trade_time:
+            # Converte timestamp (ms) para datetime
+            try:
+                closed_at = datetime.datetime.fromtimestamp(int(trade_time) / 1000, tz=datetime.timezone.utc)
+            except (ValueError, TypeError, OSError):
+                closed_at = datetime.datetime.now(datetime.timezone.utc)
+        else:
+            closed_at = datetime.datetime.now(datetime.timezone.utc)
+
+        record = {
+            "trade_id": trade.get("trade_id", "-"),
+            "symbol": trade.get("coin") or trade.get("symbol"),
+            "side": trade.get("side"),
+            "tf": trade.get("tf", "-"),
+            "oid": oid,
+            "raw": trade,  # Armazena objeto completo no JSONB raw
+            "pnl_usd": trade.get("pnl_usd", 0.0),
+            "num_fills": trade.get("num_fills", 1),
+            "closed_at": closed_at.isoformat(),  # Supabase aceita ISO string
+        }
+        if user_id:
+            record["user_id"] = user_id
+        return record
+
     def get_config(self, user_id: str = None) -> dict:
-        """Retorna config carregando de bot_config."""
+        """Retorna config carregando de bot_config (cache por READ_CACHE_TTL["config"])."""
         if not self._client:
             return {}
+        user_id = user_id or self._user_id
+        return read_cache.get("config", user_id, lambda: self._fetch_config(user_id))
+
+    def _fetch_config(self, user_id: str = None) -> dict:
         try:
-            user_id = user_id or self._user_id
             query = self._client.table(TABLE_CONFIG).select(
                 "symbols, timeframes, trade_mode, signal_mode, strategy_preset, stop_multiplier, entry1_multiplier, entry2_multiplier, entry2_adjust_last_target, "
                 "entry2_target1_level, entry2_target1_percent, entry2_target2_level, entry2_target2_percent, entry2_target3_level, entry2_target3_percent, "
@@ -302,10 +484,13 @@ class SupabaseStorage(StorageBase):
         """Retorna created_at do usuário em ms (para filtrar trades antigos). None = sem filtro."""
         if not self._client:
             return None
+        uid = user_id or self._user_id
+        if not uid:
+            return None
+        return read_cache.get("user_created_at", uid, lambda: self._fetch_user_created_at_ms(uid))
+
+    def _fetch_user_created_at_ms(self, uid: str) -> int | None:
         try:
-            uid = user_id or self._user_id
-            if not uid:
-                return None
             r = self._client.table("users").select("created_at").eq("id", uid).limit(1).execute()
             if not r.data or len(r.data) == 0:
                 return None
@@ -323,14 +508,72 @@ class SupabaseStorage(StorageBase):
             logging.error(f"Supabase get_user_created_at_timestamp_ms: {e}")
             return None
 
+    def get_fill_cursor(self, user_id: str = None) -> int | None:
+        """Retorna o cursor (ms) da sincronização incremental de fills. None = nunca sincronizado."""
+        if not self._client:
+            return None
+        try:
+            uid = user_id or self._user_id
+            if not uid:
+                return None
+            r = self._client.table(TABLE_SYNC_STATE).select("fills_cursor_ms").eq("user_id", uid).limit(1).execute()
+            if not r.data:
+                return None
+            cursor = r.data[0].get("fills_cursor_ms")
+            return int(cursor) if cursor is not None else None
+        except Exception as e:
+            logging.error(f"Supabase get_fill_cursor: {e}")
+            return None
+
+    def save_fill_cursor(self, cursor_ms: int, user_id: str = None) -> None:
+        """Persiste o cursor (ms) da sincronização incremental de fills."""
+        if not self._client:
+            return
+        try:
+            uid = user_id or self._user_id
+            if not uid:
+                return
+            self._client.table(TABLE_SYNC_STATE).upsert(
+                {
+                    "user_id": uid,
+                    "fills_cursor_ms": int(cursor_ms),
+                    "updated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                },
+                on_conflict="user_id",
+            ).execute()
+        except Exception as e:
+            logging.error(f"Supabase save_fill_cursor: {e}")
+
+    def get_subscription_tier(self, user_id: str = None) -> str | None:
+        """Plano do usuário (basic, pro, satoshi) em users.subscription_tier. None = sem plano/erro."""
+        if not self._client:
+            return None
+        uid = user_id or self._user_id
+        if not uid:
+            return None
+        return read_cache.get("subscription_tier", uid, lambda: self._fetch_subscription_tier(uid))
+
+    def _fetch_subscription_tier(self, uid: str) -> str | None:
+        try:
+            r = self._client.table("users").select("subscription_tier").eq("id", uid).limit(1).execute()
+            if r.data and r.data[0].get("subscription_tier"):
+                return r.data[0]["subscription_tier"].lower()
+            return None
+        except Exception as e:
+            logging.error(f"Supabase get_subscription_tier: {e}")
+            return None
+
     def get_telegram_config(self, user_id: str = None) -> dict | None:
         """Retorna config do Telegram (bot_token, chat_id) do usuário."""
         if not self._client:
             return None
+        user_id = user_id or self._user_id
+        if not user_id:
+            return None
+        return read_cache.get("telegram_config", user_id, lambda: self._fetch_telegram_config(user_id))
+
+    def _fetch_telegram_config(self, user_id: str) -> dict | None:
         try:
-            user_id = user_id or self._user_id
-            if not user_id:
-                return None
             r = self._client.table("telegram_configs").select("bot_token, chat_id").eq("user_id", user_id).limit(1).execute()
             if not r.data or len(r.data) == 0:
                 return None
@@ -347,15 +590,17 @@ class SupabaseStorage(StorageBase):
             logging.error(f"Supabase get_telegram_config: {e}")
             return None
 
-    def save_blocked_trade(self, data: dict, user_id: str = None) -> None:
-        """Salva trade bloqueado para exibição e acionamento manual."""
-        if not self._client or not data or not data.get("symbol"):
-            return
+    def save_blocked_trade(self, data: dict, user_id: str = None) -> bool:
+        """Salva trade bloqueado para exibição e acionamento manual. False = falha na gravação."""
+        if not self._client:
+            return False
+        if not data or not data.get("symbol"):
+            return True
         try:
             uid = user_id or self._user_id
             if not uid:
                 logging.warning("save_blocked_trade: user_id ausente, não foi possível salvar")
-                return
+                return True  # nada a tentar de novo: sem usuário não há onde gravar
             record = {
                 "user_id": uid,
                 "symbol": data["symbol"],
@@ -374,8 +619,10 @@ class SupabaseStorage(StorageBase):
             }
             self._client.table(TABLE_BLOCKED).insert(record).execute()
             logging.info(f"blocked_trade salvo: {data.get('symbol')} {data.get('tf')} ({data.get('reason')})")
+            return True
         except Exception as e:
             logging.error(f"Supabase save_blocked_trade: {e}", exc_info=True)
+            return False
 
     def expire_blocked_trades(self, user_id: str, all_mids: dict, target1_level: float = 0.618) -> int:
         """Remove blocked_trades expirados (preço atingiu TP1 ou Stop). Retorna quantidade removida."""
@@ -407,31 +654,7 @@ class SupabaseStorage(StorageBase):
                 px = float(all_mids.get(sym, 0) or 0)
                 if px <= 0:
                     continue
-                stop = float(row.get("stop_real", 0))
-                tech = float(row.get("tech_base", 0) or 0)
-                setup_high = float(row.get("setup_high", 0) or 0)
-                setup_low = float(row.get("setup_low", 0) or 0)
-                t1 = float(row.get("target1_level", 0.618) or 0.618)
-                side = (row.get("side") or "long").lower()
-                expired = False
-                # Stop: sempre verifica
-                if side == "long":
-                    if px <= stop:
-                        expired = True
-                    else:
-                        # TP1 = setup_high + (tech_base × 0.618) — alvo 1 para long
-                        tp1 = setup_high + (tech * t1)
-                        if px >= tp1:
-                            expired = True
-                else:
-                    if px >= stop:
-                        expired = True
-                    else:
-                        # TP1 = setup_low - (tech_base × 0.618) — alvo 1 para short
-                        tp1 = setup_low - (tech * t1)
-                        if px <= tp1:
-                            expired = True
-                if expired:
+                if blocked_trade_expired(row, px):
                     to_delete.append(row.get("id"))
             for bid in to_delete:
                 if bid:
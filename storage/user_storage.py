@@ -34,12 +34,18 @@ class UserStorage(StorageBase):
         # Fallback para backends antigos (compatibilidade)
         return self.backend.get_entry_tracker()
     
-    def save_entry_tracker(self, data: dict) -> None:
-        """Salva entry_tracker com user_id."""
+    def get_tracker_entries(self, symbols: list) -> dict | None:
+        """Linhas do entry_tracker só dos symbols informados (None = erro na leitura)."""
+        if hasattr(self.backend, 'get_tracker_entries'):
+            return self.backend.get_tracker_entries(symbols, user_id=self.user_id)
+        tracker = self.get_entry_tracker()
+        return {symbol: tracker[symbol] for symbol in symbols if symbol in tracker}
+    
+    def save_entry_tracker(self, data: dict) -> bool:
+        """Salva entry_tracker com user_id (False = falha na gravação)."""
         if hasattr(self.backend, 'save_entry_tracker'):
-            self.backend.save_entry_tracker(data, user_id=self.user_id)
-        else:
-            self.backend.save_entry_tracker(data)
+            return self.backend.save_entry_tracker(data, user_id=self.user_id)
+        return self.backend.save_entry_tracker(data)
     
     def get_history_tracker(self) -> dict:
         """Retorna history_tracker filtrado por user_id."""
@@ -47,12 +53,11 @@ class UserStorage(StorageBase):
             return self.backend.get_history_tracker(user_id=self.user_id)
         return self.backend.get_history_tracker()
     
-    def save_history_tracker(self, data: dict) -> None:
-        """Salva history_tracker com user_id."""
+    def save_history_tracker(self, data: dict) -> bool:
+        """Salva history_tracker com user_id (False = falha na gravação)."""
         if hasattr(self.backend, 'save_history_tracker'):
-            self.backend.save_history_tracker(data, user_id=self.user_id)
-        else:
-            self.backend.save_history_tracker(data)
+            return self.backend.save_history_tracker(data, user_id=self.user_id)
+        return self.backend.save_history_tracker(data)
     
     def get_trades_db(self) -> list:
         """Retorna trades_db filtrado por user_id."""
@@ -60,6 +65,23 @@ class UserStorage(StorageBase):
             return self.backend.get_trades_db(user_id=self.user_id)
         return self.backend.get_trades_db()
     
+    def get_trade_summaries(self) -> list | None:
+        """Resumo dos trades do usuário (coin, time, side, tf, trade_id, oid) para o bootstrap do sync (None = erro)."""
+        if hasattr(self.backend, 'get_trade_summaries'):
+            return self.backend.get_trade_summaries(user_id=self.user_id)
+        return self.get_trades_db()
+
+    def get_trade_oids(self, since_ms: int) -> dict | None:
+        """OIDs do usuário gravados a partir de since_ms (oid -> time ms), para conferir o cache do sync (None = erro)."""
+        if hasattr(self.backend, 'get_trade_oids'):
+            return self.backend.get_trade_oids(since_ms, user_id=self.user_id)
+        out = {}
+        for trade in self.get_trades_db():
+            ts = trade.get("time") or trade.get("t") or trade.get("timestamp") or 0
+            if trade.get("oid") and int(ts or 0) >= since_ms:
+                out[str(trade["oid"])] = int(ts)
+        return out
+
     def save_trades_db(self, data: list) -> None:
         """Salva trades_db com user_id."""
         if hasattr(self.backend, 'save_trades_db'):
@@ -67,6 +89,13 @@ class UserStorage(StorageBase):
         else:
             self.backend.save_trades_db(data)
     
+    def append_trades(self, trades: list) -> bool:
+        """Grava só os trades novos com user_id (sem regravar o histórico)."""
+        if hasattr(self.backend, 'append_trades'):
+            return self.backend.append_trades(trades, user_id=self.user_id)
+        self.save_trades_db(self.get_trades_db() + list(trades))
+        return True
+    
     def get_config(self) -> dict:
         """Retorna config do usuário."""
         if hasattr(self.backend, 'get_config'):
@@ -85,10 +114,28 @@ class UserStorage(StorageBase):
             return self.backend.get_user_created_at_timestamp_ms(user_id=self.user_id)
         return None
 
-    def save_blocked_trade(self, data: dict) -> None:
-        """Salva trade bloqueado com user_id."""
+    def get_subscription_tier(self) -> str | None:
+        """Retorna o plano do usuário (basic, pro, satoshi). None = backend sem planos."""
+        if hasattr(self.backend, 'get_subscription_tier'):
+            return self.backend.get_subscription_tier(user_id=self.user_id)
+        return None
+
+    def get_fill_cursor(self) -> int | None:
+        """Retorna o cursor (ms) da sincronização incremental de fills do usuário."""
+        if hasattr(self.backend, 'get_fill_cursor'):
+            return self.backend.get_fill_cursor(user_id=self.user_id)
+        return None
+
+    def save_fill_cursor(self, cursor_ms: int) -> None:
+        """Persiste o cursor (ms) da sincronização incremental de fills do usuário."""
+        if hasattr(self.backend, 'save_fill_cursor'):
+            self.backend.save_fill_cursor(cursor_ms, user_id=self.user_id)
+
+    def save_blocked_trade(self, data: dict) -> bool:
+        """Salva trade bloqueado com user_id (False = falha na gravação)."""
         if hasattr(self.backend, 'save_blocked_trade'):
-            self.backend.save_blocked_trade(data, user_id=self.user_id)
+            return self.backend.save_blocked_trade(data, user_id=self.user_id)
+        return True
 
     def expire_blocked_trades(self, all_mids: dict, target1_level: float = 0.618) -> int:
         """Remove blocked_trades expirados. Retorna quantidade removida."""
@@ -0,0 +1,175 @@
+"""
+Camada write-behind opcional sobre um storage (ex.: UserStorage + Supabase).
+
+save_entry_tracker / save_history_tracker / save_blocked_trade só guardam o pedido em memória
+e retornam na hora; uma thread grava no backend a cada `interval` segundos. Saves repetidos
+do mesmo tipo se fundem (vale o último snapshot do tracker/history; blocked trades iguais
+entram uma vez). Gravações que o backend reporta como falhas (retorno False ou exceção) voltam
+para a fila e são tentadas de novo no próximo ciclo. Leituras com escrita pendente (ou em
+andamento) não esperam a gravação: vêm do snapshot em memória (read-your-writes), mais as
+linhas novas do banco que o bot nunca viu (trades acionados pelo dashboard). flush() grava tudo
+de forma síncrona: usado no shutdown e depois de mudanças de proteção (entrada, stop, TP).
+Demais métodos (trades, config, cursor...) vão direto ao backend.
+"""
+import atexit
+import copy
+import logging
+import threading
+from typing import Optional
+
+from .base import StorageBase
+
+WRITE_BEHIND_INTERVAL = 1.0  # segundos entre gravações em background
+
+
+class WriteBehindStorage(StorageBase):
+    """Wrapper que tira as gravações do tracker/history/blocked trades do caminho do loop."""
+
+    def __init__(self, backend: StorageBase, interval: float = WRITE_BEHIND_INTERVAL):
+        """
+        Args:
+            backend: Storage real (UserStorage, LocalStorage ou SupabaseStorage)
+            interval: Segundos entre gravações em background
+        """
+        self.backend = backend
+        self.interval = interval
+        self._lock = threading.Lock()        # protege os pendentes
+        self._flush_lock = threading.Lock()  # uma gravação por vez (thread ou flush síncrono)
+        self._tracker: Optional[dict] = None
+        self._history: Optional[dict] = None
+        self._tracker_inflight: Optional[dict] = None  # snapshot sendo gravado agora
+        self._history_inflight: Optional[dict] = None
+        self._tracker_written: set = set()  # symbols no banco segundo a última leitura/gravação do bot
+        self._blocked: dict = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="storage-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def __getattr__(self, name):
+        # Métodos opcionais do backend (get_fill_cursor, expire_blocked_trades, user_id...) continuam
+        # visíveis para os hasattr(storage, ...) do bot
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    # --- escritas bufferizadas -------------------------------------------------------------
+
+    def save_entry_tracker(self, data: dict) -> None:
+        snapshot = copy.deepcopy(data)  # o bot altera o dict em memória depois de salvar
+        with self._lock:
+            self._tracker = snapshot
+
+    def save_history_tracker(self, data: dict) -> None:
+        snapshot = copy.deepcopy(data)
+        with self._lock:
+            self._history = snapshot
+
+    def save_blocked_trade(self, data: dict) -> None:
+        with self._lock:
+            self._blocked[self._blocked_key(data)] = copy.deepcopy(data)
+
+    @staticmethod
+    def _blocked_key(data: dict) -> tuple:
+        return (data.get("symbol"), data.get("tf"), data.get("signal_ts"), data.get("reason"))
+
+    # --- leituras (snapshot pendente em memória; backend só para o que o bot não tem) --------
+
+    def _pending_tracker(self):
+        with self._lock:
+            local = self._tracker if self._tracker is not None else self._tracker_inflight
+            return copy.deepcopy(local) if local is not None else None, set(self._tracker_written)
+
+    def get_entry_tracker(self) -> dict:
+        local, written = self._pending_tracker()
+        remote = self.backend.get_entry_tracker()
+        if local is None:
+            with self._lock:
+                if self._tracker is None and self._tracker_inflight is None:
+                    self._tracker_written = set(remote or {})
+            return remote
+        # Symbols que o bot removeu (no banco até a gravação) ficam de fora; os novos do dashboard entram
+        for symbol, data in (remote or {}).items():
+            if symbol not in local and symbol not in written:
+                local[symbol] = data
+        return local
+
+    def get_tracker_entries(self, symbols: list) -> dict | None:
+        local, written = self._pending_tracker()
+        if local is None:
+            return self.backend.get_tracker_entries(symbols)
+        result = {symbol: local[symbol] for symbol in symbols if symbol in local}
+        rest = [symbol for symbol in symbols if symbol not in local and symbol not in written]
+        if rest:
+            remote = self.backend.get_tracker_entries(rest)
+            if remote is None:
+                return None
+            result.update(remote)
+        return result
+
+    def get_history_tracker(self) -> dict:
+        with self._lock:
+            local = self._history if self._history is not None else self._history_inflight
+            if local is not None:
+                return copy.deepcopy(local)
+        return self.backend.get_history_tracker()
+
+    def get_trades_db(self) -> list:
+        return self.backend.get_trades_db()
+
+    def save_trades_db(self, data: list) -> None:
+        self.backend.save_trades_db(data)
+
+    def get_config(self) -> dict:
+        return self.backend.get_config()
+
+    # --- gravação --------------------------------------------------------------------------
+
+    def pending(self) -> bool:
+        return self._tracker is not None or self._history is not None or bool(self._blocked)
+
+    def flush(self) -> None:
+        """Grava no backend tudo que está pendente (síncrono); o que falhar volta para a fila."""
+        with self._flush_lock:
+            with self._lock:
+                tracker, self._tracker = self._tracker, None
+                history, self._history = self._history, None
+                blocked, self._blocked = list(self._blocked.values()), {}
+                self._tracker_inflight, self._history_inflight = tracker, history
+            if tracker is not None:
+                ok = self._write(self.backend.save_entry_tracker, tracker)
+                with self._lock:
+                    self._tracker_inflight = None
+                    if ok:
+                        self._tracker_written = set(tracker)
+                    elif self._tracker is None:  # não passa por cima de um snapshot mais novo
+                        self._tracker = tracker
+            if history is not None:
+                ok = self._write(self.backend.save_history_tracker, history)
+                with self._lock:
+                    self._history_inflight = None
+                    if not ok and self._history is None:
+                        self._history = history
+            for btd in blocked:
+                if not self._write(self.backend.save_blocked_trade, btd):
+                    with self._lock:
+                        self._blocked.setdefault(self._blocked_key(btd), btd)
+
+    @staticmethod
+    def _write(save, data) -> bool:
+        """True se o backend gravou (None de backends sem retorno conta como sucesso)."""
+        try:
+            return save(data) is not False
+        except Exception as e:
+            logging.error(f"Erro write-behind storage ({getattr(save, '__name__', 'save')}): {e}")
+            return False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            if self.pending():
+                self.flush()
+
+    def close(self) -> None:
+        """Para a thread e grava o que restou (shutdown)."""
+        self._stop.set()
+        self.flush()
@@ -0,0 +1,165 @@
+"""
+Espelho da conta Hyperliquid via WebSocket (opcional, BOT_ACCOUNT_MIRROR=1).
+
+Assina webData2 (posições, ordens abertas e mids), orderUpdates e userFills do usuário e
+mantém o estado em memória. O loop do bot lê o espelho em vez de chamar
+frontend_open_orders/user_state/all_mids a cada iteração e acorda assim que chega um fill
+ou uma ordem muda de status. O WebsocketManager do SDK não reconecta sozinho: quando o
+socket cai ou fica mudo, o espelho cria outro e faz um resync completo via REST.
+"""
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from hyperliquid.websocket_manager import WebsocketManager
+
+STALE_AFTER_SECONDS = 90  # webData2 chega várias vezes por minuto; sem mensagem por 90s = conexão morta
+
+
+class AccountMirror:
+    """Estado da conta (ordens, posições, mids) alimentado por WebSocket, com resync REST."""
+
+    def __init__(self, base_url: str, wallet: str, stale_after: float = STALE_AFTER_SECONDS):
+        self.base_url = base_url
+        self.wallet = wallet
+        self.stale_after = stale_after
+        self._ws: Optional[WebsocketManager] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._orders: dict = {}
+        self._user_state: dict = {}
+        self._mids: dict = {}
+        self._fills: list = []
+        self._partial: set = set()  # oids abertos via orderUpdates ainda sem os campos completos
+        self._last_msg = 0.0
+        self.state_as_of = 0.0  # quando posições/ordens foram atualizadas pela última vez (epoch s)
+        self.reconnects = 0
+
+    # --- conexão -------------------------------------------------------------------------
+
+    def _connect(self) -> None:
+        if self._ws is not None:
+            try:
+                self._ws.stop()
+            except Exception:
+                pass
+        ws = WebsocketManager(self.base_url)
+        ws.daemon = True
+        ws.start()
+        ws.subscribe({"type": "webData2", "user": self.wallet}, self._on_web_data)
+        ws.subscribe({"type": "orderUpdates", "user": self.wallet}, self._on_order_updates)
+        ws.subscribe({"type": "userFills", "user": self.wallet}, self._on_user_fills)
+        self._ws = ws
+        self._last_msg = time.time()
+
+    def healthy(self) -> bool:
+        return (
+            self._ws is not None
+            and self._ws.is_alive()
+            and time.time() - self._last_msg < self.stale_after
+        )
+
+    def ensure_connected(self, info) -> bool:
+        """Reconecta e faz resync REST se o socket caiu ou está mudo. Retorna True se houve resync."""
+        if self.healthy():
+            return False
+        if self._ws is not None:
+            self.reconnects += 1
+            logging.warning(f"⚠️ WebSocket da conta sem dados há {time.time() - self._last_msg:.0f}s. Reconectando...")
+        self._connect()
+        self.resync(info)
+        return True
+
+    def resync(self, info) -> None:
+        """Estado completo via REST (início e após desconexão)."""
+        orders = info.frontend_open_orders(self.wallet) or []
+        user_state = info.user_state(self.wallet) or {}
+        mids = info.all_mids() or {}
+        as_of = time.time()
+        with self._lock:
+            self.state_as_of = as_of
+            self._orders = {o["oid"]: o for o in orders}
+            self._user_state = user_state
+            self._mids = dict(mids)
+            self._partial.clear()
+        logging.info(f"🔄 Espelho da conta sincronizado via REST ({len(orders)} ordens)")
+
+    def stop(self) -> None:
+        if self._ws is not None:
+            self._ws.stop()
+            self._ws = None
+
+    # --- callbacks do WebSocket ----------------------------------------------------------
+
+    def _on_web_data(self, msg: dict) -> None:
+        data = msg.get("data") or {}
+        universe = (data.get("meta") or {}).get("universe") or []
+        ctxs = data.get("assetCtxs") or []
+        with self._lock:
+            if "clearinghouseState" in data:
+                self._user_state = data["clearinghouseState"] or {}
+                self.state_as_of = time.time()
+            if "openOrders" in data:
+                self._orders = {o["oid"]: o for o in data["openOrders"] or []}
+                self._partial -= set(self._orders)
+            for asset, ctx in zip(universe, ctxs):
+                px = ctx.get("midPx") or ctx.get("markPx")
+                if px is not None:
+                    self._mids[asset["name"]] = px
+            self._last_msg = time.time()
+
+    def _on_order_updates(self, msg: dict) -> None:
+        changed = False
+        with self._lock:
+            for upd in msg.get("data") or []:
+                order = upd.get("order") or {}
+                oid = order.get("oid")
+                if oid is None:
+                    continue
+                if upd.get("status") == "open":
+                    # Ordem nova chega sem os campos do frontend (trigger, reduceOnly); até o próximo
+                    # webData2 completá-la, o loop relê via REST para não duplicar stop/TP
+                    if oid not in self._orders:
+                        self._partial.add(oid)
+                else:
+                    self._orders.pop(oid, None)
+                    self._partial.discard(oid)
+                    changed = True  # filled/canceled/triggered: vale reagir já
+            self._last_msg = time.time()
+        if changed:
+            self._wake.set()
+
+    def _on_user_fills(self, msg: dict) -> None:
+        data = msg.get("data") or {}
+        if data.get("isSnapshot"):
+            return  # histórico enviado na assinatura; o bot já cobre com a busca REST do loop
+        fills = data.get("fills") or []
+        if not fills:
+            return
+        with self._lock:
+            self._fills.extend(fills)
+            self._last_msg = time.time()
+        self._wake.set()
+
+    # --- leitura pelo loop ---------------------------------------------------------------
+
+    def needs_resync(self) -> bool:
+        """Há ordem aberta conhecida só pelo orderUpdates (sem campos completos)."""
+        return bool(self._partial)
+
+    def read(self) -> Tuple[list, dict, dict]:
+        """(open_orders, user_state, mids) no mesmo formato das chamadas REST."""
+        with self._lock:
+            return list(self._orders.values()), self._user_state, dict(self._mids)
+
+    def drain_fills(self) -> List[dict]:
+        with self._lock:
+            fills, self._fills = self._fills, []
+        return fills
+
+    def wait(self, timeout: float) -> bool:
+        """Dorme até timeout ou até chegar fill/mudança de ordem. Retorna True se acordou por evento."""
+        woke = self._wake.wait(timeout)
+        self._wake.clear()
+        return woke
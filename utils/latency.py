@@ -0,0 +1,110 @@
+"""
+Instrumentação de latência sinal → ordem.
+Cada trade registra o instante de cada etapa (ms após o fechamento do candle);
+os registros vão para o entry_tracker e para logs/latency/<user>.jsonl, de onde
+saem os resumos p50/p95/p99 por usuário e por nó (scripts/latency_report.py).
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+# Etapas na ordem em que acontecem no scan
+STAGES = ("scan_start", "binance_fetched", "hl_fetched", "signal", "order_sent", "order_ack")
+LATENCY_LOG_DIR = os.path.join("logs", "latency")
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyTrace:
+    """Marcas de tempo de um sinal, relativas ao fechamento do candle (origin_ms)."""
+
+    def __init__(self, origin_ms: int):
+        self.origin_ms = int(origin_ms)
+        self.marks: Dict[str, int] = {}
+
+    def mark(self, stage: str, ts_ms: Optional[int] = None) -> None:
+        self.marks[stage] = int(ts_ms if ts_ms is not None else time.time() * 1000)
+
+    def offsets(self) -> Dict[str, int]:
+        """Etapa → ms desde o fechamento do candle."""
+        return {stage: self.marks[stage] - self.origin_ms for stage in STAGES if stage in self.marks}
+
+    def to_record(self) -> dict:
+        return {"candle_close_ms": self.origin_ms, "stages_ms": self.offsets()}
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentil com interpolação linear sobre uma lista já ordenada."""
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(records: Iterable[dict]) -> Dict[str, dict]:
+    """Resumo por etapa: {stage: {"n", "p50", "p95", "p99"}} a partir de registros to_record()."""
+    by_stage: Dict[str, List[float]] = {}
+    for rec in records:
+        for stage, ms in (rec.get("stages_ms") or {}).items():
+            by_stage.setdefault(stage, []).append(float(ms))
+    out = {}
+    for stage in STAGES:
+        values = sorted(by_stage.get(stage) or [])
+        if values:
+            out[stage] = {"n": len(values), **{f"p{p}": round(percentile(values, p), 1) for p in PERCENTILES}}
+    return out
+
+
+def format_summary(summary: Dict[str, dict]) -> str:
+    return " | ".join(
+        f"{stage}: p50={s['p50']:.0f} p95={s['p95']:.0f} p99={s['p99']:.0f}ms (n={s['n']})"
+        for stage, s in summary.items()
+    )
+
+
+class LatencyStats:
+    """Janela deslizante em memória dos últimos registros do processo (resumo por usuário)."""
+
+    def __init__(self, maxlen: int = 500):
+        self.records = deque(maxlen=maxlen)
+
+    def add(self, record: dict) -> None:
+        self.records.append(record)
+
+    def summary(self) -> Dict[str, dict]:
+        return summarize(self.records)
+
+
+def append_record(user_id: str, record: dict, log_dir: str = LATENCY_LOG_DIR) -> None:
+    """Anexa o registro em <log_dir>/<user_id>.jsonl (um arquivo por usuário no nó)."""
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        with open(os.path.join(log_dir, f"{user_id}.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except Exception as e:
+        logging.error(f"Erro ao gravar latência: {e}")
+
+
+def load_records(log_dir: str = LATENCY_LOG_DIR, since_ms: int = 0) -> Dict[str, List[dict]]:
+    """Lê os registros do nó: {user_id: [records]} (ignora linhas corrompidas)."""
+    out: Dict[str, List[dict]] = {}
+    if not os.path.isdir(log_dir):
+        return out
+    for name in sorted(os.listdir(log_dir)):
+        if not name.endswith(".jsonl"):
+            continue
+        records = []
+        with open(os.path.join(log_dir, name), "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if rec.get("candle_close_ms", 0) >= since_ms:
+                    records.append(rec)
+        out[name[:-len(".jsonl")]] = records
+    return out
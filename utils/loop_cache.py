@@ -0,0 +1,65 @@
+"""
+Cache de leituras com escopo de uma iteração do loop do bot.
+
+Cada leitura (Info da Hyperliquid ou storage) é feita no máximo uma vez por iteração: a
+primeira chamada busca e as seguintes reaproveitam. Quem escreve (ordens enviadas,
+tracker salvo) invalida as chaves afetadas para a próxima leitura buscar de novo.
+Fora de uma iteração (begin/end) não há cache: toda leitura vai direto à fonte.
+"""
+import time
+from typing import Any, Callable, Optional
+
+# Estado da conta na Hyperliquid (muda com qualquer ordem enviada/cancelada/alterada)
+ACCOUNT_KEYS = ("open_orders", "user_state", "mids")
+
+
+class LoopReadCache:
+    """Memoiza leituras dentro de uma iteração do loop, com invalidação explícita."""
+
+    def __init__(self):
+        self._values: dict = {}
+        self._as_of: dict = {}
+        self._active = False
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self) -> None:
+        """Início de uma iteração: descarta tudo da iteração anterior."""
+        self.invalidate()
+        self._active = True
+
+    def end(self) -> None:
+        self.invalidate()
+        self._active = False
+
+    def get(self, key: str, fetch: Callable[[], Any]) -> Any:
+        if self._active and key in self._values:
+            self.hits += 1
+            return self._values[key]
+        self.misses += 1
+        as_of = time.time()
+        value = fetch()
+        if self._active:
+            self._values[key] = value
+            self._as_of[key] = as_of
+        return value
+
+    def put(self, key: str, value: Any, as_of: Optional[float] = None) -> None:
+        """Registra um valor já lido como o atual da iteração (as_of = quando a fonte o produziu)."""
+        if self._active:
+            self._values[key] = value
+            self._as_of[key] = time.time() if as_of is None else as_of
+
+    def as_of(self, key: str) -> Optional[float]:
+        """Momento (epoch s) em que o valor em cache foi lido da fonte; None se não está em cache."""
+        return self._as_of.get(key) if key in self._values else None
+
+    def invalidate(self, *keys: str) -> None:
+        """Invalida as chaves informadas (sem argumentos: todas)."""
+        if not keys:
+            self._values.clear()
+            self._as_of.clear()
+            return
+        for key in keys:
+            self._values.pop(key, None)
+            self._as_of.pop(key, None)
@@ -0,0 +1,155 @@
+"""
+Registro de metadados da exchange (Hyperliquid perps) indexado por coin.
+Substitui a varredura linear de meta["universe"] por lookups O(1) e se atualiza
+em background, para que novas listagens apareçam sem reiniciar o processo.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+
+DEFAULT_REFRESH_INTERVAL = 300  # 5 minutos
+DEFAULT_SZ_DECIMALS = 2
+MAX_PERP_PX_DECIMALS = 6  # Perps: preço com até 5 algarismos significativos e no máx. 6 - szDecimals casas
+MAX_PX_SIG_FIGS = 5
+
+_registries: Dict[str, "MarketMetaRegistry"] = {}
+_registries_lock = threading.Lock()
+
+
+def _http_meta_fetcher(base_url: str) -> Callable[[], dict]:
+    def fetch() -> dict:
+        resp = requests.post(f"{base_url.rstrip('/')}/info", json={"type": "meta"}, timeout=10)
+        resp.raise_for_status()
+        return resp.json()
+    return fetch
+
+
+class MarketMetaRegistry:
+    """Metadados por coin (szDecimals, alavancagem máxima, regras de tick, deslistado)."""
+
+    def __init__(self, fetch: Callable[[], dict], refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        """
+        Args:
+            fetch: Função que retorna o payload de meta (ex.: info.meta)
+            refresh_interval: Segundos entre atualizações em background
+        """
+        self._fetch = fetch
+        self.refresh_interval = refresh_interval
+        self._by_coin: Dict[str, dict] = {}
+        self._raw: dict = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.last_refresh = 0.0
+
+    @staticmethod
+    def _index(meta: dict) -> Dict[str, dict]:
+        by_coin = {}
+        for asset, u in enumerate(meta.get("universe") or []):
+            name = u.get("name")
+            if not name:
+                continue
+            sz_dec = int(u.get("szDecimals", DEFAULT_SZ_DECIMALS))
+            by_coin[name] = {
+                "asset": asset,
+                "sz_decimals": sz_dec,
+                "px_decimals": max(MAX_PERP_PX_DECIMALS - sz_dec, 0),
+                "max_leverage": int(u.get("maxLeverage", 0) or 0),
+                "only_isolated": bool(u.get("onlyIsolated", False)),
+                "is_delisted": bool(u.get("isDelisted", False)),
+            }
+        return by_coin
+
+    def refresh(self) -> bool:
+        """Busca meta e troca o índice atomicamente. Em erro, mantém o índice anterior."""
+        try:
+            meta = self._fetch() or {}
+        except Exception as e:
+            logging.error(f"Erro ao atualizar meta da exchange: {e}")
+            return False
+        by_coin = self._index(meta)
+        if not by_coin:
+            logging.warning("⚠️ Meta da exchange veio vazio; mantendo registro anterior")
+            return False
+        with self._lock:
+            new_coins = set(by_coin) - set(self._by_coin) if self._by_coin else set()
+            self._by_coin = by_coin
+            self._raw = meta
+            self.last_refresh = time.time()
+        if new_coins:
+            logging.info(f"🆕 Novas listagens no meta: {', '.join(sorted(new_coins))}")
+        return True
+
+    def start_background_refresh(self) -> None:
+        """Inicia thread daemon que atualiza o registro a cada refresh_interval (idempotente)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._refresh_loop, name="market-meta-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _refresh_loop(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def ensure_loaded(self) -> "MarketMetaRegistry":
+        if not self._by_coin:
+            self.refresh()
+        return self
+
+    def __contains__(self, coin: str) -> bool:
+        return coin in self._by_coin
+
+    def __len__(self) -> int:
+        return len(self._by_coin)
+
+    @property
+    def raw(self) -> dict:
+        """Último payload de meta (formato da API)."""
+        return self._raw
+
+    def get(self, coin: str) -> Optional[dict]:
+        return self._by_coin.get(coin)
+
+    def sz_decimals(self, coin: str, default: int = DEFAULT_SZ_DECIMALS) -> int:
+        info = self._by_coin.get(coin)
+        return info["sz_decimals"] if info else default
+
+    def max_leverage(self, coin: str, default: int = 0) -> int:
+        info = self._by_coin.get(coin)
+        return info["max_leverage"] if info else default
+
+    def is_delisted(self, coin: str) -> bool:
+        info = self._by_coin.get(coin)
+        return bool(info and info["is_delisted"])
+
+    def round_sz(self, coin: str, sz: float) -> float:
+        return round(sz, self.sz_decimals(coin))
+
+    def round_px(self, coin: str, px: float) -> float:
+        """Arredonda para a regra de tick: 5 algarismos significativos e no máx. 6 - szDecimals casas."""
+        px = float(f"{px:.{MAX_PX_SIG_FIGS}g}")
+        info = self._by_coin.get(coin)
+        return round(px, info["px_decimals"]) if info else px
+
+
+def get_market_meta(base_url: str, fetch: Optional[Callable[[], dict]] = None,
+                    refresh_interval: float = DEFAULT_REFRESH_INTERVAL) -> MarketMetaRegistry:
+    """
+    Registro compartilhado por processo (um por base_url). Na primeira chamada carrega o meta
+    e inicia a atualização em background; chamadas seguintes reutilizam o mesmo registro.
+    """
+    with _registries_lock:
+        registry = _registries.get(base_url)
+        if registry is None:
+            registry = MarketMetaRegistry(fetch or _http_meta_fetcher(base_url), refresh_interval)
+            _registries[base_url] = registry
+    registry.ensure_loaded()
+    registry.start_background_refresh()
+    return registry
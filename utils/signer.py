@@ -0,0 +1,119 @@
+"""
+Assinatura EIP-712 das ações L1 da Hyperliquid (order/cancel/modify) sem recalcular a parte estática.
+
+O SDK monta o typed data completo e chama encode_typed_data a cada ordem; aqui o domain
+separator, o type hash do struct Agent e o hash do campo source são calculados uma vez e
+cada assinatura só faz msgpack + 2 keccak + ECDSA sobre o digest. O resultado é idêntico
+ao de hyperliquid.utils.signing.sign_l1_action (ECDSA determinístico, RFC 6979).
+
+Opcional (BOT_FAST_SIGNING=1): install_fast_l1_signing() só troca o assinador do SDK depois de
+conferir, com uma chave descartável, que as duas implementações dão a mesma assinatura.
+Com o pacote opcional `coincurve` instalado, eth_keys usa o backend em C (bem mais rápido).
+"""
+import logging
+import weakref
+from typing import Optional
+
+import msgpack
+from eth_keys import keys
+from eth_utils import keccak, to_hex
+
+# Partes estáticas do typed data (domain "Exchange", chainId 1337, struct Agent)
+_EIP712_DOMAIN_TYPEHASH = keccak(text="EIP712Domain(string name,string version,uint256 chainId,address verifyingContract)")
+DOMAIN_SEPARATOR = keccak(
+    _EIP712_DOMAIN_TYPEHASH
+    + keccak(text="Exchange")
+    + keccak(text="1")
+    + (1337).to_bytes(32, "big")
+    + bytes(32)  # verifyingContract = 0x0000000000000000000000000000000000000000
+)
+AGENT_TYPEHASH = keccak(text="Agent(string source,bytes32 connectionId)")
+_SOURCE_HASH = {True: keccak(text="a"), False: keccak(text="b")}
+
+# Chave derivada uma vez por conta (LocalAccount do Exchange); some junto com a conta
+_derived_keys: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def action_hash(action: dict, vault_address: Optional[str], nonce: int, expires_after: Optional[int]) -> bytes:
+    """Mesmo hash de hyperliquid.utils.signing.action_hash (connectionId do phantom agent)."""
+    data = msgpack.packb(action)
+    data += nonce.to_bytes(8, "big")
+    if vault_address is None:
+        data += b"\x00"
+    else:
+        data += b"\x01"
+        data += bytes.fromhex(vault_address[2:] if vault_address.startswith("0x") else vault_address)
+    if expires_after is not None:
+        data += b"\x00"
+        data += expires_after.to_bytes(8, "big")
+    return keccak(data)
+
+
+def l1_digest(action: dict, vault_address: Optional[str], nonce: int, expires_after: Optional[int], is_mainnet: bool) -> bytes:
+    """Digest EIP-712 final (\\x19\\x01 || domainSeparator || hashStruct(Agent))."""
+    struct_hash = keccak(AGENT_TYPEHASH + _SOURCE_HASH[is_mainnet] + action_hash(action, vault_address, nonce, expires_after))
+    return keccak(b"\x19\x01" + DOMAIN_SEPARATOR + struct_hash)
+
+
+def _private_key(wallet) -> keys.PrivateKey:
+    key = _derived_keys.get(wallet)
+    if key is None:
+        key = _derived_keys[wallet] = keys.PrivateKey(bytes(wallet.key))
+    return key
+
+
+def sign_digest(private_key: keys.PrivateKey, digest: bytes) -> dict:
+    sig = private_key.sign_msg_hash(digest)
+    return {"r": to_hex(sig.r), "s": to_hex(sig.s), "v": sig.v + 27}
+
+
+def sign_l1_action(wallet, action, active_pool, nonce, expires_after, is_mainnet):
+    """Substituto direto de hyperliquid.utils.signing.sign_l1_action (mesma assinatura e retorno)."""
+    return sign_digest(_private_key(wallet), l1_digest(action, active_pool, nonce, expires_after, is_mainnet))
+
+
+# Ações fixas do autoteste: ordem com vault/sem vault, mainnet/testnet, com e sem expiresAfter
+_SELF_TEST_CASES = (
+    (
+        {"type": "order", "orders": [{"a": 0, "b": True, "p": "60000.5", "s": "0.01", "r": False,
+                                      "t": {"limit": {"tif": "Gtc"}}}], "grouping": "na"},
+        None, 1700000000000, None, True,
+    ),
+    (
+        {"type": "cancel", "cancels": [{"a": 3, "o": 123456789}]},
+        "0x1111111111111111111111111111111111111111", 1700000000001, 1700000060000, False,
+    ),
+)
+
+
+def fast_signing_matches_sdk() -> bool:
+    """Assina as ações de _SELF_TEST_CASES com o SDK e com este módulo (chave descartável) e compara."""
+    try:
+        from eth_account import Account
+        from hyperliquid.utils import signing as sdk_signing
+
+        wallet = Account.from_key("0x" + "11" * 32)
+        for action, vault, nonce, expires_after, is_mainnet in _SELF_TEST_CASES:
+            expected = sdk_signing.sign_l1_action(wallet, action, vault, nonce, expires_after, is_mainnet)
+            if sign_l1_action(wallet, action, vault, nonce, expires_after, is_mainnet) != expected:
+                return False
+        return True
+    except Exception as e:
+        logging.error(f"Erro no autoteste da assinatura rápida: {e}")
+        return False
+
+
+def install_fast_l1_signing() -> bool:
+    """
+    Faz o Exchange do SDK usar sign_l1_action pré-computado (idempotente). Só troca se o autoteste
+    bater com o SDK instalado; senão mantém o assinador do SDK e retorna False.
+    """
+    import hyperliquid.exchange as hl_exchange
+    if hl_exchange.sign_l1_action is sign_l1_action:
+        return True
+    if not fast_signing_matches_sdk():
+        logging.error("❌ Assinatura rápida diverge do SDK instalado: mantendo o assinador do SDK")
+        return False
+    hl_exchange.sign_l1_action = sign_l1_action
+    logging.info("✍️ Assinatura L1 pré-computada ativa (conferida com o SDK)")
+    return True
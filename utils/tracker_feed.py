@@ -0,0 +1,161 @@
+"""
+Change feed do bot_tracker (opcional, BOT_TRACKER_FEED=1).
+
+Trades acionados no site (execute-blocked-trade) entram no bot_tracker por fora do bot. Sem feed,
+o loop relê o bot_tracker inteiro a cada iteração para achá-los. Com feed, cada insert/update do
+usuário chega pelo Supabase Realtime (postgres_changes) e o loop só lê esses symbols. A leitura
+completa vira reconciliação: no início e a cada (re)conexão do canal, quando eventos podem ter
+se perdido. Enquanto o canal está fora, o loop volta a ler tudo a cada iteração.
+
+TrackerFeed é a fila em si (sem rede): serve de stand-in local e testes, via push().
+"""
+import asyncio
+import logging
+import os
+import threading
+from typing import List, Optional
+
+from storage.supabase_storage import TABLE_TRACKER
+
+# Falhas de conexão já são logadas (uma linha por tentativa) pelo próprio feed
+logging.getLogger("realtime").setLevel(logging.CRITICAL)
+
+TRACKER_FEED_BACKOFF_SECONDS = (1, 2, 5, 10, 30)  # espera entre tentativas de reconexão
+TRACKER_FEED_CHECK_SECONDS = 1.0  # intervalo de checagem da conexão
+
+
+class TrackerFeed:
+    """Symbols alterados no bot_tracker fora do bot, mais o pedido de reconciliação completa."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._symbols: set = set()
+        self._reconcile = True  # 1ª iteração sempre lê o bot_tracker inteiro
+        self.connected = True
+        self.events = 0
+        self.reconnects = 0
+
+    def push(self, symbol: str) -> None:
+        if not symbol:
+            return
+        with self._lock:
+            self._symbols.add(symbol)
+            self.events += 1
+
+    def drain(self) -> List[str]:
+        with self._lock:
+            symbols, self._symbols = list(self._symbols), set()
+        return symbols
+
+    def request_reconcile(self) -> None:
+        with self._lock:
+            self._reconcile = True
+
+    def take_reconcile(self) -> bool:
+        """True se o loop deve ler o bot_tracker inteiro agora (início, reconexão ou feed fora)."""
+        with self._lock:
+            needed, self._reconcile = self._reconcile or not self.connected, False
+        return needed
+
+    def start(self) -> "TrackerFeed":
+        return self
+
+    def stop(self) -> None:
+        pass
+
+
+class SupabaseTrackerFeed(TrackerFeed):
+    """TrackerFeed alimentado pelo Supabase Realtime (inserts/updates do bot_tracker do usuário)."""
+
+    def __init__(self, url: str, key: str, user_id: str):
+        super().__init__()
+        self.url = url.rstrip("/")
+        self.key = key
+        self.user_id = user_id
+        self.connected = False
+        self._stop = threading.Event()
+        self._down = threading.Event()  # canal caiu/fechou: reconecta
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SupabaseTrackerFeed":
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._run()), name="tracker-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    # --- callbacks do Realtime (thread do feed) --------------------------------------------
+
+    def _on_change(self, payload) -> None:
+        data = (payload or {}).get("data") or payload or {}
+        record = data.get("record") or data.get("new") or {}
+        self.push(record.get("symbol"))
+
+    def _on_status(self, status, err=None) -> None:
+        status = getattr(status, "value", status)
+        if status == "SUBSCRIBED":
+            # Eventos entre a queda e a nova inscrição não chegam: relê tudo uma vez
+            self.request_reconcile()
+            self.connected = True
+            logging.info("📡 Feed do bot_tracker conectado")
+        elif status in ("CLOSED", "CHANNEL_ERROR", "TIMED_OUT"):
+            self.connected = False
+            self._down.set()
+            if err:
+                logging.warning(f"Feed do bot_tracker: {status} ({err})")
+
+    # --- conexão ---------------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        from realtime import AsyncRealtimeClient
+
+        attempt = 0
+        while not self._stop.is_set():
+            client = None
+            self._down.clear()
+            try:
+                client = AsyncRealtimeClient(f"{self.url}/realtime/v1", self.key, auto_reconnect=False)
+                await client.connect()
+                channel = client.channel(f"{TABLE_TRACKER}:{self.user_id}")
+                for event in ("INSERT", "UPDATE"):
+                    channel.on_postgres_changes(
+                        event, callback=self._on_change, table=TABLE_TRACKER, schema="public",
+                        filter=f"user_id=eq.{self.user_id}",
+                    )
+                await channel.subscribe(self._on_status)
+                while not self._stop.is_set() and not self._down.is_set() and self._alive(client):
+                    if self.connected:
+                        attempt = 0
+                    await asyncio.sleep(TRACKER_FEED_CHECK_SECONDS)
+            except Exception as e:
+                logging.warning(f"Feed do bot_tracker: conexão falhou: {e}")
+            finally:
+                self.connected = False
+                if client is not None:
+                    try:
+                        await client.close()
+                    except Exception:
+                        pass
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            delay = TRACKER_FEED_BACKOFF_SECONDS[min(attempt, len(TRACKER_FEED_BACKOFF_SECONDS) - 1)]
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _alive(client) -> bool:
+        listen = getattr(client, "_listen_task", None)
+        return client.is_connected and (listen is None or not listen.done())
+
+
+def tracker_feed_for(storage) -> Optional[TrackerFeed]:
+    """Feed Realtime do usuário do storage, se o backend for Supabase; senão None (loop lê tudo)."""
+    user_id = getattr(storage, "user_id", None)
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_SERVICE_KEY") or os.environ.get("SUPABASE_ANON_KEY") or os.environ.get("SUPABASE_KEY")
+    backend = (os.environ.get("BOT_STORAGE") or "local").strip().lower()
+    if backend != "supabase" or not (user_id and url and key):
+        return None
+    return SupabaseTrackerFeed(url, key, user_id).start()
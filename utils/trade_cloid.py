@@ -0,0 +1,39 @@
+"""
+Client order ids (cloid) determinísticos das ordens do bot.
+
+Formato (16 bytes, exigido pela Hyperliquid): 0x | "7a65" (marcador "ze") | papel (1 byte) | chave do trade (13 bytes).
+A chave vem do hash do trade_id, então bot, backend (execute-blocked-trade) e sync de fills
+chegam ao mesmo cloid sem persistir nada além do trade_id.
+"""
+import hashlib
+from typing import Optional, Tuple
+
+CLOID_MAGIC = "7a65"
+ROLE_ENTRY1 = 0x01
+ROLE_ENTRY2 = 0x02
+_KEY_HEX_LEN = 26  # 13 bytes
+
+
+def trade_key(trade_id: str) -> str:
+    return hashlib.sha256(str(trade_id).encode("utf-8")).hexdigest()[:_KEY_HEX_LEN]
+
+
+def make_cloid(trade_id: str, role: int) -> str:
+    """Cloid (0x + 32 hex) da ordem `role` do trade `trade_id`."""
+    return f"0x{CLOID_MAGIC}{role:02x}{trade_key(trade_id)}"
+
+
+def parse_cloid(cloid) -> Optional[Tuple[str, int]]:
+    """(chave do trade, papel) se o cloid foi gerado pelo bot; senão None."""
+    raw = str(cloid or "").lower()
+    if len(raw) != 34 or not raw.startswith("0x" + CLOID_MAGIC):
+        return None
+    try:
+        role = int(raw[6:8], 16)
+    except ValueError:
+        return None
+    return raw[8:], role
+
+
+def is_bot_cloid(cloid) -> bool:
+    return parse_cloid(cloid) is not None
@@ -0,0 +1,69 @@
+"""
+Índice dos trades já gravados, por coin e ordenado por tempo.
+
+O sync de histórico atribui cada fill novo a um tf/trade_id procurando trades do mesmo coin
+numa janela de tempo (72h para trades do bot, 12h para agrupar órfãos MANUAL_). Com o índice
+cada busca é um bisect na lista do coin + os poucos trades dentro da janela, em vez de varrer
+o histórico inteiro por fill. Montado uma vez a partir do trades_db e atualizado a cada trade novo.
+Cada OID entra uma vez só: um sync que falhou ao gravar e refaz o lote não duplica o trade.
+"""
+import bisect
+from collections import defaultdict
+from typing import Iterable, List
+
+
+def trade_coin(trade: dict):
+    return trade.get("coin") or trade.get("token")
+
+
+def trade_time_ms(trade: dict) -> int:
+    try:
+        return int(trade.get("time", 0) or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class TradeIndex:
+    """Trades por coin em ordem de tempo (empate: ordem de inserção), com busca por janela."""
+
+    def __init__(self):
+        self._times = defaultdict(list)   # coin -> [time_ms] ordenado
+        self._trades = defaultdict(list)  # coin -> [trade] na mesma ordem de _times
+        self._oids = set()                # OIDs já indexados (add idempotente)
+        self.loaded = False
+
+    def load(self, trades: Iterable[dict]) -> None:
+        """(Re)constrói o índice a partir do histórico completo."""
+        self._times.clear()
+        self._trades.clear()
+        self._oids.clear()
+        for trade in trades or []:
+            self.add(trade)
+        self.loaded = True
+
+    def add(self, trade: dict) -> None:
+        coin = trade_coin(trade)
+        ts = trade_time_ms(trade)
+        if not coin or not ts:
+            return  # sem coin/tempo nunca casa com nenhuma janela
+        oid = str(trade.get("oid") or "")
+        if oid:
+            if oid in self._oids:
+                return
+            self._oids.add(oid)
+        times = self._times[coin]
+        i = bisect.bisect_right(times, ts)
+        times.insert(i, ts)
+        self._trades[coin].insert(i, trade)
+
+    def between(self, coin, lo_ms: int, hi_ms: int) -> List[dict]:
+        """Trades do coin com lo_ms <= time <= hi_ms, do mais antigo para o mais novo."""
+        times = self._times.get(coin)
+        if not times:
+            return []
+        start = bisect.bisect_left(times, lo_ms)
+        end = bisect.bisect_right(times, hi_ms)
+        return self._trades[coin][start:end]
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._times.values())
@@ -0,0 +1,147 @@
+"""
+Cache local, por usuário, do que o sync de histórico já gravou no storage.
+
+Guarda os OIDs processados (com o horário do trade) e um resumo dos trades recentes (coin, time,
+side, tf, trade_id, oid), que é o que o sync precisa para deduplicar fills e atribuir tf/trade_id.
+É carregado uma vez por processo e atualizado a cada trade novo; só na primeira execução (sem
+arquivo) o histórico é lido do storage. Leitura falha (None) ou vazia não é gravada em disco:
+a falha é tentada de novo no próximo sync. OIDs e resumos mais velhos que a retenção são
+descartados (o cursor de fills só rebusca uma pequena janela antes dele), então o arquivo não
+cresce com o histórico. Gravação atômica (arquivo temporário + os.replace).
+
+O arquivo é só deste nó: pode faltar, ser de uma execução anterior (instância que mudou de nó e
+voltou) ou ter perdido OIDs na poda. Por isso, antes de tratar fills como novos, o sync confere
+os OIDs gravados no banco a partir do fill mais antigo do lote (ensure_oids_since), uma vez por
+processo e de novo só se um replay voltar antes do que já foi conferido.
+"""
+import json
+import logging
+import os
+import time
+from typing import Callable, Iterable, List, Optional
+
+TRADE_SYNC_CACHE_DIR = os.path.join("cache", "trade_sync")
+RECENT_TRADES_RETENTION_MS = 7 * 24 * 3600 * 1000  # Resumos/OIDs mantidos (atribuição em janelas de 72h/12h)
+SUMMARY_FIELDS = ("coin", "time", "side", "tf", "trade_id", "oid")
+
+
+def trade_summary(trade: dict) -> dict:
+    out = {k: trade.get(k) for k in SUMMARY_FIELDS}
+    if not out["coin"]:
+        out["coin"] = trade.get("token") or trade.get("symbol")
+    return out
+
+
+def _time_ms(trade: dict) -> int:
+    try:
+        return int(trade.get("time") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class TradeSyncCache:
+    """OIDs já gravados + resumos dos trades recentes de um usuário, persistidos em JSON."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.oids: set = set()
+        self.oid_times: dict = {}  # oid -> time (ms) do trade, para descartar os antigos
+        self.recent: List[dict] = []
+        self.loaded = False
+        self.checked_from_ms: Optional[int] = None  # OIDs conferidos com o banco a partir daqui (neste processo)
+
+    @classmethod
+    def for_user(cls, user_id: str, base_dir: str = TRADE_SYNC_CACHE_DIR) -> "TradeSyncCache":
+        return cls(os.path.join(base_dir, f"{user_id or 'local'}.json"))
+
+    def load(self, bootstrap: Callable[[], Optional[Iterable[dict]]]) -> bool:
+        """
+        Lê o arquivo; se não existir (ou estiver corrompido), monta a partir de bootstrap().
+        bootstrap() retornando None = leitura falhou: nada é carregado nem gravado (retorna False).
+        """
+        data = None
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                logging.error(f"Erro ao carregar {self.path}: {e}")
+        if isinstance(data, dict) and isinstance(data.get("oids"), (dict, list)):
+            oids = data["oids"]
+            if isinstance(oids, list):
+                # Formato antigo (só OIDs): ficam pela retenção a partir de agora
+                now_ms = int(time.time() * 1000)
+                oids = {o: now_ms for o in oids}
+            self.oid_times = {str(o): int(t or 0) for o, t in oids.items()}
+            self.oids = set(self.oid_times)
+            self.recent = [t for t in data.get("recent") or [] if isinstance(t, dict)]
+        else:
+            trades = bootstrap()
+            if trades is None:
+                logging.warning("Cache do histórico não montado (falha ao ler trades); nova tentativa no próximo sync")
+                return False
+            self.oids, self.oid_times, self.recent = set(), {}, []
+            self.add(trades)
+            self.prune()
+            if self.oids:
+                self.save()  # histórico vazio não vira arquivo: sem trades não há o que deduplicar
+            logging.info(f"🗂️ Cache do histórico montado: {len(self.oids)} OIDs, {len(self.recent)} trades recentes")
+        self.loaded = True
+        return True
+
+    def add(self, trades: Iterable[dict]) -> None:
+        for trade in trades:
+            if trade.get("oid"):
+                oid = str(trade["oid"])
+                self.oids.add(oid)
+                self.oid_times[oid] = _time_ms(trade)
+            self.recent.append(trade_summary(trade))
+
+    def ensure_oids_since(self, since_ms: int, fetch: Callable[[int], Optional[dict]]) -> bool:
+        """
+        Completa os OIDs com os gravados no banco desde since_ms (fetch(since_ms) -> {oid: time}),
+        se essa janela ainda não foi conferida neste processo. False = leitura falhou (sem ela, fill
+        já gravado por outra execução pareceria novo: PnL e alerta em dobro).
+        """
+        if self.checked_from_ms is not None and since_ms >= self.checked_from_ms:
+            return True
+        found = fetch(since_ms)
+        if found is None:
+            logging.warning("OIDs do histórico não conferidos com o banco; nova tentativa no próximo sync")
+            return False
+        missing = {str(o): t for o, t in found.items() if str(o) not in self.oids}
+        for oid, t in missing.items():
+            self.oids.add(oid)
+            try:
+                self.oid_times[oid] = int(t or since_ms)
+            except (TypeError, ValueError):
+                self.oid_times[oid] = since_ms
+        if missing:
+            logging.info(f"🗂️ Cache do histórico completado pelo banco: {len(missing)} OIDs")
+            self.save()
+        self.checked_from_ms = since_ms
+        return True
+
+    def prune(self, now_ms: int = None, keep_oids_since_ms: int = None) -> None:
+        """
+        Descarta resumos e OIDs mais velhos que RECENT_TRADES_RETENTION_MS. keep_oids_since_ms
+        (início da janela que o cursor de fills ainda rebusca) estende a retenção dos OIDs se for
+        mais antigo. OIDs sem horário (marcados direto em oids) também saem.
+        """
+        cutoff = (now_ms or int(time.time() * 1000)) - RECENT_TRADES_RETENTION_MS
+        self.recent = [t for t in self.recent if _time_ms(t) >= cutoff]
+        oid_cutoff = min(cutoff, keep_oids_since_ms) if keep_oids_since_ms is not None else cutoff
+        self.oid_times = {o: t for o, t in self.oid_times.items() if t >= oid_cutoff}
+        self.oids.intersection_update(self.oid_times)
+        if self.checked_from_ms is not None and self.checked_from_ms < oid_cutoff:
+            self.checked_from_ms = oid_cutoff  # OIDs anteriores saíram: replay antes disso confere de novo
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"oids": self.oid_times, "recent": self.recent}, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logging.error(f"Erro ao salvar {self.path}: {e}")